@@ -1,117 +1,67 @@
 # PrintingSystemWeb/__init__.py
 
 from flask import Flask
-from flask_sqlalchemy import SQLAlchemy
-import os
-from datetime import datetime
 
-app = Flask(__name__)
-
-# --- Database Configuration ---
-# Configure SQLite database file path. It will be created in your project root.
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///site.db'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False 
-
-db = SQLAlchemy(app)
-
-# --- Database Models ---
-class TransactionHeader(db.Model):
-    id = db.Column(db.String(50), primary_key=True) 
-    transaction_date = db.Column(db.Date, nullable=False)
-    transaction_time = db.Column(db.Time, nullable=False)
-    total_amount = db.Column(db.Numeric(10, 2), nullable=False, default=0.00)
-
-    items = db.relationship('TransactionItem', backref='header', lazy=True, cascade="all, delete-orphan")
-
-    def __repr__(self):
-        return f"TransactionHeader('{self.id}', '{self.transaction_date}')"
-
-    def to_dict(self): # Helper for jsonify
-        return {
-            'id': self.id,
-            'date': self.transaction_date.strftime("%m/%d/%Y"),
-            'time': self.transaction_time.strftime("%I:%M%p"),
-            'total': float(self.total_amount)
-        }
-
-class TransactionItem(db.Model):
-    item_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    transaction_header_id = db.Column(db.String(50), db.ForeignKey('transaction_header.id'), nullable=False)
-    
-    paper_type = db.Column(db.String(50), nullable=False)
-    color = db.Column(db.String(50), nullable=False)
-    pages = db.Column(db.Integer, nullable=False)
-    price_per_page = db.Column(db.Numeric(10, 2), nullable=False)
-    item_total = db.Column(db.Numeric(10, 2), nullable=False)
-
-    def __repr__(self):
-        return f"TransactionItem('{self.item_id}', '{self.paper_type}', '{self.pages}')"
-
-    def to_dict(self): # Helper for jsonify (for detailed report)
-        return {
-            'id': self.header.id, 
-            'date': self.header.transaction_date.strftime("%m/%d/%Y"),
-            'time': self.header.transaction_time.strftime("%I:%M%p"),
-            'paperType': self.paper_type,
-            'color': self.color,
-            'pages': self.pages,
-            'pricePerPage': float(self.price_per_page),
-            'total': float(self.item_total)
-        }
-
-# --- NEW: Customer Order Request Models ---
-class CustomerOrderRequest(db.Model):
-    __tablename__ = 'customer_order_request' # Explicit table name
-    request_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    customer_name = db.Column(db.String(100), nullable=False)
-    file_name = db.Column(db.String(255), nullable=False) # Changed to nullable=False as per screenshot implies required
-    file_url = db.Column(db.String(255), nullable=True)  # For URL
-    note = db.Column(db.Text, nullable=True)
-    request_date = db.Column(db.DateTime, default=datetime.now, nullable=False)
-    status = db.Column(db.String(50), default='Pending', nullable=False) # e.g., Pending, Processed, Rejected
-
-    items = db.relationship('CustomerOrderItem', backref='request', lazy=True, cascade="all, delete-orphan")
-
-    def to_dict(self):
-        return {
-            'requestId': self.request_id,
-            'customerName': self.customer_name,
-            'fileName': self.file_name,
-            'fileUrl': self.file_url,
-            'note': self.note,
-            'requestDate': self.request_date.strftime("%m/%d/%Y %I:%M%p"),
-            'status': self.status,
-            'items': [item.to_dict() for item in self.items]
-        }
-
-class CustomerOrderItem(db.Model):
-    __tablename__ = 'customer_order_item' # Explicit table name
-    item_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    request_header_id = db.Column(db.Integer, db.ForeignKey('customer_order_request.request_id'), nullable=False)
-    
-    paper_type = db.Column(db.String(50), nullable=False)
-    color = db.Column(db.String(50), nullable=False)
-    pages = db.Column(db.Integer, nullable=False)
-    price_per_page = db.Column(db.Numeric(10, 2), nullable=False) # Price is still here, for customer's reference
-    item_total = db.Column(db.Numeric(10, 2), nullable=False) # Total for this item
-
-    def to_dict(self):
-        return {
-            'paperType': self.paper_type,
-            'color': self.color,
-            'pages': self.pages,
-            'pricePerPage': float(self.price_per_page),
-            'itemTotal': float(self.item_total)
-        }
-# --- END NEW MODELS ---
-
-# --- Create Database Tables (Run once, or conditionally) ---
-# This ensures tables are created when the application starts for the first time.
-# In a production app, you'd use Flask-Migrate or similar for schema changes.
-with app.app_context():
-    db.create_all()
-
-# --- Import views here to avoid circular imports ---
-# This ensures routes are registered after 'app' and 'db' are defined.
-# The 'views' module will then import 'app' and 'db' from this __init__.py
-import PrintingSystemWeb.views
\ No newline at end of file
+from PrintingSystemWeb.config import get_config
+from PrintingSystemWeb.database import apply_sqlite_pragmas
+from PrintingSystemWeb.models import (
+    db, TransactionHeader, TransactionItem, TransactionIdempotencyKey,
+    CustomerOrderRequest, CustomerOrderItem, StoredFile, DailySalesRollup, ArchivedMonth,
+    ArchivedTransaction, LiveEvent, ReportGeneration, PriceTable
+)
+
+
+# --- Application factory ---
+# Importing the package only defines the models and never touches the
+# database. create_app() builds a configured app; the schema is created or
+# upgraded explicitly with `flask --app PrintingSystemWeb upgrade-db`.
+def create_app(config=None):
+    """
+    Creates the Flask app. `config` is a profile name ('development' or
+    'production'), a config class, or a dict of settings applied on top of
+    the default profile. Without it the profile comes from
+    PRINTING_SYSTEM_CONFIG; the file named in PRINTING_SYSTEM_SETTINGS is
+    applied before any dict overrides.
+    """
+    app = Flask(__name__)
+    if config is None or isinstance(config, str):
+        app.config.from_object(get_config(config))
+    elif isinstance(config, dict):
+        app.config.from_object(get_config())
+    else:
+        app.config.from_object(config)
+    app.config.from_envvar('PRINTING_SYSTEM_SETTINGS', silent=True)
+    if isinstance(config, dict):
+        app.config.from_mapping(config)
+
+    db.init_app(app)
+    # Connection pragmas (WAL, busy_timeout, ...) must be hooked in before the first connection is made
+    with app.app_context():
+        apply_sqlite_pragmas(db.engine, app.config['SQLITE_PRAGMAS'])
+
+    # Imported here so that importing the package for its models stays cheap
+    from PrintingSystemWeb.cache import report_cache
+    from PrintingSystemWeb.pricing import price_book
+    from PrintingSystemWeb.events import event_broker
+    from PrintingSystemWeb.instrumentation import log_pipeline, request_metrics
+    from PrintingSystemWeb.serialization import make_json_provider
+    from PrintingSystemWeb.uploads import content_store, page_counter
+    from PrintingSystemWeb.archive import segment_archive
+    from PrintingSystemWeb.assets import asset_manifest
+    from PrintingSystemWeb.views import bp as views_bp
+    from PrintingSystemWeb.commands import bp as commands_bp
+
+    app.json = make_json_provider(app)
+    log_pipeline.init_app(app)
+    request_metrics.init_app(app)
+    report_cache.init_app(app)
+    price_book.init_app(app)
+    event_broker.init_app(app)
+    content_store.init_app(app)
+    page_counter.init_app(app)
+    segment_archive.init_app(app)
+    asset_manifest.init_app(app)
+
+    app.register_blueprint(views_bp)
+    app.register_blueprint(commands_bp)
+    return app
@@ -0,0 +1,639 @@
+# PrintingSystemWeb/archive.py
+
+import heapq
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import zlib
+from array import array
+from collections import OrderedDict
+from datetime import date, time, timedelta
+
+from PrintingSystemWeb import (
+    db, TransactionHeader, TransactionItem, TransactionIdempotencyKey, ArchivedMonth, ArchivedTransaction
+)
+from PrintingSystemWeb.cache import mark_reports_stale
+from PrintingSystemWeb.pagination import decode_cursor, seek_before
+from PrintingSystemWeb.serialization import RECORD_COLUMNS, select_records
+
+
+# --- Month archive ---
+# Closed months can be moved out of transaction_header/transaction_item into
+# one segment file per month, leaving only the month's totals (ArchivedMonth)
+# and its daily rollup rows in SQLite. The live tables stay small, so writes
+# and index maintenance stay fast however long the shop has been running.
+#
+# Reads combine both sides: SQL queries over the live tables simply no longer
+# see archived rows, and the archive adds its part. Totals over whole archived
+# months come from ArchivedMonth; partial months and record pages come from
+# the segment. Rows inserted later with a date in an archived month (e.g. an
+# old records.csv import) stay in the live tables and are merged in.
+# Archived transaction IDs and idempotency keys move to ArchivedTransaction,
+# so imports and resent batches still recognise those transactions.
+
+
+class ArchiveError(RuntimeError):
+    """Raised when a month cannot be archived or restored, or a segment file is unreadable."""
+
+
+def month_key(day):
+    return f"{day.year:04}-{day.month:02}"
+
+
+def month_bounds(key):
+    """First and last day of the month 'YYYY-MM'."""
+    year, month = map(int, key.split('-'))
+    first = date(year, month, 1)
+    next_month = date(year + month // 12, month % 12 + 1, 1)
+    return first, next_month - timedelta(days=1)
+
+
+# --- Segment files ---
+# Layout: MAGIC, a little-endian uint32 header length, a JSON header, then one
+# zlib-compressed block per column. Rows are in report order (date, time,
+# item_id descending) and every day's rows are contiguous; the header maps
+# each day to its row range, so a date range is a slice found without
+# decoding anything. The file is memory-mapped and a column is inflated only
+# when a read needs it: summaries touch 6 of the 11 columns, counts none.
+
+MAGIC = b'PSWSEG01'
+_HEADER_LENGTH = struct.Struct('<I')
+
+# Column name -> encoding: an array typecode, 'str' ('\n'-joined UTF-8) or
+# 'dict' (values listed in the header, one uint8 code per row)
+SEGMENT_COLUMNS = {
+    'transaction_id': 'str',
+    'day': 'B',
+    'time': 'str', # As stored by SQLite, so ordering and cursors match the live rows
+    'paper_type': 'dict',
+    'color': 'dict',
+    'pages': 'I',
+    'price_per_page_cents': 'q',
+    'item_total_cents': 'q',
+    'item_id': 'q',
+    'transaction_total_cents': 'q',
+    'first_item': 'B', # 1 on a transaction's lowest item_id: SUM() counts transactions
+}
+# Segment row tuples: RECORD_COLUMNS order, then transaction_total_cents and first_item
+SEGMENT_ROW_FIELDS = ('transaction_id', 'date', 'time', 'paper_type', 'color', 'pages',
+                      'price_per_page_cents', 'item_total_cents', 'item_id', 'transaction_total_cents')
+
+
+def _sort_key(row):
+    return row[1], row[2], row[8] # (date text, time text, item_id), the report order
+
+
+def write_segment(path, key, rows):
+    """
+    Writes `rows` (SEGMENT_ROW_FIELDS tuples of month `key`) to a new segment
+    file at `path`. Returns the month's totals, as stored on ArchivedMonth.
+    """
+    rows = sorted(rows, key=_sort_key, reverse=True)
+    first_item_ids = {}
+    for row in rows:
+        first_item_ids[row[0]] = min(row[8], first_item_ids.get(row[0], row[8]))
+
+    values = {name: [] for name in SEGMENT_COLUMNS}
+    days = {}
+    totals = {'item_count': len(rows), 'transaction_count': 0, 'pages': 0, 'revenue_cents': 0,
+              'type_pages': {}, 'color_pages': {}}
+    for index, (transaction_id, date_text, time_text, paper_type, color, pages, price_cents,
+                total_cents, item_id, transaction_total_cents) in enumerate(rows):
+        if not date_text.startswith(key):
+            raise ArchiveError(f"Row {item_id} dated {date_text} does not belong to {key}")
+        day = int(date_text[8:10])
+        days.setdefault(day, [index, index])[1] = index + 1
+        is_first = int(first_item_ids[transaction_id] == item_id)
+        for name, value in zip(SEGMENT_COLUMNS, (transaction_id, day, time_text, paper_type, color, pages, price_cents,
+                                                total_cents, item_id, transaction_total_cents, is_first)):
+            values[name].append(value)
+        totals['transaction_count'] += is_first
+        totals['pages'] += pages
+        totals['revenue_cents'] += total_cents
+        totals['type_pages'][paper_type.lower()] = totals['type_pages'].get(paper_type.lower(), 0) + pages
+        totals['color_pages'][color.lower()] = totals['color_pages'].get(color.lower(), 0) + pages
+
+    header = {'version': 1, 'month': key, 'rows': len(rows), 'byteorder': sys.byteorder,
+              'days': {str(day): bounds for day, bounds in days.items()}, 'columns': {}}
+    blocks = []
+    for name, encoding in SEGMENT_COLUMNS.items():
+        column = {'encoding': encoding}
+        if encoding == 'str':
+            raw = '\n'.join(values[name]).encode('utf-8')
+        elif encoding == 'dict':
+            column['values'] = sorted(set(values[name]))
+            codes = {value: code for code, value in enumerate(column['values'])}
+            raw = array('B', [codes[value] for value in values[name]]).tobytes()
+        else:
+            column['itemsize'] = array(encoding).itemsize
+            raw = array(encoding, values[name]).tobytes()
+        block = zlib.compress(raw, 6)
+        header['columns'][name] = column
+        blocks.append((column, block))
+
+    # Block offsets depend on the header's own length: lay it out until it fits
+    # the space reserved for it (padded with spaces, which JSON ignores)
+    header_bytes = b''
+    while True:
+        offset = len(MAGIC) + _HEADER_LENGTH.size + len(header_bytes)
+        for column, block in blocks:
+            column['offset'], column['length'] = offset, len(block)
+            offset += len(block)
+        encoded = json.dumps(header, separators=(',', ':')).encode('utf-8')
+        if len(encoded) <= len(header_bytes):
+            header_bytes = encoded.ljust(len(header_bytes))
+            break
+        header_bytes = encoded
+
+    with open(path, 'wb') as f:
+        f.write(MAGIC + _HEADER_LENGTH.pack(len(header_bytes)) + header_bytes)
+        for _, block in blocks:
+            f.write(block)
+        f.flush()
+        os.fsync(f.fileno())
+    return totals
+
+
+class Segment:
+    """A read-only, memory-mapped segment file; columns are inflated on first use and kept."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            raise ArchiveError(f"{path} is not a segment file")
+        (header_length,) = _HEADER_LENGTH.unpack_from(self._map, len(MAGIC))
+        start = len(MAGIC) + _HEADER_LENGTH.size
+        self.header = json.loads(self._map[start:start + header_length])
+        self.month = self.header['month']
+        self.row_count = self.header['rows']
+        self.days = {int(day): tuple(bounds) for day, bounds in self.header['days'].items()}
+        self._columns = {}
+
+    def column(self, name):
+        values = self._columns.get(name)
+        if values is None:
+            spec = self.header['columns'][name]
+            raw = zlib.decompress(self._map[spec['offset']:spec['offset'] + spec['length']])
+            encoding = spec['encoding']
+            if encoding == 'str':
+                values = raw.decode('utf-8').split('\n') if self.row_count else []
+            elif encoding == 'dict':
+                lookup = spec['values']
+                values = [lookup[code] for code in raw]
+            else:
+                values = array(encoding)
+                if values.itemsize != spec['itemsize']:
+                    raise ArchiveError(f"{self.path}: column {name} has {spec['itemsize']}-byte items")
+                values.frombytes(raw)
+                if self.header['byteorder'] != sys.byteorder:
+                    values.byteswap()
+            self._columns[name] = values
+        return values
+
+    def day_slice(self, first_day=None, last_day=None):
+        """(start, end) row range of the days first_day..last_day (days of the month, inclusive)."""
+        bounds = [self.days[day] for day in self.days
+                  if (first_day is None or day >= first_day) and (last_day is None or day <= last_day)]
+        if not bounds:
+            return 0, 0
+        return min(start for start, _ in bounds), max(end for _, end in bounds)
+
+    def records(self, start, end):
+        """RECORD_COLUMNS tuples of rows start..end (report order)."""
+        return list(zip(*self._fields(start, end)[:9]))
+
+    def rows(self, start=0, end=None):
+        """SEGMENT_ROW_FIELDS tuples of rows start..end (everything needed to restore them)."""
+        return list(zip(*self._fields(start, self.row_count if end is None else end)))
+
+    def _fields(self, start, end):
+        prefix = self.month + '-'
+        return [
+            self.column('transaction_id')[start:end],
+            [f"{prefix}{day:02}" for day in self.column('day')[start:end]],
+            self.column('time')[start:end],
+            self.column('paper_type')[start:end],
+            self.column('color')[start:end],
+            self.column('pages')[start:end],
+            self.column('price_per_page_cents')[start:end],
+            self.column('item_total_cents')[start:end],
+            self.column('item_id')[start:end],
+            self.column('transaction_total_cents')[start:end],
+        ]
+
+    def bucket_totals(self, start=0, end=None):
+        """
+        {(date text, paper_type, color): [pages, revenue_cents, transaction_count]} for
+        rows start..end, with lower-cased keys like the daily rollup.
+        """
+        end = self.row_count if end is None else end
+        prefix = self.month + '-'
+        buckets = {}
+        for day, paper_type, color, pages, total_cents, first_item in zip(
+                self.column('day')[start:end], self.column('paper_type')[start:end],
+                self.column('color')[start:end], self.column('pages')[start:end],
+                self.column('item_total_cents')[start:end], self.column('first_item')[start:end]):
+            key = (f"{prefix}{day:02}", paper_type.lower(), color.lower())
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = [0, 0, 0]
+            bucket[0] += pages
+            bucket[1] += total_cents
+            bucket[2] += first_item
+        return buckets
+
+
+class SegmentArchive:
+    """Where segment files live (ARCHIVE_DIR), plus a small LRU of open segments."""
+
+    def __init__(self, root=None, max_open=16):
+        self.root = root
+        self.max_open = max_open
+        self._open = OrderedDict() # file name -> Segment
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.root = app.config['ARCHIVE_DIR'] or os.path.join(app.instance_path, 'archive')
+        self.max_open = app.config['ARCHIVE_OPEN_SEGMENTS']
+        self.clear()
+
+    def path_for(self, file_name):
+        return os.path.join(self.root, file_name)
+
+    def segment(self, file_name):
+        # Segment files are never modified in place (a re-archived month gets a
+        # new file name), so an open segment never goes stale
+        with self._lock:
+            segment = self._open.get(file_name)
+            if segment is not None:
+                self._open.move_to_end(file_name)
+                return segment
+        segment = Segment(self.path_for(file_name))
+        with self._lock:
+            self._open[file_name] = segment
+            while len(self._open) > max(self.max_open, 1):
+                self._open.popitem(last=False) # Unmapped when the last reader drops it
+        return segment
+
+    def forget(self, file_name):
+        with self._lock:
+            self._open.pop(file_name, None)
+
+    def clear(self):
+        with self._lock:
+            self._open.clear()
+
+
+segment_archive = SegmentArchive()
+
+
+# --- Reading across the live tables and the archive ---
+def _archived_months(session, from_date=None, to_date=None):
+    query = session.query(ArchivedMonth)
+    if from_date is not None:
+        query = query.filter(ArchivedMonth.month >= month_key(from_date))
+    if to_date is not None:
+        query = query.filter(ArchivedMonth.month <= month_key(to_date))
+    return query.order_by(ArchivedMonth.month.desc()).all()
+
+
+def _days_in_range(key, from_date, to_date):
+    """The month's days within from_date..to_date: (first day, last day), either None when not cut off."""
+    first, last = month_bounds(key)
+    first_day = from_date.day if from_date is not None and from_date > first else None
+    last_day = to_date.day if to_date is not None and to_date < last else None
+    return first_day, last_day
+
+
+def archived_totals(from_date=None, to_date=None, session=None):
+    """
+    Sales totals of the archived rows between two dates (inclusive, None
+    means unbounded): {'revenue_cents', 'pages', 'transactions', 'items',
+    'type_pages', 'color_pages'}. Whole months are read from ArchivedMonth;
+    only a month cut by the range opens its segment.
+    """
+    session = session or db.session
+    totals = {'revenue_cents': 0, 'pages': 0, 'transactions': 0, 'items': 0, 'type_pages': {}, 'color_pages': {}}
+    for archived in _archived_months(session, from_date, to_date):
+        first_day, last_day = _days_in_range(archived.month, from_date, to_date)
+        if first_day is None and last_day is None:
+            totals['revenue_cents'] += archived.revenue_cents
+            totals['pages'] += archived.pages
+            totals['transactions'] += archived.transaction_count
+            totals['items'] += archived.item_count
+            type_pages, color_pages = json.loads(archived.type_pages), json.loads(archived.color_pages)
+        else:
+            segment = segment_archive.segment(archived.file_name)
+            start, end = segment.day_slice(first_day, last_day)
+            type_pages, color_pages = {}, {}
+            for (_, paper_type, color), (pages, revenue_cents, transactions) in segment.bucket_totals(start, end).items():
+                totals['revenue_cents'] += revenue_cents
+                totals['pages'] += pages
+                totals['transactions'] += transactions
+                type_pages[paper_type] = type_pages.get(paper_type, 0) + pages
+                color_pages[color] = color_pages.get(color, 0) + pages
+            totals['items'] += end - start
+        for name, pages in type_pages.items():
+            totals['type_pages'][name] = totals['type_pages'].get(name, 0) + pages
+        for name, pages in color_pages.items():
+            totals['color_pages'][name] = totals['color_pages'].get(name, 0) + pages
+    return totals
+
+
+def archived_buckets(session=None):
+    """
+    Yields, per archived month, its daily rollup buckets:
+    {(date, paper_type, color): {'pages', 'revenue_cents', 'transaction_count'}}.
+    """
+    session = session or db.session
+    for archived in _archived_months(session):
+        yield {(date.fromisoformat(day), paper_type, color): {'pages': pages, 'revenue_cents': revenue_cents,
+                                                              'transaction_count': transactions}
+               for (day, paper_type, color), (pages, revenue_cents, transactions)
+               in segment_archive.segment(archived.file_name).bucket_totals().items()}
+
+
+class RecordPage:
+    """One page of a RecordRange; `items` are RECORD_COLUMNS tuples (see serialization.serialize_records)."""
+
+    def __init__(self, items, page, per_page, total):
+        self.items = items
+        self.page = page
+        self.per_page = per_page
+        self.total = total
+        self.pages = -(-total // per_page) if total else 0
+
+
+class RecordRange:
+    """
+    The transaction items between two dates, live and archived, newest first:
+    what filter_records_by_date() returns. The range is split into months;
+    each month's rows come from the live tables, its segment, or (for late
+    rows in an archived month) a merge of both.
+    """
+
+    def __init__(self, from_date, to_date, session=None):
+        self.from_date = from_date
+        self.to_date = to_date
+        self.session = session or db.session
+        self._months = None
+
+    def _live_query(self, first, last):
+        return select_records().filter(
+            TransactionHeader.transaction_date >= first,
+            TransactionHeader.transaction_date <= last
+        )
+
+    def months(self):
+        """[(key, first date, last date, live row count, segment or None, segment start, segment end)], newest first."""
+        if self._months is None:
+            month_column = db.func.strftime('%Y-%m', TransactionHeader.transaction_date)
+            live_counts = dict(self.session.query(month_column, db.func.count(TransactionItem.item_id)).select_from(
+                TransactionItem
+            ).join(TransactionHeader).filter(
+                TransactionHeader.transaction_date >= self.from_date,
+                TransactionHeader.transaction_date <= self.to_date
+            ).group_by(month_column).all())
+            archived = {row.month: row for row in _archived_months(self.session, self.from_date, self.to_date)}
+
+            months = []
+            for key in sorted(set(live_counts) | set(archived), reverse=True):
+                first, last = month_bounds(key)
+                first, last = max(first, self.from_date), min(last, self.to_date)
+                segment, start, end = None, 0, 0
+                if key in archived:
+                    segment = segment_archive.segment(archived[key].file_name)
+                    start, end = segment.day_slice(first.day, last.day)
+                months.append((key, first, last, live_counts.get(key, 0), segment, start, end))
+            self._months = months
+        return self._months
+
+    def count(self):
+        return sum(live + end - start for _, _, _, live, _, start, end in self.months())
+
+    def _month_rows(self, first, last, live, segment, start, end, offset, limit):
+        if not live:
+            return segment.records(start + offset, min(end, start + offset + limit))
+        live_rows = self.session.execute(self._live_query(first, last).offset(0 if segment else offset).limit(
+            offset + limit if segment else limit)).all()
+        if segment is None:
+            return live_rows
+        archived_rows = segment.records(start, min(end, start + offset + limit))
+        merged = heapq.merge(live_rows, archived_rows, key=_sort_key, reverse=True)
+        return list(merged)[offset:offset + limit]
+
+    def paginate(self, page, per_page):
+        """One RecordPage; `page` is clamped to at least 1, like Flask-SQLAlchemy's paginate(error_out=False)."""
+        page, per_page = max(page, 1), max(per_page, 1)
+        offset, remaining = (page - 1) * per_page, per_page
+        items = []
+        for _, first, last, live, segment, start, end in self.months():
+            size = live + end - start
+            if offset >= size:
+                offset -= size
+                continue
+            rows = self._month_rows(first, last, live, segment, start, end, offset, min(remaining, size - offset))
+            items += rows
+            remaining -= len(rows)
+            offset = 0
+            if remaining <= 0:
+                break
+        return RecordPage(items, page, per_page, self.count())
+
+    def page_after(self, limit, cursor=None):
+        """
+        Up to `limit` records that sort after `cursor` (keyset pagination, see
+        pagination.py), from the newest one without a cursor. One LIMIT query
+        over the live tables; a segment is opened only for an archived month
+        that reaches past the live rows found.
+        """
+        query = self._live_query(self.from_date, self.to_date)
+        after = None
+        if cursor:
+            query, after = seek_before(query, cursor), decode_cursor(cursor)
+        rows = self.session.execute(query.limit(limit)).all()
+        floor = _sort_key(rows[-1]) if len(rows) == limit else None
+
+        archived_rows = []
+        for archived in _archived_months(self.session, self.from_date, self.to_date):
+            first, last = month_bounds(archived.month)
+            first, last = max(first, self.from_date), min(last, self.to_date)
+            if after is not None:
+                last = min(last, date.fromisoformat(after[0]))
+            if first > last:
+                continue
+            if len(archived_rows) >= limit or (floor is not None and last.isoformat() < floor[0]):
+                break # Months are newest first: nothing older can make the page
+            segment = segment_archive.segment(archived.file_name)
+            start, end = segment.day_slice(first.day, last.day)
+            if after is not None and last.isoformat() == after[0]:
+                # Skip the cursor day's rows up to and including the cursor
+                day_start, day_end = segment.day_slice(last.day, last.day)
+                start += sum(1 for row in segment.records(day_start, day_end) if _sort_key(row) >= after)
+            archived_rows += segment.records(start, min(end, start + limit - len(archived_rows)))
+        if not archived_rows:
+            return rows
+        return list(heapq.merge(rows, archived_rows, key=_sort_key, reverse=True))[:limit]
+
+    def iter_records(self, batch_size=1000):
+        """Yields every record of the range as RECORD_COLUMNS tuples, newest first, batch_size rows per fetch."""
+        for _, first, last, live, segment, start, end in self.months():
+            archived = (row for position in range(start, end, batch_size)
+                        for row in segment.records(position, min(end, position + batch_size))) if segment else ()
+            if live:
+                result = self.session.execute(self._live_query(first, last), execution_options={'yield_per': batch_size})
+                yield from heapq.merge(result, archived, key=_sort_key, reverse=True) if segment else result
+            else:
+                yield from archived
+
+
+# --- Archiving and restoring ---
+def archivable_months(keep_months, today=None, session=None):
+    """Months with live rows that are older than the `keep_months` most recent ones (the current month counts)."""
+    session = session or db.session
+    today = today or date.today()
+    first_kept = today.replace(day=1)
+    for _ in range(max(keep_months, 1) - 1):
+        first_kept = (first_kept - timedelta(days=1)).replace(day=1)
+    month_column = db.func.strftime('%Y-%m', TransactionHeader.transaction_date)
+    return [key for (key,) in session.query(month_column).filter(
+        TransactionHeader.transaction_date < first_kept
+    ).group_by(month_column).order_by(month_column).all()]
+
+
+def archive_month(key, session=None):
+    """
+    Moves every live transaction of month `key` ('YYYY-MM') into its segment
+    file (merged with the rows already archived for it) and records the
+    month's totals. The file is written under a new name before the database
+    commit, so a failure at any point leaves the live rows and any previous
+    segment untouched. Returns the number of rows moved out of the live tables.
+    """
+    session = session or db.session
+    first, last = month_bounds(key)
+    rows = session.execute(db.select(*RECORD_COLUMNS, TransactionHeader.total_amount_cents).select_from(
+        TransactionItem
+    ).join(TransactionHeader).filter(
+        TransactionHeader.transaction_date >= first,
+        TransactionHeader.transaction_date <= last
+    )).all()
+    if not rows:
+        return 0
+    previous = session.get(ArchivedMonth, key)
+    previous_file_name = previous.file_name if previous else None
+    archived_rows = segment_archive.segment(previous_file_name).rows() if previous else []
+
+    os.makedirs(segment_archive.root, exist_ok=True)
+    file_name = f"{key}.{os.urandom(4).hex()}.seg"
+    path = segment_archive.path_for(file_name)
+    try:
+        totals = write_segment(path, key, [tuple(row) for row in rows] + archived_rows)
+        header_ids = db.select(TransactionHeader.id).filter(
+            TransactionHeader.transaction_date >= first,
+            TransactionHeader.transaction_date <= last
+        )
+        session.execute(db.insert(ArchivedTransaction).from_select(
+            ['id', 'month', 'idempotency_key'],
+            db.select(TransactionHeader.id, db.literal(key), TransactionIdempotencyKey.key).outerjoin(
+                TransactionIdempotencyKey, TransactionIdempotencyKey.transaction_header_id == TransactionHeader.id
+            ).filter(TransactionHeader.id.in_(header_ids))
+        ))
+        session.execute(db.delete(TransactionIdempotencyKey).where(
+            TransactionIdempotencyKey.transaction_header_id.in_(header_ids)))
+        session.execute(db.delete(TransactionItem).where(TransactionItem.transaction_header_id.in_(header_ids)))
+        session.execute(db.delete(TransactionHeader).where(TransactionHeader.id.in_(header_ids)))
+        archived = previous or ArchivedMonth(month=key)
+        archived.file_name = file_name
+        archived.type_pages = json.dumps(totals.pop('type_pages'), sort_keys=True)
+        archived.color_pages = json.dumps(totals.pop('color_pages'), sort_keys=True)
+        for name, value in totals.items():
+            setattr(archived, name, value)
+        session.add(archived)
+        mark_reports_stale(session)
+        session.commit()
+    except Exception:
+        session.rollback()
+        _remove_segment(file_name)
+        raise
+    if previous_file_name is not None:
+        _remove_segment(previous_file_name)
+    return len(rows)
+
+
+def restore_month(key, session=None):
+    """
+    Moves an archived month back into the live tables (idempotency keys
+    included) and drops its segment file, ArchivedMonth and
+    ArchivedTransaction rows. Returns the number of rows restored.
+    Items get new item_ids: SQLite may have handed the archived ones to
+    later sales (item_id has no AUTOINCREMENT). They are inserted in their
+    original order, so the report order within a month stays the same.
+    """
+    session = session or db.session
+    archived = session.get(ArchivedMonth, key)
+    if archived is None:
+        raise ArchiveError(f"{key} is not archived")
+    file_name = archived.file_name
+    headers, items = {}, []
+    for (transaction_id, date_text, time_text, paper_type, color, pages, price_cents, total_cents,
+         item_id, transaction_total_cents) in sorted(segment_archive.segment(file_name).rows(), key=lambda row: row[8]):
+        headers.setdefault(transaction_id, {
+            'id': transaction_id,
+            'transaction_date': date.fromisoformat(date_text),
+            'transaction_time': time.fromisoformat(time_text),
+            'total_amount_cents': transaction_total_cents
+        })
+        items.append({'transaction_header_id': transaction_id, 'paper_type': paper_type,
+                      'color': color, 'pages': pages, 'price_per_page_cents': price_cents,
+                      'item_total_cents': total_cents})
+    keys = [{'key': idempotency_key, 'transaction_header_id': transaction_id}
+            for transaction_id, idempotency_key in session.query(
+                ArchivedTransaction.id, ArchivedTransaction.idempotency_key
+            ).filter(ArchivedTransaction.month == key, ArchivedTransaction.idempotency_key.is_not(None))]
+    try:
+        connection = session.connection() # Core executemany, as in the CSV import
+        if headers:
+            connection.execute(TransactionHeader.__table__.insert(), list(headers.values()))
+            connection.execute(TransactionItem.__table__.insert(), items)
+        if keys:
+            connection.execute(TransactionIdempotencyKey.__table__.insert(), keys)
+        session.query(ArchivedTransaction).filter(ArchivedTransaction.month == key).delete()
+        session.delete(archived)
+        mark_reports_stale(session)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    _remove_segment(file_name)
+    return len(items)
+
+
+def remove_archive(session=None):
+    """
+    Deletes every ArchivedMonth and ArchivedTransaction row (the caller
+    commits, then passes the returned file names to remove_segments()).
+    """
+    session = session or db.session
+    file_names = [file_name for (file_name,) in session.query(ArchivedMonth.file_name).all()]
+    session.query(ArchivedTransaction).delete()
+    session.query(ArchivedMonth).delete()
+    return file_names
+
+
+def remove_segments(file_names):
+    """Deletes segment files once the rows pointing at them are gone."""
+    for file_name in file_names:
+        _remove_segment(file_name)
+
+
+def _remove_segment(file_name):
+    segment_archive.forget(file_name)
+    try:
+        os.remove(segment_archive.path_for(file_name))
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,357 @@
+# PrintingSystemWeb/assets.py
+
+import gzip
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+
+from flask import current_app, request, send_from_directory, url_for
+
+try:
+    import brotli
+except ImportError: # Optional: without it only .gz variants are built
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+
+# --- Static asset build ---
+# `flask build-assets` minifies the scripts and stylesheets below, names each
+# result after its content hash (js/script.js -> dist/js/script.3f9a1c2b7d.js)
+# and writes .gz (and, with the brotli package, .br) variants next to it. A
+# hashed file never changes, so browsers may cache it for a year without
+# revalidating; a new build gets new names. dist/manifest.json maps every
+# source name to its built file for asset_url().
+
+BUILD_DIR = 'dist' # Inside the static folder
+MANIFEST_NAME = 'manifest.json'
+HASH_LENGTH = 10
+
+# Source files (relative to the static folder) -> upstream minified build used
+# instead of our own minifier, where the library ships one
+ASSET_SOURCES = {
+    'scripts/jquery-1.10.2.js': 'scripts/jquery-1.10.2.min.js',
+    'scripts/bootstrap.js': 'scripts/bootstrap.min.js',
+    'scripts/modernizr-2.6.2.js': None,
+    'content/bootstrap.css': 'content/bootstrap.min.css',
+    'css/style.css': None,
+    'js/script.js': None,
+    'js/report_script.js': None,
+    'js/shop_orders_script.js': None,
+    'js/customer_order_script.js': None,
+}
+# Content-Encoding -> file suffix of the precompressed variant, in order of preference
+ENCODINGS = {'br': '.br', 'gzip': '.gz'}
+
+
+# --- Minifiers ---
+# Deliberately conservative: comments and indentation are dropped and runs of
+# whitespace collapsed, but line breaks are kept (so automatic semicolon
+# insertion behaves exactly as in the source) and nothing is renamed. Strings,
+# template literals and regular expressions are copied untouched. gzip/brotli
+# then do most of the work.
+
+# Keywords after which '/' starts a regular expression rather than a division
+_REGEX_KEYWORDS = {'return', 'typeof', 'instanceof', 'in', 'of', 'new', 'delete', 'void', 'throw',
+                   'case', 'do', 'else', 'yield', 'await'}
+
+
+def _is_word_char(char):
+    return bool(char) and (char.isalnum() or char in '_$\\' or ord(char) > 127)
+
+
+class _JsWriter:
+    """Collects minified output, inserting a space or line break only where one is needed."""
+
+    def __init__(self):
+        self.parts = []
+        self.last = '' # Last character written
+        self.last_literal = False # Whether the last thing written was a string/template/regex
+        self.pending_space = False
+        self.pending_newline = False
+
+    def whitespace(self, newline=False):
+        self.pending_space = True
+        self.pending_newline = self.pending_newline or newline
+
+    def _separate(self, first):
+        if self.parts:
+            if self.pending_newline:
+                self.parts.append('\n')
+            elif self.pending_space and (
+                    (_is_word_char(self.last) and (_is_word_char(first) or (first == '.' and self.last.isdigit())))
+                    or (self.last == first and first in '+-') or (self.last == '/' and first in '/*')):
+                self.parts.append(' ')
+        self.pending_space = self.pending_newline = False
+
+    def code(self, char):
+        self._separate(char)
+        self.parts.append(char)
+        self.last, self.last_literal = char, False
+
+    def literal(self, text):
+        self._separate(text[0])
+        self.parts.append(text)
+        self.last, self.last_literal = text[-1], True
+
+    def regex_allowed(self):
+        """Whether a '/' here starts a regular expression (judged from what precedes it)."""
+        if self.last_literal or self.last in (')', ']'):
+            return False
+        if _is_word_char(self.last):
+            word = []
+            for part in reversed(self.parts):
+                if len(part) != 1 or not _is_word_char(part):
+                    break
+                word.append(part)
+            return ''.join(reversed(word)) in _REGEX_KEYWORDS
+        return True
+
+    def text(self):
+        return ''.join(self.parts) + '\n'
+
+
+def _scan_quoted(source, start, quote):
+    """Index just past the string or regex body opened at `start` and closed by an unescaped `quote`."""
+    position, in_class = start + 1, False
+    while position < len(source):
+        char = source[position]
+        if char == '\\':
+            position += 2
+            continue
+        if quote == '/' and char == '[':
+            in_class = True
+        elif quote == '/' and char == ']':
+            in_class = False
+        elif char == quote and not in_class:
+            return position + 1
+        elif char == '\n' and quote != '`':
+            break
+        position += 1
+    raise ValueError(f"Unterminated literal at offset {start}")
+
+
+def minify_js(source):
+    """Minifies JavaScript source (see above); raises ValueError on an unterminated string or comment."""
+    out = _JsWriter()
+    # One entry per open template literal: the brace depth its current ${...} started at
+    templates, depth = [], 0
+    position, length = 0, len(source)
+    while position < length:
+        char = source[position]
+        following = source[position + 1:position + 2]
+        if char in ' \t\r\n\f\v\ufeff':
+            out.whitespace(newline=char == '\n')
+            position += 1
+        elif char == '/' and following == '/':
+            end = source.find('\n', position)
+            position = length if end < 0 else end
+        elif char == '/' and following == '*':
+            end = source.find('*/', position + 2)
+            if end < 0:
+                raise ValueError(f"Unterminated comment at offset {position}")
+            comment = source[position:end + 2]
+            if comment.startswith('/*!'): # License header: keep
+                out.whitespace(newline=True)
+                out.literal(comment)
+                out.whitespace(newline=True)
+            else:
+                out.whitespace(newline='\n' in comment)
+            position = end + 2
+        elif char in '\'"' or (char == '/' and out.regex_allowed()):
+            end = _scan_quoted(source, position, char)
+            out.literal(source[position:end])
+            position = end
+        elif char == '`' or (char == '}' and templates and templates[-1] == depth):
+            # Template literal text, up to the closing backtick or the next ${
+            if char == '}':
+                templates.pop()
+            start, position = position, position + 1
+            while position < length and source[position] != '`' and not source.startswith('${', position):
+                position += 2 if source[position] == '\\' else 1
+            if position >= length:
+                raise ValueError(f"Unterminated template literal at offset {start}")
+            if source[position] == '`':
+                position += 1
+                out.literal(source[start:position])
+            else:
+                position += 2
+                out.literal(source[start:position])
+                out.last_literal = False # An expression follows '${'
+                templates.append(depth)
+        else:
+            if char == '{':
+                depth += 1
+            elif char == '}':
+                depth -= 1
+            out.code(char)
+            position += 1
+    return out.text()
+
+
+def minify_css(source):
+    """
+    Minifies a stylesheet: drops comments (except /*! ... */), whitespace
+    around { } ; , and after :, and the last ';' of each block.
+    """
+    parts, position, length = [], 0, len(source)
+    pending_space = False
+    while position < length:
+        char = source[position]
+        if char.isspace():
+            pending_space = True
+            position += 1
+            continue
+        if source.startswith('/*', position):
+            end = source.find('*/', position + 2)
+            if end < 0:
+                raise ValueError(f"Unterminated comment at offset {position}")
+            if source.startswith('/*!', position):
+                parts.append(source[position:end + 2] + '\n')
+            position = end + 2
+            pending_space = True
+            continue
+        if char in '{};,' and parts and parts[-1] == ' ':
+            parts.pop()
+        if char == '}' and parts and parts[-1] == ';':
+            parts.pop()
+        if pending_space and parts and parts[-1][-1] not in '{};,:\n' and char not in '{};,':
+            parts.append(' ')
+        pending_space = False
+        if char in '\'"':
+            end = _scan_quoted(source, position, char)
+            parts.append(source[position:end])
+            position = end
+        else:
+            parts.append(char)
+            position += 1
+    return ''.join(parts) + '\n'
+
+
+MINIFIERS = {'.js': minify_js, '.css': minify_css}
+
+
+# --- Build ---
+def _write_if_missing(path, data):
+    if not os.path.exists(path):
+        with open(path + '.tmp', 'wb') as f:
+            f.write(data)
+        os.replace(path + '.tmp', path)
+
+
+def build_assets(static_folder, sources=None, clean=False):
+    """
+    Builds every asset of `sources` (default ASSET_SOURCES) into
+    <static_folder>/dist and writes the manifest. Files of earlier builds are
+    kept (pages cached by browsers may still reference them) unless `clean`.
+    Returns {source name: (built name, source bytes, built bytes, gzip bytes, brotli bytes or None)}.
+    """
+    sources = ASSET_SOURCES if sources is None else sources
+    build_root = os.path.join(static_folder, BUILD_DIR)
+    manifest, report, written = {}, {}, {MANIFEST_NAME}
+    for name, minified_name in sources.items():
+        with open(os.path.join(static_folder, name), 'rb') as f:
+            source = f.read()
+        if minified_name:
+            with open(os.path.join(static_folder, minified_name), 'rb') as f:
+                built = f.read()
+        else:
+            stem, extension = os.path.splitext(name)
+            text = source.decode('utf-8-sig') # Some scripts carry a BOM
+            built = MINIFIERS[extension](text).encode('utf-8')
+
+        stem, extension = os.path.splitext(name)
+        digest = hashlib.sha256(built).hexdigest()[:HASH_LENGTH]
+        built_name = f"{stem}.{digest}{extension}"
+        path = os.path.join(build_root, built_name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        _write_if_missing(path, built)
+        gzipped = gzip.compress(built, compresslevel=9, mtime=0) # mtime=0: identical bytes on every build
+        _write_if_missing(path + ENCODINGS['gzip'], gzipped)
+        written.update({built_name, built_name + ENCODINGS['gzip']})
+        compressed = None
+        if brotli is not None:
+            compressed = brotli.compress(built, quality=11)
+            _write_if_missing(path + ENCODINGS['br'], compressed)
+            written.add(built_name + ENCODINGS['br'])
+
+        manifest[name] = f"{BUILD_DIR}/{built_name}"
+        report[name] = (manifest[name], len(source), len(built), len(gzipped), compressed and len(compressed))
+
+    os.makedirs(build_root, exist_ok=True)
+    with open(os.path.join(build_root, MANIFEST_NAME + '.tmp'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(os.path.join(build_root, MANIFEST_NAME + '.tmp'), os.path.join(build_root, MANIFEST_NAME))
+
+    if clean:
+        for directory, _, files in os.walk(build_root):
+            for file_name in files:
+                relative = os.path.relpath(os.path.join(directory, file_name), build_root).replace(os.sep, '/')
+                if relative not in written:
+                    os.remove(os.path.join(directory, file_name))
+    return report
+
+
+# --- Serving ---
+class AssetManifest:
+    """
+    The built assets the app links to and serves. asset_url() in templates
+    returns the hashed URL of a source file (or its plain URL when there is no
+    build, e.g. in development); the static route serves built files with an
+    immutable Cache-Control and their precompressed variant when the browser
+    accepts it. Everything else in the static folder is served as before.
+    """
+
+    def __init__(self):
+        self.manifest = {} # Source name -> built name, relative to the static folder
+        self.variants = {} # Built name -> {encoding: suffix} of its precompressed files
+        self.max_age = 365 * 24 * 3600
+        self._serve_plain = None
+
+    def init_app(self, app):
+        self.max_age = app.config['STATIC_IMMUTABLE_MAX_AGE']
+        self.manifest, self.variants = {}, {}
+        if app.config['ASSETS_USE_BUILD']:
+            self.load(app.static_folder)
+        app.add_template_global(self.asset_url, 'asset_url')
+        self._serve_plain = app.view_functions['static']
+        app.view_functions['static'] = self.serve_static
+
+    def load(self, static_folder):
+        build_root = os.path.join(static_folder, BUILD_DIR)
+        try:
+            with open(os.path.join(build_root, MANIFEST_NAME), encoding='utf-8') as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            logger.warning('no built assets, serving sources (run `flask build-assets`)')
+            return
+        variants = {}
+        for built_name in manifest.values():
+            path = os.path.join(static_folder, built_name)
+            variants[built_name] = {encoding: suffix for encoding, suffix in ENCODINGS.items()
+                                    if os.path.exists(path + suffix)}
+        self.manifest, self.variants = manifest, variants
+
+    def asset_url(self, filename):
+        return url_for('static', filename=self.manifest.get(filename, filename))
+
+    def serve_static(self, filename):
+        variants = self.variants.get(filename)
+        if variants is None:
+            return self._serve_plain(filename=filename)
+        encoding = next((encoding for encoding in variants if request.accept_encodings[encoding] > 0), None)
+        response = send_from_directory(
+            current_app.static_folder, filename + variants[encoding] if encoding else filename,
+            mimetype=mimetypes.guess_type(filename)[0], max_age=self.max_age
+        )
+        if encoding:
+            response.content_encoding = encoding
+        response.vary.add('Accept-Encoding')
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
+
+
+asset_manifest = AssetManifest()
@@ -0,0 +1,230 @@
+# PrintingSystemWeb/bulk.py
+
+from flask import current_app
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import selectinload
+
+from PrintingSystemWeb import (
+    db, TransactionHeader, TransactionItem, TransactionIdempotencyKey, ArchivedTransaction, CustomerOrderRequest
+)
+from PrintingSystemWeb.ids import new_transaction_id
+from PrintingSystemWeb.rollup import record_transactions_in_rollup
+from PrintingSystemWeb.pricing import price_items, PricingError
+
+KEY_QUERY_CHUNK_SIZE = 500 # Keys per IN (...) lookup, well under SQLite's bound-parameter limit
+MAX_IDEMPOTENCY_KEY_LENGTH = 100
+
+
+# --- Batch confirmation for /confirm-transactions ---
+def _key_owners(key_column, transaction_id_column, keys, session):
+    """{key: transaction ID} for the `keys` found in key_column, looked up in chunks."""
+    owners = {}
+    for start in range(0, len(keys), KEY_QUERY_CHUNK_SIZE):
+        owners.update(session.query(key_column, transaction_id_column).filter(
+            key_column.in_(keys[start:start + KEY_QUERY_CHUNK_SIZE])))
+    return owners
+
+
+def confirm_transactions_batch(transactions, session=None):
+    """
+    Saves a batch of transactions submitted by a terminal, each with a
+    client-generated 'idempotencyKey'. Transactions whose key was already
+    used (earlier or in this batch) are skipped and report the existing
+    transaction ID. Everything is inserted with executemany in the caller's
+    transaction; the caller commits.
+    Returns (results, created): one result dict per submitted transaction, and
+    the new transactions as (transaction_id, timestamp, items) tuples.
+    """
+    session = session or db.session
+    results = [None] * len(transactions)
+    pending = [] # (index, key, items, total_cents, transaction_id, timestamp)
+    keys_in_batch = {}
+
+    for index, transaction in enumerate(transactions):
+        key = transaction.get('idempotencyKey') if isinstance(transaction, dict) else None
+        if not isinstance(key, str) or not key or len(key) > MAX_IDEMPOTENCY_KEY_LENGTH:
+            results[index] = {'idempotencyKey': key, 'status': 'invalid',
+                              'message': 'Missing or invalid idempotencyKey.'}
+            continue
+        try:
+            items, total_cents = price_items(
+                transaction.get('items'), allow_overrides=current_app.config['ALLOW_COUNTER_PRICE_OVERRIDES'], session=session
+            )
+        except PricingError as e:
+            results[index] = {'idempotencyKey': key, 'status': 'invalid', 'message': str(e)}
+            continue
+        if key in keys_in_batch:
+            results[index] = {'idempotencyKey': key, 'status': 'duplicate'} # transactionId filled in below
+            continue
+        transaction_id, timestamp = new_transaction_id()
+        keys_in_batch[key] = transaction_id
+        pending.append((index, key, items, total_cents, transaction_id, timestamp))
+
+    if not pending:
+        return results, []
+
+    # Keys of transactions moved into the month archive are no longer in
+    # transaction_idempotency_key; they are duplicates as well
+    owners = _key_owners(ArchivedTransaction.idempotency_key, ArchivedTransaction.id, list(keys_in_batch), session)
+
+    # Claim the other keys. This is the batch's first write, so it takes SQLite's
+    # write lock and concurrent batches queue up here; ON CONFLICT DO NOTHING leaves
+    # keys that another request already owns untouched.
+    claims = [{'key': key, 'transaction_header_id': transaction_id}
+              for key, transaction_id in keys_in_batch.items() if key not in owners]
+    if claims:
+        claim = sqlite_insert(TransactionIdempotencyKey).on_conflict_do_nothing(index_elements=['key'])
+        session.execute(claim, claims)
+        owners.update(_key_owners(TransactionIdempotencyKey.key, TransactionIdempotencyKey.transaction_header_id,
+                                  [claim['key'] for claim in claims], session))
+
+    headers, items_rows, rollup_entries, created = [], [], [], []
+    for index, key, items, total_cents, transaction_id, timestamp in pending:
+        if owners[key] != transaction_id:
+            results[index] = {'idempotencyKey': key, 'status': 'duplicate', 'transactionId': owners[key]}
+            continue
+        headers.append({
+            'id': transaction_id,
+            'transaction_date': timestamp.date(),
+            'transaction_time': timestamp.time(),
+            'total_amount_cents': total_cents
+        })
+        items_rows += [{
+            'transaction_header_id': transaction_id,
+            'paper_type': paper_type,
+            'color': color,
+            'pages': pages,
+            'price_per_page_cents': price_per_page_cents,
+            'item_total_cents': item_total_cents
+        } for paper_type, color, pages, price_per_page_cents, item_total_cents in items]
+        rollup_entries.append((timestamp.date(), [
+            (paper_type, color, pages, item_total_cents) for paper_type, color, pages, _, item_total_cents in items
+        ]))
+        results[index] = {'idempotencyKey': key, 'status': 'created', 'transactionId': transaction_id}
+        created.append((transaction_id, timestamp, items))
+
+    for result in results:
+        if result['status'] == 'duplicate' and 'transactionId' not in result:
+            result['transactionId'] = owners[result['idempotencyKey']]
+
+    if headers:
+        session.execute(db.insert(TransactionHeader), headers)
+        session.execute(db.insert(TransactionItem), items_rows)
+        record_transactions_in_rollup(rollup_entries, session=session)
+    return results, created
+
+
+# --- Bulk processing of the customer order queue ---
+# Used by /process-orders and /reject-orders. Orders are selected by a list of
+# request IDs or by status. Only Pending orders are processed or rejected;
+# any other order is skipped with its current status as the reason.
+
+def _load_orders(request_ids, status, limit, with_items, session):
+    """Loads the selected orders (plus their items with one extra query) and the requested IDs that do not exist."""
+    query = session.query(CustomerOrderRequest)
+    if with_items:
+        query = query.options(selectinload(CustomerOrderRequest.items))
+    if request_ids is not None:
+        orders = query.filter(CustomerOrderRequest.request_id.in_(request_ids)).all()
+        found = {order.request_id for order in orders}
+        missing = [request_id for request_id in dict.fromkeys(request_ids) if request_id not in found]
+        return sorted(orders, key=lambda order: (order.request_date, order.request_id)), missing
+    orders = query.filter(CustomerOrderRequest.status == status).order_by(
+        CustomerOrderRequest.request_date, CustomerOrderRequest.request_id
+    ).limit(limit).all()
+    return orders, []
+
+
+def _claim_orders(orders, new_status, session):
+    """
+    Sets `new_status` on the orders with a single UPDATE and returns the IDs it
+    changed. The status guard skips orders another request handled after
+    they were loaded, so each order leaves Pending only once.
+    """
+    if not orders:
+        return set()
+    result = session.execute(
+        db.update(CustomerOrderRequest)
+        .where(CustomerOrderRequest.request_id.in_([order.request_id for order in orders]))
+        .where(CustomerOrderRequest.status == 'Pending')
+        .values(status=new_status)
+        .returning(CustomerOrderRequest.request_id)
+        .execution_options(synchronize_session=False)
+    )
+    return {request_id for (request_id,) in result}
+
+
+def _update_orders(new_status, request_ids, status, limit, with_items, session):
+    orders, missing = _load_orders(request_ids, status, limit, with_items, session)
+    skipped = [{'requestId': request_id, 'reason': 'not found'} for request_id in missing]
+    pending = []
+    for order in orders:
+        if order.status == 'Pending':
+            pending.append(order)
+        else:
+            skipped.append({'requestId': order.request_id, 'reason': f'already {order.status.lower()}'})
+
+    claimed = _claim_orders(pending, new_status, session)
+    lost = [order.request_id for order in pending if order.request_id not in claimed]
+    if lost: # Handled by another request in between: report the status it left them in
+        skipped += [{'requestId': request_id, 'reason': f'already {current_status.lower()}'}
+                    for request_id, current_status in session.query(
+                        CustomerOrderRequest.request_id, CustomerOrderRequest.status
+                    ).filter(CustomerOrderRequest.request_id.in_(lost))]
+    return [order for order in pending if order.request_id in claimed], skipped
+
+
+def process_orders_batch(request_ids=None, status=None, limit=None, session=None):
+    """
+    Turns customer orders into transactions in bulk: one query for the
+    orders, one for their items, one UPDATE for the statuses and executemany
+    inserts for every header and item. The caller commits.
+    Returns (processed, skipped, created): processed holds
+    {'requestId', 'transactionId'} dicts, skipped holds {'requestId', 'reason'}
+    dicts and created the new transactions as (transaction_id, timestamp, items).
+    """
+    session = session or db.session
+    orders, skipped = _update_orders('Processed', request_ids, status, limit, True, session)
+
+    processed, created, headers, items_rows = [], [], [], []
+    for order in orders:
+        transaction_id, timestamp = new_transaction_id()
+        items = [(item.paper_type, item.color, item.pages, item.price_per_page_cents, item.item_total_cents)
+                 for item in order.items]
+        headers.append({
+            'id': transaction_id,
+            'transaction_date': timestamp.date(),
+            'transaction_time': timestamp.time(),
+            'total_amount_cents': sum(item[4] for item in items)
+        })
+        items_rows += [{
+            'transaction_header_id': transaction_id,
+            'paper_type': paper_type,
+            'color': color,
+            'pages': pages,
+            'price_per_page_cents': price_per_page_cents,
+            'item_total_cents': item_total_cents
+        } for paper_type, color, pages, price_per_page_cents, item_total_cents in items]
+        processed.append({'requestId': order.request_id, 'transactionId': transaction_id})
+        created.append((transaction_id, timestamp, items))
+
+    if headers:
+        session.execute(db.insert(TransactionHeader), headers)
+        if items_rows:
+            session.execute(db.insert(TransactionItem), items_rows)
+        record_transactions_in_rollup([
+            (timestamp.date(), [(paper_type, color, pages, item_total_cents)
+                                for paper_type, color, pages, _, item_total_cents in items])
+            for _, timestamp, items in created
+        ], session=session)
+    return processed, skipped, created
+
+
+def reject_orders_batch(request_ids=None, status=None, limit=None, session=None):
+    """
+    Rejects customer orders in bulk with one query and one UPDATE. The caller
+    commits. Returns (rejected_ids, skipped) like process_orders_batch.
+    """
+    session = session or db.session
+    orders, skipped = _update_orders('Rejected', request_ids, status, limit, False, session)
+    return [order.request_id for order in orders], skipped
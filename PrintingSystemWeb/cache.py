@@ -0,0 +1,116 @@
+# PrintingSystemWeb/cache.py
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, timedelta
+
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from PrintingSystemWeb import db, ReportGeneration
+
+
+# --- In-process report cache ---
+# LRU cache for report payloads. Every entry remembers the date range it was
+# computed from, and writes invalidate exactly the entries whose range covers
+# a date they touched. Entries that reach into the current month also expire
+# after a TTL, which bounds staleness from sales saved by other processes.
+# Past months only change through bulk writes (imports, resets, rollup
+# rebuilds, archiving), which bump the ReportGeneration row in the database:
+# every process checks it before answering from the cache and drops all
+# entries when it moved. Entries for past months have no TTL.
+
+class ReportCache:
+    def __init__(self, max_entries=512, ttl_seconds=30):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict() # key -> (value, expires_at or None, from_date, to_date)
+        self._generation = 0 # Bumped on every invalidation
+        self._stored_generation = None # ReportGeneration value the entries were computed under
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.max_entries = app.config['REPORT_CACHE_MAX_ENTRIES']
+        self.ttl_seconds = app.config['REPORT_CACHE_TTL_SECONDS']
+        self.clear()
+
+    def get_or_compute(self, key, from_date, to_date, compute):
+        """
+        Returns the cached value for `key`, or calls compute() and caches its
+        result for the date range from_date..to_date (inclusive).
+        """
+        if self.max_entries <= 0:
+            return compute()
+
+        stored_generation = _read_stored_generation()
+        with self._lock:
+            if stored_generation != self._stored_generation:
+                # A bulk write in some process: nothing cached can be trusted
+                self._generation += 1
+                self._entries.clear()
+                self._stored_generation = stored_generation
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at, _, _ = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    return value
+                del self._entries[key]
+            generation = self._generation
+
+        value = compute()
+
+        with self._lock:
+            # A write that landed while we were computing may have made `value` stale
+            if generation != self._generation:
+                return value
+            expires_at = None if _is_closed(to_date) else time.monotonic() + self.ttl_seconds
+            self._entries[key] = (value, expires_at, from_date, to_date)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def invalidate_dates(self, dates):
+        """Drops every entry whose date range covers one of `dates`."""
+        dates = set(dates)
+        if not dates:
+            return
+        with self._lock:
+            self._generation += 1
+            stale = [key for key, (_, _, from_date, to_date) in self._entries.items()
+                     if any(from_date <= day <= to_date for day in dates)]
+            for key in stale:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._stored_generation = None
+
+
+def mark_reports_stale(session=None):
+    """
+    Bumps ReportGeneration, so every process drops its cached reports once
+    the caller's transaction commits. For bulk writes that can touch any date.
+    """
+    session = session or db.session
+    stmt = sqlite_insert(ReportGeneration).values(id=1, generation=1)
+    session.execute(stmt.on_conflict_do_update(
+        index_elements=['id'], set_={'generation': ReportGeneration.generation + 1}
+    ))
+
+
+def _read_stored_generation():
+    return db.session.query(ReportGeneration.generation).filter(ReportGeneration.id == 1).scalar() or 0
+
+
+def _is_closed(to_date):
+    """True if to_date lies in a month that has already ended."""
+    # Transactions are dated in UTC while 'today' is local time, so allow a
+    # day of slack before treating last month as closed.
+    return to_date < (date.today() - timedelta(days=1)).replace(day=1)
+
+
+report_cache = ReportCache() # Configured by create_app()
@@ -0,0 +1,164 @@
+# PrintingSystemWeb/commands.py
+#
+# Maintenance commands, run with the Flask CLI, e.g.:
+#   flask --app PrintingSystemWeb rebuild-rollup
+#   flask --app PrintingSystemWeb import-records path/to/records.csv
+#   flask --app PrintingSystemWeb upgrade-db
+#   flask --app PrintingSystemWeb set-price Short Colored 2.50
+#   flask --app PrintingSystemWeb count-file-pages
+#   flask --app PrintingSystemWeb archive-months
+#   flask --app PrintingSystemWeb build-assets
+
+import re
+
+import click
+from flask import Blueprint, current_app
+
+from PrintingSystemWeb import db, TransactionItem, DailySalesRollup, StoredFile
+from PrintingSystemWeb.rollup import rebuild_rollup
+from PrintingSystemWeb.schema import migrate_money_to_cents, upgrade_schema
+from PrintingSystemWeb.pricing import seed_default_prices, set_price, PricingError
+from PrintingSystemWeb.importer import import_records_csv, BulkImportError, DEFAULT_BATCH_SIZE
+from PrintingSystemWeb.money import format_cents
+from PrintingSystemWeb.uploads import page_counter
+from PrintingSystemWeb.archive import archivable_months, archive_month, restore_month, ArchiveError
+from PrintingSystemWeb.assets import build_assets, brotli
+
+# cli_group=None registers the commands at the top level (`flask upgrade-db`, not `flask commands upgrade-db`)
+bp = Blueprint('commands', __name__, cli_group=None)
+
+
+@bp.cli.command('rebuild-rollup')
+def rebuild_rollup_command():
+    """Backfill the daily sales rollup from existing transaction items."""
+    try:
+        row_count = rebuild_rollup()
+        db.session.commit()
+        click.echo(f"Daily sales rollup rebuilt: {row_count} rows.")
+    except Exception as e:
+        db.session.rollback()
+        raise click.ClickException(f"Failed to rebuild daily sales rollup: {e}")
+
+
+@bp.cli.command('import-records')
+@click.argument('csv_path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--batch-size', default=DEFAULT_BATCH_SIZE, show_default=True,
+              help='Transactions inserted and committed per batch.')
+def import_records_command(csv_path, batch_size):
+    """Bulk import transactions from an old records.csv file (resumable)."""
+    def report_progress(stats):
+        done = stats['importedTransactions'] + stats['skippedTransactions']
+        click.echo(f"  {done}/{stats['totalTransactions']} transactions, "
+                   f"{stats['importedItems']} items, {stats['rowsPerSecond']:.0f} rows/sec")
+
+    try:
+        stats = import_records_csv(csv_path, batch_size=max(1, batch_size), progress=report_progress)
+    except BulkImportError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"Imported {stats['importedTransactions']} transactions ({stats['importedItems']} items) "
+               f"in {stats['elapsedSeconds']:.2f}s; skipped {stats['skippedTransactions']} existing, "
+               f"{stats['malformedRows']} malformed rows.")
+
+
+@bp.cli.command('upgrade-db')
+def upgrade_db_command():
+    """Create the database or bring an existing one up to date."""
+    converted = migrate_money_to_cents()
+    if converted:
+        click.echo(f"Converted amounts to integer centavos in: {', '.join(converted)}")
+    created = upgrade_schema()
+    if created:
+        click.echo(f"Created indexes: {', '.join(created)}")
+    else:
+        click.echo("Database schema is up to date.")
+
+    seed_default_prices()
+    # Backfill the daily sales rollup for databases created before it existed
+    if not DailySalesRollup.query.first() and TransactionItem.query.first():
+        click.echo("Backfilling daily sales rollup...")
+        rebuild_rollup()
+    db.session.commit()
+
+
+@bp.cli.command('set-price')
+@click.argument('paper_type')
+@click.argument('color')
+@click.argument('price_per_page')
+def set_price_command(paper_type, color, price_per_page):
+    """Set the per-page price for a paper type and color."""
+    try:
+        price_cents = set_price(paper_type, color, price_per_page)
+        db.session.commit()
+    except PricingError as e:
+        raise click.ClickException(str(e))
+    click.echo(f"Price for {paper_type} / {color} set to {format_cents(price_cents)} per page.")
+
+
+@bp.cli.command('count-file-pages')
+@click.option('--all', 'recount_all', is_flag=True, help='Recount every stored PDF, not only the pending ones.')
+def count_file_pages_command(recount_all):
+    """Count the pages of uploaded PDFs still pending (e.g. after a server restart)."""
+    statuses = ['pending', 'counted', 'failed'] if recount_all else ['pending']
+    hashes = db.session.scalars(db.select(StoredFile.sha256).where(StoredFile.page_count_status.in_(statuses))).all()
+    db.session.remove()
+    for sha256 in hashes:
+        pages = page_counter.count_and_record(sha256)
+        click.echo(f"{sha256}: {pages if pages else 'no page count'}")
+    click.echo(f"{len(hashes)} file(s) counted.")
+
+
+def _month_argument(ctx, param, value):
+    if value is not None and not re.fullmatch(r'\d{4}-(0[1-9]|1[0-2])', value):
+        raise click.BadParameter('expected YYYY-MM')
+    return value
+
+
+@bp.cli.command('archive-months')
+@click.option('--keep-months', type=click.IntRange(min=1), default=None,
+              help='Most recent months (the current one included) left in the live tables. '
+                   'Default: ARCHIVE_KEEP_MONTHS.')
+@click.option('--month', callback=_month_argument, help='Archive this month (YYYY-MM) only.')
+def archive_months_command(keep_months, month):
+    """Move closed months of transactions into compressed segment files."""
+    if month is not None:
+        months = [month]
+    else:
+        months = archivable_months(keep_months or current_app.config['ARCHIVE_KEEP_MONTHS'])
+    total = 0
+    for key in months:
+        try:
+            moved = archive_month(key)
+        except (ArchiveError, OSError) as e:
+            raise click.ClickException(f"Failed to archive {key}: {e}")
+        total += moved
+        click.echo(f"{key}: {moved} items archived")
+    click.echo(f"{len(months)} month(s), {total} items archived.")
+
+
+@bp.cli.command('restore-month')
+@click.argument('month', callback=_month_argument)
+def restore_month_command(month):
+    """Move an archived month (YYYY-MM) back into the live tables."""
+    try:
+        restored = restore_month(month)
+    except (ArchiveError, OSError) as e:
+        raise click.ClickException(f"Failed to restore {month}: {e}")
+    click.echo(f"{month}: {restored} items restored.")
+
+
+@bp.cli.command('build-assets')
+@click.option('--clean', is_flag=True, help='Delete built files no longer in the manifest.')
+def build_assets_command(clean):
+    """Minify, fingerprint and precompress the static scripts and stylesheets."""
+    try:
+        report = build_assets(current_app.static_folder, clean=clean)
+    except (OSError, ValueError) as e:
+        raise click.ClickException(f"Failed to build assets: {e}")
+    for name, (built_name, source_size, built_size, gzip_size, brotli_size) in report.items():
+        sizes = f"{source_size:,} -> {built_size:,} bytes, gzip {gzip_size:,}"
+        if brotli_size is not None:
+            sizes += f", brotli {brotli_size:,}"
+        click.echo(f"{name} -> {built_name} ({sizes})")
+    if brotli is None:
+        click.echo("brotli is not installed (pip install brotli): built gzip variants only.")
+    click.echo("Restart running servers to serve the new build.")
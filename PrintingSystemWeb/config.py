@@ -0,0 +1,148 @@
+# PrintingSystemWeb/config.py
+#
+# Configuration profiles. The active profile is chosen with the
+# PRINTING_SYSTEM_CONFIG environment variable ('development' by default,
+# or 'production'); DATABASE_URL overrides the database location, and a
+# settings file named by PRINTING_SYSTEM_SETTINGS can override any value.
+
+import os
+
+
+class DevelopmentConfig:
+    # SQLite database file path. Relative sqlite paths are created in the 'instance' folder.
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'sqlite:///site.db')
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = {}
+
+    # PRAGMA name -> value, applied to every new SQLite connection
+    SQLITE_PRAGMAS = {}
+
+    # In-process report cache (cache.py); 0 entries disables it. The TTL only
+    # applies to entries that reach into the current month; entries for past
+    # months are dropped by bulk writes from any process.
+    REPORT_CACHE_MAX_ENTRIES = 512
+    REPORT_CACHE_TTL_SECONDS = 30
+
+    # Largest number of buckets (points per series) one /sales-timeseries call may return
+    TIMESERIES_MAX_BUCKETS = 3700
+
+    # Largest number of transactions accepted in one /confirm-transactions batch
+    BATCH_CONFIRM_MAX_TRANSACTIONS = 1000
+    # Largest number of customer orders handled by one /process-orders or /reject-orders call
+    ORDER_BATCH_MAX_REQUESTS = 1000
+
+    # Price table (pricing.py): how often a process checks the database for
+    # price changes made elsewhere, and how long browsers may reuse /price-table.
+    PRICE_TABLE_RELOAD_SECONDS = 5
+    PRICE_TABLE_MAX_AGE_SECONDS = 60
+    # Let the staff counter (/confirm-transaction and /confirm-transactions) send
+    # its own pricePerPage, e.g. for discounts. Item totals are always computed
+    # on the server, and customer orders are always priced from the table.
+    ALLOW_COUNTER_PRICE_OVERRIDES = False
+
+    # Live updates on /events (events.py): events kept for reconnecting
+    # browsers, events a slow browser may fall behind before it is cut off,
+    # the keep-alive comment interval of an idle stream, and how often each
+    # server process polls for events published by the others.
+    EVENTS_HISTORY_SIZE = 500
+    EVENTS_SUBSCRIBER_QUEUE_SIZE = 1000
+    EVENTS_HEARTBEAT_SECONDS = 15
+    EVENTS_POLL_SECONDS = 1.0
+
+    # Files uploaded with customer orders (uploads.py): stored by content hash
+    # in UPLOAD_DIR (default: instance/uploads). PDF pages are counted by
+    # PAGE_COUNT_WORKERS background threads per server process.
+    UPLOAD_DIR = os.environ.get('UPLOAD_DIR')
+    UPLOAD_MAX_BYTES = 512 * 1024 * 1024
+    UPLOAD_CHUNK_SIZE = 256 * 1024
+    PAGE_COUNT_WORKERS = 2
+
+    # Month archive (archive.py): `flask archive-months` moves months older
+    # than the ARCHIVE_KEEP_MONTHS most recent ones out of the transaction
+    # tables into one segment file per month in ARCHIVE_DIR (default:
+    # instance/archive). Reports read both. ARCHIVE_OPEN_SEGMENTS segment
+    # files stay mapped per server process.
+    ARCHIVE_DIR = os.environ.get('ARCHIVE_DIR')
+    ARCHIVE_KEEP_MONTHS = 12
+    ARCHIVE_OPEN_SEGMENTS = 16
+
+    # Instrumentation (instrumentation.py). LOG_LEVEL gates the JSON log lines
+    # written to stderr; statements slower than SLOW_QUERY_SECONDS are logged
+    # with their SQL. With PROFILE_REQUESTS every request runs under cProfile
+    # and leaves a .prof file in PROFILE_DIR (default: instance/profiles);
+    # it slows requests down severalfold, so only switch it on to investigate.
+    LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
+    SLOW_QUERY_SECONDS = 0.5
+    PROFILE_REQUESTS = os.environ.get('PROFILE_REQUESTS') == '1'
+    PROFILE_DIR = os.environ.get('PROFILE_DIR')
+
+    # JSON encoder behind jsonify() and request.get_json() (serialization.py):
+    # 'orjson', 'stdlib' (Flask's default) or 'auto' = orjson when installed.
+    JSON_PROVIDER = os.environ.get('JSON_PROVIDER', 'auto')
+
+    # Built static assets (assets.py): `flask build-assets` writes minified,
+    # content-hashed copies of the scripts and stylesheets, with .gz/.br
+    # variants, to static/dist. With ASSETS_USE_BUILD the templates link to
+    # them, and they are served precompressed with an immutable Cache-Control
+    # for STATIC_IMMUTABLE_MAX_AGE seconds. Off in development, so edits to
+    # the sources show up without a rebuild.
+    ASSETS_USE_BUILD = os.environ.get('ASSETS_USE_BUILD') == '1'
+    STATIC_IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+    # Production WSGI server (serve.py / server.py, gunicorn). Every /events
+    # stream keeps one worker thread busy, so a worker accepts at most
+    # EVENTS_MAX_STREAMS of them (half its threads); pages turned away fall
+    # back to refetching after their own writes.
+    SERVER_BIND = os.environ.get('SERVER_BIND', '127.0.0.1:8000')
+    SERVER_WORKERS = 2
+    SERVER_THREADS = 4
+    EVENTS_MAX_STREAMS = 2
+    SERVER_KEEPALIVE_SECONDS = 5
+    SERVER_TIMEOUT_SECONDS = 30
+
+
+class ProductionConfig(DevelopmentConfig):
+    SERVER_BIND = os.environ.get('SERVER_BIND', '0.0.0.0:8000')
+    # SQLite takes one writer at a time, so extra processes mainly help the
+    # report reads; threads cover requests waiting on I/O and the lock.
+    SERVER_WORKERS = min(4, os.cpu_count() or 1) + 1
+    SERVER_THREADS = 8
+    EVENTS_MAX_STREAMS = 4
+    ASSETS_USE_BUILD = os.environ.get('ASSETS_USE_BUILD', '1') == '1'
+
+    # WAL lets the report page read while counters write, and synchronous=NORMAL
+    # is durable in WAL mode while fsyncing far less often. busy_timeout makes a
+    # blocked writer wait for the lock instead of failing with "database is locked".
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,       # milliseconds
+        'cache_size': -64000,       # negative = KiB, i.e. 64 MB page cache per connection
+        'mmap_size': 268435456,     # 256 MB of the file memory-mapped for reads
+        'temp_store': 'MEMORY',
+    }
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': 10,            # Keep connections (and their page caches) warm
+        'max_overflow': 20,
+        'pool_timeout': 30,
+        'pool_recycle': 3600,
+        'connect_args': {
+            'timeout': 5,               # Driver-level lock wait, matches busy_timeout
+            'check_same_thread': False, # Pooled connections move between worker threads
+        },
+    }
+
+
+CONFIG_PROFILES = {
+    'development': DevelopmentConfig,
+    'production': ProductionConfig,
+}
+
+
+def get_config(name=None):
+    """Returns the config class for `name` (default: $PRINTING_SYSTEM_CONFIG or 'development')."""
+    name = name or os.environ.get('PRINTING_SYSTEM_CONFIG', 'development')
+    try:
+        return CONFIG_PROFILES[name.lower()]
+    except KeyError:
+        raise ValueError(f"Unknown config profile '{name}'. Choose one of: {', '.join(CONFIG_PROFILES)}")
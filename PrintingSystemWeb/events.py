@@ -0,0 +1,239 @@
+# PrintingSystemWeb/events.py
+
+import json
+import logging
+import os
+import queue
+import threading
+from datetime import date
+
+from PrintingSystemWeb import db, LiveEvent
+from PrintingSystemWeb.money import from_cents
+from PrintingSystemWeb.rollup import sales_summary_delta
+
+logger = logging.getLogger(__name__)
+
+
+# --- Pub/sub behind /events (Server-Sent Events) ---
+# Views publish an event after each successful commit. publish() appends it
+# to the live_event table, so it reaches the browsers connected to any server
+# process: each process runs one poller thread (while it has open /events
+# streams) that reads the events newer than the last one it saw, every
+# EVENTS_POLL_SECONDS or as soon as the process publishes one itself, and
+# queues them for its streams. Event IDs are the live_event row IDs and the
+# last EVENTS_HISTORY_SIZE events are kept, so a reconnecting browser (which
+# sends Last-Event-ID, to whichever process) gets what it missed. When that is
+# not possible (unknown ID or the gap is too old), or a subscriber falls too
+# far behind, the client is told to 'resync', i.e. reload the full
+# records/summary/orders once.
+#
+# Each open stream keeps a server thread busy, so a process accepts at most
+# EVENTS_MAX_STREAMS of them; the pages turned away refetch after their own
+# writes instead.
+
+RESYNC = 'resync'
+
+
+class Subscription:
+    def __init__(self, max_queued):
+        self._queue = queue.Queue(maxsize=max_queued)
+        self.last_id = 0 # Events up to this ID are already queued
+        self.closed = False
+
+    def get(self, timeout):
+        """Returns the next (event_id, event_type, data) or None if nothing arrived in `timeout` seconds."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class EventBroker:
+    def __init__(self, history_size=500, subscriber_queue_size=1000, poll_seconds=1.0, max_streams=4):
+        self.history_size = history_size
+        self.subscriber_queue_size = subscriber_queue_size
+        self.poll_seconds = poll_seconds
+        self.max_streams = max_streams
+        self._app = None
+        self._reset()
+
+    def _reset(self):
+        """(Re)initializes per-process state; also called in a child process after fork."""
+        # Threads do not survive fork, so each server worker starts its own poller
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._poller = None
+        self._last_id = 0 # Newest event the poller has handed out
+        self._wakeup = threading.Event()
+
+    def init_app(self, app):
+        with self._lock:
+            self._app = app
+            self.history_size = app.config['EVENTS_HISTORY_SIZE']
+            self.subscriber_queue_size = app.config['EVENTS_SUBSCRIBER_QUEUE_SIZE']
+            self.poll_seconds = app.config['EVENTS_POLL_SECONDS']
+            self.max_streams = app.config['EVENTS_MAX_STREAMS']
+
+    def publish(self, event_type, data):
+        """Appends one event to live_event (see publish_many())."""
+        self.publish_many(event_type, [data])
+
+    def publish_many(self, event_type, items):
+        """
+        Appends an event per item of `items` to live_event and commits; call it
+        after the write the events report is committed. Events are best
+        effort: a failure is logged, never raised into the request.
+        """
+        if not items:
+            return
+        try:
+            db.session.execute(db.insert(LiveEvent), [
+                {'event_type': event_type, 'payload': json.dumps(data)} for data in items
+            ])
+            newest = db.session.query(db.func.max(LiveEvent.id)).scalar()
+            db.session.query(LiveEvent).filter(LiveEvent.id <= newest - self.history_size).delete()
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            logger.exception('publishing live events failed', extra={'fields': {'event_type': event_type}})
+            return
+        self._wakeup.set()
+
+    def subscribe(self, last_event_id=None):
+        """
+        Registers a new subscriber, or returns None when this process already
+        has EVENTS_MAX_STREAMS of them. With `last_event_id`, the events
+        published after it are queued first, or a 'resync' event if they are
+        no longer known.
+        """
+        with self._lock:
+            if len(self._subscribers) >= self.max_streams:
+                return None
+            # Under the lock, so the poller cannot hand out an event between the
+            # replay below and the registration
+            subscription = Subscription(self.subscriber_queue_size)
+            # Its own short read, not the request's session, which would stay
+            # open for as long as the stream does
+            with db.engine.connect() as connection:
+                newest = connection.execute(db.select(db.func.max(LiveEvent.id))).scalar() or 0
+                missed = self._events_after(connection, last_event_id, newest) if last_event_id else []
+                if missed is None:
+                    missed = [(str(newest), RESYNC, '{}')]
+            for event in missed[-self.subscriber_queue_size:]:
+                subscription._queue.put_nowait(event)
+            subscription.last_id = newest
+            self._subscribers.add(subscription)
+            if self._poller is None:
+                self._last_id = max(self._last_id, newest)
+                self._poller = threading.Thread(target=self._poll, name='live-events', daemon=True)
+                self._poller.start()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def _events_after(self, connection, last_event_id, newest):
+        """The events after `last_event_id` up to `newest`, or None if they cannot be replayed."""
+        if not last_event_id.isdigit() or int(last_event_id) > newest:
+            return None
+        sequence = int(last_event_id)
+        rows = _read_events(connection, sequence, newest)
+        if rows and rows[0][0] != sequence + 1: # Pruned already
+            return None
+        return [(str(event_id), event_type, payload) for event_id, event_type, payload in rows]
+
+    def _poll(self):
+        """Poller thread: hands new events to the subscribers, until there are none left."""
+        with self._app.app_context():
+            while True:
+                with self._lock:
+                    if not self._subscribers:
+                        self._poller = None
+                        return
+                    last_id = self._last_id
+                self._wakeup.wait(self.poll_seconds)
+                self._wakeup.clear()
+                try:
+                    with db.engine.connect() as connection:
+                        rows = _read_events(connection, last_id)
+                except Exception:
+                    logger.exception('reading live events failed')
+                    rows = []
+                if rows:
+                    self._dispatch(rows)
+
+    def _dispatch(self, rows):
+        with self._lock:
+            for event_id, event_type, payload in rows:
+                self._last_id = max(self._last_id, event_id)
+                event = (str(event_id), event_type, payload)
+                for subscription in list(self._subscribers):
+                    if event_id <= subscription.last_id:
+                        continue
+                    try:
+                        subscription._queue.put_nowait(event)
+                        subscription.last_id = event_id
+                    except queue.Full:
+                        # Too far behind: cut it off, the browser reconnects and resyncs
+                        subscription.closed = True
+                        self._subscribers.discard(subscription)
+
+
+def _read_events(connection, after_id, up_to_id=None):
+    """(id, event_type, payload) rows of the events after `after_id` (up to `up_to_id`), oldest first."""
+    query = db.select(LiveEvent.id, LiveEvent.event_type, LiveEvent.payload).where(LiveEvent.id > after_id)
+    if up_to_id is not None:
+        query = query.where(LiveEvent.id <= up_to_id)
+    return connection.execute(query.order_by(LiveEvent.id)).all()
+
+
+def format_sse(event):
+    """Encodes an (event_id, event_type, data) tuple as a Server-Sent Events message."""
+    event_id, event_type, payload = event
+    return f"id: {event_id}\nevent: {event_type}\ndata: {payload}\n\n"
+
+
+event_broker = EventBroker() # Configured by create_app()
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=event_broker._reset)
+
+
+# --- Event payloads ---
+def transaction_records(transactions):
+    """
+    Record rows for the main record table, newest first and in the same format
+    as /get-records. `transactions` holds (transaction_id, timestamp, items)
+    with items as (paper_type, color, pages, price_per_page_cents, item_total_cents) tuples.
+    """
+    records = []
+    for transaction_id, timestamp, items in reversed(transactions):
+        for paper_type, color, pages, price_per_page_cents, item_total_cents in reversed(items):
+            records.append({
+                'id': transaction_id,
+                'date': timestamp.strftime("%m/%d/%Y"),
+                'time': timestamp.strftime("%I:%M%p"),
+                'paperType': paper_type,
+                'color': color,
+                'pages': pages,
+                'pricePerPage': from_cents(price_per_page_cents),
+                'total': from_cents(item_total_cents)
+            })
+    return records
+
+
+def publish_transactions(transactions, today=None):
+    """
+    Publishes a 'transaction' event for newly committed transactions, given as
+    (transaction_id, timestamp, items) with the item tuples of transaction_records().
+    """
+    if not transactions:
+        return
+    event_broker.publish('transaction', {
+        'records': transaction_records(transactions),
+        'summaryDelta': sales_summary_delta([
+            (timestamp.date(), [(paper_type, color, pages, item_total_cents)
+                                for paper_type, color, pages, _, item_total_cents in items])
+            for _, timestamp, items in transactions
+        ], today or date.today())
+    })
@@ -0,0 +1,154 @@
+# PrintingSystemWeb/export.py
+
+import csv
+import io
+import zipfile
+import zlib
+from xml.sax.saxutils import escape
+
+from PrintingSystemWeb.money import format_cents, from_cents
+from PrintingSystemWeb.serialization import format_stored_date, format_stored_time
+
+
+# --- Streaming report export ---
+# Rows are pulled from the database (and the month archive) EXPORT_BATCH_SIZE
+# at a time and written out in chunks, so neither the server nor the browser
+# holds the whole report.
+EXPORT_BATCH_SIZE = 1000
+EXPORT_HEADERS = ['ID', 'Date', 'Time', 'Paper Type', 'Color', 'Pages', 'Price/Page', 'Total']
+
+
+def _export_rows(records):
+    """Yields each record of `records` (a RecordRange) as a list of display strings/numbers; amounts stay in centavos."""
+    for trans_id, date_text, time_text, paper_type, color, pages, price_per_page_cents, item_total_cents, _ in \
+            records.iter_records(EXPORT_BATCH_SIZE):
+        yield [
+            trans_id,
+            format_stored_date(date_text),
+            format_stored_time(time_text),
+            paper_type,
+            color,
+            pages,
+            price_per_page_cents,
+            item_total_cents,
+        ]
+
+
+def generate_csv(records):
+    """Yields the report as CSV text, one chunk per EXPORT_BATCH_SIZE rows."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_HEADERS)
+    for count, row in enumerate(_export_rows(records), start=1):
+        row[6], row[7] = format_cents(row[6]), format_cents(row[7])
+        writer.writerow(row)
+        if count % EXPORT_BATCH_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def gzip_chunks(chunks):
+    """Gzip-compresses a stream of text chunks on the fly."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16) # | 16 -> gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+# --- XLSX ---
+# A minimal SpreadsheetML package. The worksheet is written through a zip entry
+# opened in streaming mode, so the workbook is never built in memory.
+_XLSX_STATIC_PARTS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        '</Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Sales Report" sheetId="1" r:id="rId1"/></sheets>'
+        '</workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '</Relationships>'
+    ),
+}
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only, non-seekable file object that collects bytes until drained."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _xlsx_cell(value):
+    if isinstance(value, (int, float)):
+        return f'<c t="n"><v>{value}</v></c>'
+    return f'<c t="inlineStr"><is><t>{escape(str(value))}</t></is></c>'
+
+
+def _xlsx_row(values):
+    return '<row>' + ''.join(_xlsx_cell(value) for value in values) + '</row>'
+
+
+def generate_xlsx(records):
+    """Yields the report as an .xlsx workbook, one chunk per EXPORT_BATCH_SIZE rows."""
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as workbook:
+        for name, content in _XLSX_STATIC_PARTS.items():
+            workbook.writestr(name, content)
+        with workbook.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            sheet.write(_xlsx_row(EXPORT_HEADERS).encode('utf-8'))
+            rows = []
+            for count, row in enumerate(_export_rows(records), start=1):
+                row[6], row[7] = from_cents(row[6]), from_cents(row[7]) # Numeric cells for Price/Page and Total
+                rows.append(_xlsx_row(row))
+                if count % EXPORT_BATCH_SIZE == 0:
+                    sheet.write(''.join(rows).encode('utf-8'))
+                    rows = []
+                    yield sink.drain()
+            sheet.write(''.join(rows).encode('utf-8'))
+            sheet.write(b'</sheetData></worksheet>')
+    yield sink.drain()
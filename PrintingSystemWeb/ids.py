@@ -0,0 +1,62 @@
+# PrintingSystemWeb/ids.py
+
+import os
+import random
+import threading
+from datetime import datetime, timezone
+
+
+# --- Transaction ID generator ---
+# IDs look like TRX-20261018-125223-482-1A2B3C4D0007:
+#   TRX-<UTC date>-<UTC time>-<milliseconds>-<process tag (8 hex)><sequence (4 hex)>
+# The readable date/time prefix is kept from the old TRX-YYYYMMDD-HHMMSS format.
+# The process tag mixes the PID with random bits, so concurrent worker processes
+# never share one, and the sequence counts IDs issued by this process within
+# the same millisecond (up to 65536 per ms). IDs from one process are strictly
+# increasing, even if the system clock steps backwards.
+
+class TransactionIdGenerator:
+    SEQUENCE_LIMIT = 0x10000
+
+    def __init__(self, prefix='TRX'):
+        self.prefix = prefix
+        self._reset()
+
+    def _reset(self):
+        """(Re)initializes per-process state; also called in a child process after fork."""
+        self._lock = threading.Lock() # A lock held by another thread at fork time would never be released
+        self._process_tag = f"{os.getpid() & 0xFFFF:04X}{random.SystemRandom().getrandbits(16):04X}"
+        self._last_ms = 0
+        self._sequence = 0
+
+    def next_id(self):
+        """Returns (transaction_id, timestamp), where timestamp is the UTC datetime encoded in the ID."""
+        with self._lock:
+            now_ms = int(datetime.now(timezone.utc).timestamp() * 1000)
+            if now_ms > self._last_ms:
+                self._last_ms = now_ms
+                self._sequence = 0
+            else:
+                # Same millisecond (or the clock went backwards): keep counting from the last one
+                self._sequence += 1
+                if self._sequence >= self.SEQUENCE_LIMIT:
+                    self._last_ms += 1
+                    self._sequence = 0
+            timestamp_ms, sequence = self._last_ms, self._sequence
+
+        timestamp = datetime.fromtimestamp(timestamp_ms / 1000, timezone.utc)
+        transaction_id = (
+            f"{self.prefix}-{timestamp.strftime('%Y%m%d-%H%M%S')}-{timestamp_ms % 1000:03}-"
+            f"{self._process_tag}{sequence:04X}"
+        )
+        return transaction_id, timestamp
+
+
+_generator = TransactionIdGenerator()
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_generator._reset)
+
+
+def new_transaction_id():
+    """Returns a new unique (transaction_id, timestamp) pair for a TransactionHeader."""
+    return _generator.next_id()
@@ -0,0 +1,145 @@
+# PrintingSystemWeb/importer.py
+
+import csv
+import time
+from datetime import datetime
+from functools import lru_cache
+
+from PrintingSystemWeb import db, TransactionHeader, TransactionItem, ArchivedTransaction
+from PrintingSystemWeb.money import to_cents
+from PrintingSystemWeb.rollup import record_transactions_in_rollup
+from PrintingSystemWeb.cache import report_cache, mark_reports_stale
+
+
+# --- Bulk importer for old records.csv files ---
+# Columns: ID, Date (MM/DD/YYYY), Time (HH:MMAM), Paper Type, Color, Pages, Price/Page, Total
+#
+# Transactions are inserted with executemany in batches, and every batch is
+# committed on its own (headers, items and rollup together). If an import
+# fails partway through, the committed batches stay in the database and
+# running the import again skips them, so it resumes where it stopped.
+DEFAULT_BATCH_SIZE = 1000
+
+
+class BulkImportError(Exception):
+    """Raised when an import stops partway; `stats` holds the progress up to the failure."""
+
+    def __init__(self, message, stats):
+        super().__init__(message)
+        self.stats = stats
+
+
+@lru_cache(maxsize=4096)
+def _parse_date(date_str):
+    return datetime.strptime(date_str, "%m/%d/%Y").date()
+
+
+@lru_cache(maxsize=4096)
+def _parse_time(time_str):
+    return datetime.strptime(time_str, "%I:%M%p").time()
+
+
+def read_transactions(csv_path):
+    """
+    Reads records.csv and groups its rows by transaction ID.
+    Returns ({trans_id: {'date', 'time', 'items'}}, malformed_row_count), where
+    items are (paper_type, color, pages, price_per_page_cents, item_total_cents) tuples.
+    """
+    transactions = {}
+    malformed_rows = 0
+    with open(csv_path, 'r', newline='', encoding='utf-8') as csvfile:
+        reader = csv.reader(csvfile)
+        next(reader, None) # Skip header
+        for row in reader:
+            try:
+                trans_id, date_str, time_str, paper_type, color, pages, price_per_page, item_total = row[:8]
+                item = (paper_type, color, int(pages), to_cents(price_per_page), to_cents(item_total))
+                if trans_id not in transactions:
+                    transactions[trans_id] = {
+                        'date': _parse_date(date_str),
+                        'time': _parse_time(time_str),
+                        'items': []
+                    }
+            except ValueError:
+                malformed_rows += 1
+                continue
+            transactions[trans_id]['items'].append(item)
+    return transactions, malformed_rows
+
+
+def import_records_csv(csv_path, batch_size=DEFAULT_BATCH_SIZE, progress=None, session=None):
+    """
+    Imports the transactions in `csv_path` that are not in the database yet.
+    `progress`, if given, is called with the stats dict after every batch.
+    Returns the final stats dict.
+    """
+    session = session or db.session
+    started = time.perf_counter()
+    transactions, malformed_rows = read_transactions(csv_path)
+
+    # One query for every existing ID instead of a lookup per transaction;
+    # archived transactions count as existing
+    existing_ids = {trans_id for (trans_id,) in session.query(TransactionHeader.id)}
+    existing_ids.update(trans_id for (trans_id,) in session.query(ArchivedTransaction.id))
+    pending_ids = [trans_id for trans_id in transactions if trans_id not in existing_ids]
+
+    stats = {
+        'totalTransactions': len(transactions),
+        'skippedTransactions': len(transactions) - len(pending_ids),
+        'importedTransactions': 0,
+        'importedItems': 0,
+        'malformedRows': malformed_rows,
+        'elapsedSeconds': 0.0,
+        'rowsPerSecond': 0.0,
+    }
+
+    for start in range(0, len(pending_ids), batch_size):
+        batch_ids = pending_ids[start:start + batch_size]
+        headers, items, rollup_entries = [], [], []
+        for trans_id in batch_ids:
+            trans_data = transactions[trans_id]
+            headers.append({
+                'id': trans_id,
+                'transaction_date': trans_data['date'],
+                'transaction_time': trans_data['time'],
+                'total_amount_cents': sum(item[4] for item in trans_data['items'])
+            })
+            for paper_type, color, pages, price_per_page_cents, item_total_cents in trans_data['items']:
+                items.append({
+                    'transaction_header_id': trans_id,
+                    'paper_type': paper_type,
+                    'color': color,
+                    'pages': pages,
+                    'price_per_page_cents': price_per_page_cents,
+                    'item_total_cents': item_total_cents
+                })
+            rollup_entries.append((trans_data['date'], [
+                (paper_type, color, pages, item_total_cents)
+                for paper_type, color, pages, _, item_total_cents in trans_data['items']
+            ]))
+
+        try:
+            session.bulk_insert_mappings(TransactionHeader, headers)
+            session.bulk_insert_mappings(TransactionItem, items)
+            record_transactions_in_rollup(rollup_entries, session=session)
+            mark_reports_stale(session) # Old dates: other processes may have them cached
+            session.commit()
+            report_cache.invalidate_dates(trans_date for trans_date, _ in rollup_entries)
+        except Exception as e:
+            session.rollback()
+            raise BulkImportError(
+                f"Import stopped after {stats['importedTransactions']} transactions: {e}. "
+                f"Run it again to resume; already imported transactions are skipped.", stats
+            ) from e
+
+        stats['importedTransactions'] += len(headers)
+        stats['importedItems'] += len(items)
+        stats['elapsedSeconds'] = time.perf_counter() - started
+        stats['rowsPerSecond'] = stats['importedItems'] / stats['elapsedSeconds']
+        if progress:
+            progress(stats)
+
+    stats['elapsedSeconds'] = time.perf_counter() - started
+    if stats['elapsedSeconds'] > 0:
+        stats['rowsPerSecond'] = stats['importedItems'] / stats['elapsedSeconds']
+    return stats
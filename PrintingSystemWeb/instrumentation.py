@@ -0,0 +1,323 @@
+# PrintingSystemWeb/instrumentation.py
+
+import atexit
+import cProfile
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from flask import g, has_app_context, has_request_context, request
+from sqlalchemy import event
+
+from PrintingSystemWeb import db
+
+
+@contextmanager
+def _on_cursor_execute(engine, callback):
+    """Calls callback(statement, parameters) for every statement executed on `engine` inside the block."""
+    engine = engine or db.engine
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        callback(statement, parameters)
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+@contextmanager
+def count_queries(engine=None):
+    """
+    Collects every SQL statement executed on `engine` (default: the app's
+    engine) while the block runs. Yields the list of statements, so
+    len(statements) is the query count.
+    """
+    statements = []
+    with _on_cursor_execute(engine, lambda statement, parameters: statements.append(statement)):
+        yield statements
+
+
+@contextmanager
+def capture_queries(engine=None):
+    """Like count_queries(), but yields a list of (statement, parameters) pairs."""
+    captured = []
+    with _on_cursor_execute(engine, lambda statement, parameters: captured.append((statement, parameters))):
+        yield captured
+
+
+# --- Request metrics (/metrics) ---
+# Every request records its latency under its route pattern (e.g.
+# '/process-order/<int:request_id>', so label values stay bounded), plus how
+# many SQL statements it ran and how long they took. The numbers are kept per
+# process: with several server workers, each /metrics scrape reports the
+# worker that answered it, labelled with its pid.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 500)
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense, one series per label tuple."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.series = {} # labels -> [bucket counts..., sum, count]
+
+    def observe(self, labels, value):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [0] * len(self.buckets) + [0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+        series[-2] += value
+        series[-1] += 1
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.slow_query_seconds = 0.5
+        self.profile_dir = None
+        self._reset()
+
+    def _reset(self):
+        """(Re)initializes per-process state; also called in a child process after fork."""
+        self._lock = threading.Lock()
+        self._latency = Histogram(LATENCY_BUCKETS)
+        self._queries = Histogram(QUERY_COUNT_BUCKETS)
+        self._requests = defaultdict(int)   # (route, method, status) -> count
+        self._query_time = defaultdict(float) # route -> seconds spent in SQL
+        self._slow_queries = defaultdict(int) # route -> count
+
+    def init_app(self, app):
+        self.slow_query_seconds = app.config['SLOW_QUERY_SECONDS']
+        self.profile_dir = None
+        if app.config['PROFILE_REQUESTS']:
+            self.profile_dir = app.config['PROFILE_DIR'] or os.path.join(app.instance_path, 'profiles')
+        if self.profile_dir:
+            os.makedirs(self.profile_dir, exist_ok=True)
+
+        with app.app_context():
+            for engine in db.engines.values():
+                if not event.contains(engine, 'before_cursor_execute', _start_query_timer):
+                    event.listen(engine, 'before_cursor_execute', _start_query_timer)
+                    event.listen(engine, 'after_cursor_execute', _stop_query_timer)
+        app.before_request(_start_request)
+        app.after_request(_finish_response)
+        app.teardown_request(_finish_request)
+
+    def record_request(self, route, method, status, seconds, queries, query_seconds, slow_queries):
+        with self._lock:
+            self._latency.observe((route, method), seconds)
+            self._queries.observe((route,), queries)
+            self._requests[(route, method, status)] += 1
+            self._query_time[route] += query_seconds
+            if slow_queries:
+                self._slow_queries[route] += slow_queries
+
+    def render(self):
+        """The current metrics in the Prometheus text exposition format."""
+        pid = str(os.getpid())
+        with self._lock:
+            lines = []
+            _render_histogram(lines, 'printing_http_request_duration_seconds',
+                              'Time from the start of a request until its response was ready.',
+                              ('route', 'method'), self._latency, pid)
+            _render_counter(lines, 'printing_http_requests_total', 'Requests handled.',
+                            ('route', 'method', 'status'), self._requests, pid)
+            _render_histogram(lines, 'printing_db_queries_per_request', 'SQL statements executed per request.',
+                              ('route',), self._queries, pid)
+            _render_counter(lines, 'printing_db_query_duration_seconds_total', 'Time spent executing SQL.',
+                            ('route',), {(route,): value for route, value in self._query_time.items()}, pid)
+            _render_counter(lines, 'printing_db_slow_queries_total',
+                            'SQL statements slower than SLOW_QUERY_SECONDS.',
+                            ('route',), {(route,): value for route, value in self._slow_queries.items()}, pid)
+        return '\n'.join(lines) + '\n'
+
+
+def _format_labels(names, values, pid, extra=None):
+    pairs = [(name, value) for name, value in zip(names, values)] + [('pid', pid)]
+    if extra:
+        pairs.append(extra)
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def _render_counter(lines, name, help_text, label_names, values, pid):
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} counter')
+    for labels, value in sorted(values.items()):
+        lines.append(f'{name}{_format_labels(label_names, labels, pid)} {value:g}')
+
+
+def _render_histogram(lines, name, help_text, label_names, histogram, pid):
+    lines.append(f'# HELP {name} {help_text}')
+    lines.append(f'# TYPE {name} histogram')
+    for labels, series in sorted(histogram.series.items()):
+        for bound, count in zip(histogram.buckets, series):
+            lines.append(f'{name}_bucket{_format_labels(label_names, labels, pid, ("le", f"{bound:g}"))} {count}')
+        lines.append(f'{name}_bucket{_format_labels(label_names, labels, pid, ("le", "+Inf"))} {series[-1]}')
+        lines.append(f'{name}_sum{_format_labels(label_names, labels, pid)} {series[-2]:g}')
+        lines.append(f'{name}_count{_format_labels(label_names, labels, pid)} {series[-1]}')
+
+
+request_metrics = RequestMetrics() # Configured by create_app()
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=request_metrics._reset)
+
+
+# --- Per-request hooks ---
+# The running totals of a request live on flask.g; the SQLAlchemy hooks add to
+# them when a request is active (and only log slow statements otherwise, e.g.
+# in CLI commands).
+
+class _RequestStats:
+    __slots__ = ('started', 'response_seconds', 'status', 'queries', 'query_seconds', 'slow_queries', 'profiler')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.response_seconds = None
+        self.status = None
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.slow_queries = 0
+        self.profiler = None
+
+
+def _start_request():
+    stats = g._request_stats = _RequestStats()
+    if request_metrics.profile_dir:
+        stats.profiler = cProfile.Profile()
+        stats.profiler.enable()
+
+
+def _finish_response(response):
+    stats = g.get('_request_stats')
+    if stats is not None:
+        # Measured here rather than at teardown, so a streamed response (e.g. an
+        # open /events connection) counts the time to its first byte
+        stats.response_seconds = time.perf_counter() - stats.started
+        stats.status = response.status_code
+    return response
+
+
+def _finish_request(exc):
+    stats = g.pop('_request_stats', None)
+    if stats is None:
+        return
+    route = request.url_rule.rule if request.url_rule is not None else '<unmatched>'
+    seconds = stats.response_seconds if stats.response_seconds is not None else time.perf_counter() - stats.started
+    status = stats.status or 500
+    if stats.profiler is not None:
+        stats.profiler.disable()
+        _dump_profile(stats.profiler, route, request.method, seconds)
+
+    request_metrics.record_request(route, request.method, status, seconds,
+                                   stats.queries, stats.query_seconds, stats.slow_queries)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug('request finished', extra={'fields': {
+            'route': route, 'method': request.method, 'status': status, 'ms': round(seconds * 1000, 2),
+            'queries': stats.queries, 'queryMs': round(stats.query_seconds * 1000, 2),
+        }})
+
+
+def _dump_profile(profiler, route, method, seconds):
+    name = route.strip('/').replace('/', '.').replace('<', '').replace('>', '').replace(':', '-') or 'root'
+    path = os.path.join(request_metrics.profile_dir,
+                        f"{method}.{name}.{seconds * 1000:.0f}ms.{time.time():.0f}.{os.getpid()}.{threading.get_ident()}.prof")
+    profiler.dump_stats(path)
+
+
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    context._query_started = time.perf_counter()
+
+
+def _stop_query_timer(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._query_started
+    slow = elapsed >= request_metrics.slow_query_seconds
+    stats = g.get('_request_stats') if has_app_context() else None
+    if stats is not None:
+        stats.queries += 1
+        stats.query_seconds += elapsed
+        stats.slow_queries += slow
+    if slow:
+        logger.warning('slow query', extra={'fields': {
+            'ms': round(elapsed * 1000, 2), 'statement': statement,
+            'route': request.url_rule.rule if has_request_context() and request.url_rule is not None else None,
+        }})
+
+
+# --- Structured logging ---
+# Log calls only put the record on a queue; a background thread formats each
+# record as one JSON line and writes it to stderr, so a request never waits on
+# the terminal or a log file. The level comes from LOG_LEVEL, and callers with
+# expensive payloads check logger.isEnabledFor() first. Extra key/value pairs
+# go in extra={'fields': {...}}.
+
+class JsonLineFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        entry.update(getattr(record, 'fields', None) or {})
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class LogPipeline:
+    def __init__(self):
+        self._handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+        self._listener = None
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        package_logger = logging.getLogger('PrintingSystemWeb') # Also the name of app.logger
+        package_logger.setLevel(app.config['LOG_LEVEL'])
+        package_logger.propagate = False
+        if self._handler not in package_logger.handlers:
+            package_logger.addHandler(self._handler)
+        self.start()
+
+    def start(self):
+        with self._lock:
+            if self._listener is None:
+                stream_handler = logging.StreamHandler(sys.stderr)
+                stream_handler.setFormatter(JsonLineFormatter())
+                self._listener = logging.handlers.QueueListener(self._handler.queue, stream_handler)
+                self._listener.start()
+
+    def stop(self):
+        """Writes out everything still queued and stops the writer thread."""
+        with self._lock:
+            if self._listener is not None:
+                self._listener.stop()
+                self._listener = None
+
+    def _reset(self):
+        """A forked child inherits the queue but not the writer thread; give it both afresh."""
+        self._lock = threading.Lock()
+        running = self._listener is not None
+        self._handler.queue = queue.SimpleQueue()
+        self._listener = None
+        if running:
+            self.start()
+
+
+logger = logging.getLogger(__name__)
+log_pipeline = LogPipeline() # Configured by create_app()
+atexit.register(log_pipeline.stop)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=log_pipeline._reset)
@@ -0,0 +1,252 @@
+# PrintingSystemWeb/models.py
+
+from datetime import datetime
+
+from flask_sqlalchemy import SQLAlchemy
+
+from PrintingSystemWeb.money import Cents, from_cents
+
+# Bound to the application in create_app() (see __init__.py)
+db = SQLAlchemy()
+
+
+# --- Database Models ---
+class TransactionHeader(db.Model):
+    # Every report filters on the date and sorts on (date, time)
+    __table_args__ = (
+        db.Index('ix_transaction_header_date_time', 'transaction_date', 'transaction_time'),
+    )
+
+    id = db.Column(db.String(50), primary_key=True) 
+    transaction_date = db.Column(db.Date, nullable=False)
+    transaction_time = db.Column(db.Time, nullable=False)
+    total_amount_cents = db.Column(Cents, nullable=False, default=0)
+
+    items = db.relationship('TransactionItem', backref='header', lazy=True, cascade="all, delete-orphan")
+
+    def __repr__(self):
+        return f"TransactionHeader('{self.id}', '{self.transaction_date}')"
+
+    def to_dict(self): # Helper for jsonify
+        return {
+            'id': self.id,
+            'date': self.transaction_date.strftime("%m/%d/%Y"),
+            'time': self.transaction_time.strftime("%I:%M%p"),
+            'total': from_cents(self.total_amount_cents)
+        }
+
+class TransactionItem(db.Model):
+    # Covers the join from transaction_header plus every column the summary
+    # aggregates read, so report summaries never touch the table rows.
+    __table_args__ = (
+        db.Index('ix_transaction_item_header_summary',
+                 'transaction_header_id', 'paper_type', 'color', 'pages', 'item_total_cents'),
+    )
+
+    item_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    transaction_header_id = db.Column(db.String(50), db.ForeignKey('transaction_header.id'), nullable=False)
+    
+    paper_type = db.Column(db.String(50), nullable=False)
+    color = db.Column(db.String(50), nullable=False)
+    pages = db.Column(db.Integer, nullable=False)
+    price_per_page_cents = db.Column(Cents, nullable=False)
+    item_total_cents = db.Column(Cents, nullable=False)
+
+    def __repr__(self):
+        return f"TransactionItem('{self.item_id}', '{self.paper_type}', '{self.pages}')"
+
+    def to_dict(self): # Helper for jsonify (for detailed report)
+        return {
+            'id': self.header.id, 
+            'date': self.header.transaction_date.strftime("%m/%d/%Y"),
+            'time': self.header.transaction_time.strftime("%I:%M%p"),
+            'paperType': self.paper_type,
+            'color': self.color,
+            'pages': self.pages,
+            'pricePerPage': from_cents(self.price_per_page_cents),
+            'total': from_cents(self.item_total_cents)
+        }
+
+# Idempotency keys of transactions submitted through /confirm-transactions, so a
+# terminal can safely resend a batch after a timeout or reconnect.
+class TransactionIdempotencyKey(db.Model):
+    __tablename__ = 'transaction_idempotency_key'
+    key = db.Column(db.String(100), primary_key=True)
+    transaction_header_id = db.Column(db.String(50), db.ForeignKey('transaction_header.id'), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.now, nullable=False)
+
+    def __repr__(self):
+        return f"TransactionIdempotencyKey('{self.key}', '{self.transaction_header_id}')"
+
+# --- NEW: Customer Order Request Models ---
+class CustomerOrderRequest(db.Model):
+    __tablename__ = 'customer_order_request' # Explicit table name
+    __table_args__ = (
+        db.Index('ix_customer_order_request_status_date', 'status', 'request_date'), # Status filter + ordering
+        db.Index('ix_customer_order_request_date', 'request_date'), # 'All' orders, newest first
+    )
+    request_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    customer_name = db.Column(db.String(100), nullable=False)
+    file_name = db.Column(db.String(255), nullable=False) # Changed to nullable=False as per screenshot implies required
+    file_url = db.Column(db.String(255), nullable=True)  # For URL
+    note = db.Column(db.Text, nullable=True)
+    request_date = db.Column(db.DateTime, default=datetime.now, nullable=False)
+    status = db.Column(db.String(50), default='Pending', nullable=False) # e.g., Pending, Processed, Rejected
+    file_sha256 = db.Column(db.String(64), db.ForeignKey('stored_file.sha256'), nullable=True) # Uploaded file, if any
+
+    items = db.relationship('CustomerOrderItem', backref='request', lazy=True, cascade="all, delete-orphan")
+    stored_file = db.relationship('StoredFile', lazy=True)
+
+    def to_dict(self):
+        return {
+            'requestId': self.request_id,
+            'customerName': self.customer_name,
+            'fileName': self.file_name,
+            'fileUrl': self.file_url,
+            'note': self.note,
+            'requestDate': self.request_date.strftime("%m/%d/%Y %I:%M%p"),
+            'status': self.status,
+            'items': [item.to_dict() for item in self.items],
+            'uploadedFile': self.stored_file.to_dict(self.request_id) if self.stored_file else None
+        }
+
+class CustomerOrderItem(db.Model):
+    __tablename__ = 'customer_order_item' # Explicit table name
+    __table_args__ = (
+        db.Index('ix_customer_order_item_request', 'request_header_id'),
+    )
+
+    item_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    request_header_id = db.Column(db.Integer, db.ForeignKey('customer_order_request.request_id'), nullable=False)
+    
+    paper_type = db.Column(db.String(50), nullable=False)
+    color = db.Column(db.String(50), nullable=False)
+    pages = db.Column(db.Integer, nullable=False)
+    price_per_page_cents = db.Column(Cents, nullable=False) # Price is still here, for customer's reference
+    item_total_cents = db.Column(Cents, nullable=False) # Total for this item
+
+    def to_dict(self):
+        return {
+            'paperType': self.paper_type,
+            'color': self.color,
+            'pages': self.pages,
+            'pricePerPage': from_cents(self.price_per_page_cents),
+            'itemTotal': from_cents(self.item_total_cents)
+        }
+
+# A file uploaded with a customer order, stored once per content (see uploads.py).
+# page_count is filled in by a background worker: page_count_status is
+# 'pending' until then, 'counted' or 'failed' after, and 'unsupported' for non-PDFs.
+class StoredFile(db.Model):
+    __tablename__ = 'stored_file'
+    sha256 = db.Column(db.String(64), primary_key=True)
+    size = db.Column(db.Integer, nullable=False)
+    content_type = db.Column(db.String(100), nullable=True)
+    page_count = db.Column(db.Integer, nullable=True)
+    page_count_status = db.Column(db.String(20), nullable=False, default='pending')
+    created_at = db.Column(db.DateTime, default=datetime.now, nullable=False)
+
+    def __repr__(self):
+        return f"StoredFile('{self.sha256}', '{self.size}', '{self.page_count_status}')"
+
+    def to_dict(self, request_id):
+        return {
+            'sha256': self.sha256,
+            'size': self.size,
+            'pages': self.page_count,
+            'pageCountStatus': self.page_count_status,
+            'url': f'/order-file/{request_id}'
+        }
+# --- END NEW MODELS ---
+
+# --- Daily Sales Rollup (pre-aggregated totals for the summary endpoints) ---
+class DailySalesRollup(db.Model):
+    __tablename__ = 'daily_sales_rollup'
+    rollup_date = db.Column(db.Date, primary_key=True)
+    paper_type = db.Column(db.String(50), primary_key=True) # Stored lower-cased, e.g. 'short'
+    color = db.Column(db.String(50), primary_key=True) # Stored lower-cased, e.g. 'black'
+
+    pages = db.Column(db.Integer, nullable=False, default=0)
+    revenue_cents = db.Column(Cents, nullable=False, default=0)
+    # Each transaction is counted once, in the bucket of its first item, so
+    # SUM(transaction_count) over whole days is the exact number of transactions.
+    transaction_count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"DailySalesRollup('{self.rollup_date}', '{self.paper_type}', '{self.color}')"
+
+# A closed month whose transactions were moved out of transaction_header /
+# transaction_item into a segment file (see archive.py). The row keeps the
+# month's precomputed totals, so reports over whole archived months never
+# open the file. The daily rollup keeps its rows for archived days.
+class ArchivedMonth(db.Model):
+    __tablename__ = 'archived_month'
+    month = db.Column(db.String(7), primary_key=True) # 'YYYY-MM'
+    file_name = db.Column(db.String(100), nullable=False) # Segment file in ARCHIVE_DIR
+
+    item_count = db.Column(db.Integer, nullable=False)
+    transaction_count = db.Column(db.Integer, nullable=False)
+    pages = db.Column(db.Integer, nullable=False)
+    revenue_cents = db.Column(Cents, nullable=False)
+    type_pages = db.Column(db.Text, nullable=False) # JSON {paper_type: pages}, lower-cased keys
+    color_pages = db.Column(db.Text, nullable=False) # JSON {color: pages}, lower-cased keys
+    archived_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+
+    def __repr__(self):
+        return f"ArchivedMonth('{self.month}', '{self.item_count}')"
+
+# Transactions moved into the month archive (see archive.py). Their IDs stay
+# known here, so a records.csv import does not insert them a second time, and
+# so does the idempotency key a terminal sent with them, so a resent batch is
+# still answered as a duplicate.
+class ArchivedTransaction(db.Model):
+    __tablename__ = 'archived_transaction'
+    __table_args__ = (
+        db.Index('ix_archived_transaction_month', 'month'), # restore_month() drops a month's rows
+        db.Index('ix_archived_transaction_idempotency_key', 'idempotency_key', unique=True),
+    )
+    id = db.Column(db.String(50), primary_key=True) # TransactionHeader.id
+    month = db.Column(db.String(7), nullable=False) # 'YYYY-MM', as on ArchivedMonth
+    idempotency_key = db.Column(db.String(100), nullable=True) # Only for /confirm-transactions sales
+
+    def __repr__(self):
+        return f"ArchivedTransaction('{self.id}', '{self.month}')"
+
+# Live update events behind /events (see events.py). Every server process
+# polls this table, so a browser sees the writes handled by any of them. Only
+# the most recent EVENTS_HISTORY_SIZE rows are kept; AUTOINCREMENT keeps ids
+# from being reused after old rows are pruned, since they are the SSE event IDs.
+class LiveEvent(db.Model):
+    __tablename__ = 'live_event'
+    __table_args__ = {'sqlite_autoincrement': True}
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    event_type = db.Column(db.String(50), nullable=False)
+    payload = db.Column(db.Text, nullable=False) # JSON
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.now)
+
+    def __repr__(self):
+        return f"LiveEvent('{self.id}', '{self.event_type}')"
+
+# A single row counting the bulk writes that can change reports of any date
+# (imports, resets, rollup rebuilds, archiving). Every process compares it
+# with the value its report cache was filled under (see cache.py).
+class ReportGeneration(db.Model):
+    __tablename__ = 'report_generation'
+    id = db.Column(db.Integer, primary_key=True) # Always 1
+    generation = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"ReportGeneration('{self.generation}')"
+
+# Per-page price for each paper type and color. The server prices every item
+# from this table (see pricing.py); clients fetch it from /price-table.
+class PriceTable(db.Model):
+    __tablename__ = 'price_table'
+    paper_type = db.Column(db.String(50), primary_key=True) # Stored lower-cased, e.g. 'short'
+    color = db.Column(db.String(50), primary_key=True) # Stored lower-cased, e.g. 'black'
+
+    price_per_page_cents = db.Column(Cents, nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.now, onupdate=datetime.now)
+
+    def __repr__(self):
+        return f"PriceTable('{self.paper_type}', '{self.color}', '{self.price_per_page_cents}')"
@@ -0,0 +1,49 @@
+# PrintingSystemWeb/money.py
+
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+from sqlalchemy.types import Integer, TypeDecorator
+
+
+# --- Money as integer cents ---
+# Every amount (prices, item totals, transaction totals, rollup revenue) is
+# stored and computed as an integer number of centavos: SUMs in SQLite are
+# exact integer additions and Python adds plain ints, with no float drift and
+# no Decimal overhead in hot loops. Amounts only become pesos at the edges:
+# to_cents() when a client or CSV file supplies one, from_cents() when a
+# response, event or export is serialized.
+
+class Cents(TypeDecorator):
+    """An integer column of centavos. Binding anything but an int is a bug (use to_cents())."""
+    impl = Integer
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None or (type(value) is int):
+            return value
+        raise TypeError(f"Cents columns take integer centavos, got {value!r}; convert with to_cents()")
+
+
+def to_cents(value):
+    """Converts an amount in pesos (str, int, float or Decimal) to integer centavos, rounding half up."""
+    if isinstance(value, bool):
+        raise ValueError(f"Invalid amount: {value!r}")
+    try:
+        amount = Decimal(str(value))
+    except (InvalidOperation, ValueError):
+        raise ValueError(f"Invalid amount: {value!r}")
+    if not amount.is_finite():
+        raise ValueError(f"Invalid amount: {value!r}")
+    return int((amount * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def from_cents(cents):
+    """The display value (pesos as a float, for JSON and spreadsheets) of integer centavos."""
+    return cents / 100
+
+
+def format_cents(cents):
+    """Centavos as a fixed two-decimal string, e.g. 1250 -> '12.50' (CSV exports)."""
+    sign = '-' if cents < 0 else ''
+    whole, fraction = divmod(abs(cents), 100)
+    return f"{sign}{whole}.{fraction:02}"
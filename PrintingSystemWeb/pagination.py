@@ -0,0 +1,47 @@
+# PrintingSystemWeb/pagination.py
+
+import base64
+from datetime import date, time
+
+from PrintingSystemWeb import db, TransactionHeader, TransactionItem
+
+
+# --- Keyset (cursor) pagination helpers ---
+# A cursor is the (transaction_date, transaction_time, item_id) of the last row
+# on a page, packed into an opaque URL-safe token. Dates and times are kept as
+# the raw text SQLite stores (older rows have no microseconds, e.g. '08:41:28'),
+# because that text is what ORDER BY compares; converting through datetime.time
+# would turn '08:41:28' into '08:41:28.000000' and repeat rows across pages.
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor token that cannot be decoded."""
+
+
+# Sort key columns of the record list, read and compared as their stored text
+RECORD_SORT_KEY = (
+    db.type_coerce(TransactionHeader.transaction_date, db.String),
+    db.type_coerce(TransactionHeader.transaction_time, db.String),
+    TransactionItem.item_id,
+)
+
+
+def encode_cursor(date_str, time_str, item_id):
+    raw = f"{date_str}|{time_str}|{item_id}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(token):
+    """Returns the (date_str, time_str, item_id) tuple packed in `token`."""
+    try:
+        raw = base64.urlsafe_b64decode(token.encode('ascii')).decode('utf-8')
+        date_str, time_str, item_id = raw.split('|')
+        date.fromisoformat(date_str) # Validate only; the raw text is what gets compared
+        time.fromisoformat(time_str)
+        return date_str, time_str, int(item_id)
+    except (ValueError, UnicodeError) as e:
+        raise InvalidCursor(f"Invalid cursor: {token}") from e
+
+
+def seek_before(query, cursor):
+    """Restricts a query sorted descending on RECORD_SORT_KEY to the rows after `cursor`."""
+    return query.filter(db.tuple_(*RECORD_SORT_KEY) < db.tuple_(*decode_cursor(cursor)))
@@ -0,0 +1,176 @@
+# PrintingSystemWeb/pricing.py
+
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from PrintingSystemWeb import db, PriceTable
+from PrintingSystemWeb.money import from_cents, to_cents
+
+# Seed prices for an empty price_table, in centavos (the prices
+# customer_order_script.js used to hardcode)
+DEFAULT_PRICES = {
+    ('short', 'black'): 100,
+    ('short', 'colored'): 200,
+    ('long', 'black'): 150,
+    ('long', 'colored'): 300,
+    ('a4', 'black'): 120,
+    ('a4', 'colored'): 250,
+    ('photopaper', 'black'): 500,
+    ('photopaper', 'colored'): 800,
+}
+
+
+class PricingError(ValueError):
+    """Raised when an item cannot be priced (unknown paper type/color, bad pages or amount)."""
+
+
+# --- In-memory price table ---
+# The table is tiny, so every process keeps all of it in a
+# {(paper_type, color): centavos} dict and prices orders without touching the
+# database. The dict is re-read at most every PRICE_TABLE_RELOAD_SECONDS to
+# pick up changes made by other processes; set_price() reloads it at once.
+# Each snapshot carries an ETag over its contents for /price-table.
+
+class PriceBook:
+    def __init__(self, reload_seconds=5):
+        self.reload_seconds = reload_seconds
+        self._snapshot = None # (prices, etag), replaced as a whole so readers never see a half-built one
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.reload_seconds = app.config['PRICE_TABLE_RELOAD_SECONDS']
+        self._snapshot = None # Another app may point at another database
+
+    def snapshot(self, session=None):
+        """Returns (prices, etag) for the current price table."""
+        if self._snapshot is not None and time.monotonic() - self._loaded_at < self.reload_seconds:
+            return self._snapshot
+        with self._lock:
+            if self._snapshot is None or time.monotonic() - self._loaded_at >= self.reload_seconds:
+                prices = _load_prices(session or db.session)
+                if self._snapshot is None or prices != self._snapshot[0]:
+                    self._snapshot = (prices, _etag_for(prices))
+                self._loaded_at = time.monotonic()
+            return self._snapshot
+
+    def invalidate(self):
+        """Forces the next snapshot() to re-read the table."""
+        self._loaded_at = float('-inf')
+
+
+def _load_prices(session):
+    prices = {
+        (paper_type, color): price_per_page_cents
+        for paper_type, color, price_per_page_cents in session.query(
+            PriceTable.paper_type, PriceTable.color, PriceTable.price_per_page_cents
+        )
+    }
+    return prices or dict(DEFAULT_PRICES) # Databases that have not run upgrade-db yet
+
+
+def _etag_for(prices):
+    canonical = json.dumps(sorted(prices.items()))
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()
+
+
+price_book = PriceBook() # Configured by create_app()
+
+
+def price_table_payload(prices):
+    """The price table as JSON for clients: {paper_type: {color: price_per_page}}."""
+    payload = {}
+    for (paper_type, color), price in sorted(prices.items()):
+        payload.setdefault(paper_type, {})[color] = from_cents(price)
+    return payload
+
+
+# --- Maintenance ---
+def seed_default_prices(session=None):
+    """Adds any DEFAULT_PRICES entry missing from price_table; existing prices are kept."""
+    session = session or db.session
+    stmt = sqlite_insert(PriceTable).on_conflict_do_nothing(index_elements=['paper_type', 'color'])
+    session.execute(stmt, [
+        {'paper_type': paper_type, 'color': color, 'price_per_page_cents': price}
+        for (paper_type, color), price in DEFAULT_PRICES.items()
+    ])
+    price_book.invalidate()
+
+
+def set_price(paper_type, color, price_per_page, session=None):
+    """Creates or updates one price, given in pesos (the caller commits). Returns the new price in centavos."""
+    session = session or db.session
+    price_per_page_cents = _to_cents(price_per_page)
+    stmt = sqlite_insert(PriceTable).values(
+        paper_type=paper_type.lower(), color=color.lower(), price_per_page_cents=price_per_page_cents
+    )
+    session.execute(stmt.on_conflict_do_update(
+        index_elements=['paper_type', 'color'],
+        set_={'price_per_page_cents': stmt.excluded.price_per_page_cents, 'updated_at': datetime.now()}
+    ))
+    price_book.invalidate()
+    return price_per_page_cents
+
+
+# --- Pricing orders ---
+def _to_cents(value):
+    """Converts a client-supplied amount in pesos to non-negative integer centavos."""
+    try:
+        cents = to_cents(value)
+    except ValueError:
+        raise PricingError(f"Invalid amount: {value!r}")
+    if cents < 0:
+        raise PricingError(f"Invalid amount: {value!r}")
+    return cents
+
+
+def _page_count(value):
+    """Converts a client-supplied page count to a positive int; fractions are rejected, never truncated."""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise PricingError(f"Invalid page count: {value!r}")
+    try:
+        pages = int(value) # Strings must hold a whole number: int('2.7') raises
+    except ValueError:
+        raise PricingError(f"Invalid page count: {value!r}")
+    if pages <= 0:
+        raise PricingError(f"Invalid page count: {value!r}")
+    return pages
+
+
+def price_items(items_data, allow_overrides=False, session=None):
+    """
+    Prices all items of one order in a single pass over one price table snapshot.
+    A client-sent pricePerPage is ignored unless `allow_overrides` is set
+    (staff counter); a client-sent itemTotal is always ignored, every total is
+    pages x price per page. Returns (items, total_cents), where items are
+    (paper_type, color, pages, price_per_page_cents, item_total_cents) tuples;
+    all amounts are integer centavos, so the totals are exact.
+    """
+    if not isinstance(items_data, list) or not items_data:
+        raise PricingError('No items provided')
+    prices, _ = price_book.snapshot(session)
+
+    items = []
+    for item in items_data:
+        try:
+            paper_type, color, pages = str(item['paperType']), str(item['color']), item['pages']
+        except (TypeError, KeyError):
+            raise PricingError('Every item needs paperType, color and pages.')
+        pages = _page_count(pages)
+        price_per_page_cents = prices.get((paper_type.lower(), color.lower()))
+        if price_per_page_cents is None:
+            raise PricingError(f"No price set for {paper_type} / {color}.")
+
+        if allow_overrides and item.get('pricePerPage') is not None:
+            price_per_page_cents = _to_cents(item['pricePerPage'])
+        item_total_cents = price_per_page_cents * pages # Never taken from the client
+        items.append((paper_type, color, pages, price_per_page_cents, item_total_cents))
+
+    return items, sum(item[4] for item in items)
@@ -0,0 +1,69 @@
+# PrintingSystemWeb/reports.py
+
+from PrintingSystemWeb import db, TransactionHeader, TransactionItem
+from PrintingSystemWeb.archive import archived_totals
+from PrintingSystemWeb.money import from_cents
+
+
+# --- Summary engine ---
+# Paper types and colors reported in the summary, mapped to their JSON keys.
+PAPER_TYPE_KEYS = {
+    'short': 'totalShortPages',
+    'long': 'totalLongPages',
+    'a4': 'totalA4Pages',
+    'photopaper': 'totalPhotoPaperPages',
+}
+COLOR_KEYS = {
+    'black': 'totalBlackPages',
+    'colored': 'totalColoredPages',
+}
+
+
+def _pages_where(condition):
+    """SUM(pages) restricted to the rows matching `condition` (0 when none match)."""
+    return db.func.coalesce(db.func.sum(db.case((condition, TransactionItem.pages), else_=0)), 0)
+
+
+def summarize_sales(from_date=None, to_date=None, session=None):
+    """
+    Computes the sales summary (totals, distinct transactions and page counts
+    by paper type and color) for TransactionItems between two dates
+    (datetime.date objects, both inclusive; None means unbounded).
+    The live tables are aggregated by SQLite in a single query, no rows are
+    loaded; archived months add their stored totals (see archive.py).
+    """
+    session = session or db.session
+    paper_type = db.func.lower(TransactionItem.paper_type)
+    color = db.func.lower(TransactionItem.color)
+
+    columns = [
+        db.func.coalesce(db.func.sum(TransactionItem.item_total_cents), 0), # Exact integer SUM
+        db.func.coalesce(db.func.sum(TransactionItem.pages), 0),
+        db.func.count(db.distinct(TransactionItem.transaction_header_id)),
+    ]
+    columns += [_pages_where(paper_type == name) for name in PAPER_TYPE_KEYS]
+    columns += [_pages_where(color == name) for name in COLOR_KEYS]
+
+    query = session.query(*columns)
+    if from_date is not None or to_date is not None:
+        query = query.join(TransactionHeader)
+        if from_date is not None:
+            query = query.filter(TransactionHeader.transaction_date >= from_date)
+        if to_date is not None:
+            query = query.filter(TransactionHeader.transaction_date <= to_date)
+
+    row = query.one()
+    archived = archived_totals(from_date, to_date, session=session)
+    total_sales, total_pages, num_transactions = row[:3]
+    summary = {
+        'totalSales': from_cents(total_sales + archived['revenue_cents']),
+        'totalPages': int(total_pages) + archived['pages'],
+        'numTransactions': int(num_transactions) + archived['transactions'],
+    }
+    page_counts = row[3:]
+    archived_pages = [archived['type_pages'].get(name, 0) for name in PAPER_TYPE_KEYS]
+    archived_pages += [archived['color_pages'].get(name, 0) for name in COLOR_KEYS]
+    for key, pages, more_pages in zip(list(PAPER_TYPE_KEYS.values()) + list(COLOR_KEYS.values()),
+                                      page_counts, archived_pages):
+        summary[key] = int(pages) + more_pages
+    return summary
@@ -0,0 +1,262 @@
+# PrintingSystemWeb/rollup.py
+
+from datetime import date, timedelta
+
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from PrintingSystemWeb import db, TransactionHeader, TransactionItem, DailySalesRollup
+from PrintingSystemWeb.reports import PAPER_TYPE_KEYS, COLOR_KEYS
+from PrintingSystemWeb.archive import archived_buckets
+from PrintingSystemWeb.cache import mark_reports_stale
+from PrintingSystemWeb.money import from_cents
+
+# Sales timeseries bucket sizes -> SQL expression giving each rollup day's bucket start
+TIMESERIES_BUCKETS = {
+    'day': lambda day: day,
+    'week': lambda day: db.func.date(day, 'weekday 0', '-6 days'), # Monday of an ISO (Mon-Sun) week
+    'month': lambda day: db.func.date(day, 'start of month'),
+}
+# groupBy names -> rollup column (stored lower-cased) and JSON key
+TIMESERIES_GROUPS = {
+    'paper_type': (DailySalesRollup.paper_type, 'paperType'),
+    'color': (DailySalesRollup.color, 'color'),
+}
+
+
+# --- Incremental maintenance ---
+def record_transactions_in_rollup(transactions, session=None):
+    """
+    Adds confirmed transactions to the daily rollup.
+    `transactions` is an iterable of (transaction_date, items) pairs, where
+    `items` is an iterable of (paper_type, color, pages, item_total_cents) tuples.
+    Items are merged per (date, paper_type, color) bucket first and written
+    with one executemany upsert. Runs inside the caller's session, so it
+    commits (or rolls back) together with the TransactionHeader/TransactionItem rows.
+    """
+    session = session or db.session
+    buckets = {}
+    for transaction_date, items in transactions:
+        for index, (paper_type, color, pages, item_total_cents) in enumerate(items):
+            key = (transaction_date, paper_type.lower(), color.lower())
+            bucket = buckets.setdefault(key, {'pages': 0, 'revenue_cents': 0, 'transaction_count': 0})
+            bucket['pages'] += int(pages)
+            bucket['revenue_cents'] += item_total_cents
+            if index == 0:
+                bucket['transaction_count'] += 1
+    _add_buckets(buckets, session)
+
+
+def _add_buckets(buckets, session):
+    """Upserts {(date, paper_type, color): {'pages', 'revenue_cents', 'transaction_count'}}, adding to existing rows."""
+    if not buckets:
+        return
+
+    stmt = sqlite_insert(DailySalesRollup)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['rollup_date', 'paper_type', 'color'],
+        set_={
+            'pages': DailySalesRollup.pages + stmt.excluded.pages,
+            'revenue_cents': DailySalesRollup.revenue_cents + stmt.excluded.revenue_cents,
+            'transaction_count': DailySalesRollup.transaction_count + stmt.excluded.transaction_count,
+        }
+    )
+    session.execute(stmt, [
+        {'rollup_date': rollup_date, 'paper_type': paper_type, 'color': color, **totals}
+        for (rollup_date, paper_type, color), totals in buckets.items()
+    ])
+
+
+def record_transaction_in_rollup(transaction_date, items, session=None):
+    """Adds one confirmed transaction to the daily rollup (see record_transactions_in_rollup)."""
+    record_transactions_in_rollup([(transaction_date, items)], session=session)
+
+
+def rebuild_rollup(session=None):
+    """
+    Recomputes the whole daily rollup from existing TransactionItem rows with
+    a single INSERT ... SELECT, then adds the archived months' rows from their
+    segment files. Returns the number of rollup rows written.
+    """
+    session = session or db.session
+    first_items = db.select(
+        TransactionItem.transaction_header_id,
+        db.func.min(TransactionItem.item_id).label('first_item_id')
+    ).group_by(TransactionItem.transaction_header_id).subquery()
+
+    paper_type = db.func.lower(TransactionItem.paper_type)
+    color = db.func.lower(TransactionItem.color)
+    grouped = db.select(
+        TransactionHeader.transaction_date,
+        paper_type,
+        color,
+        db.func.sum(TransactionItem.pages),
+        db.func.sum(TransactionItem.item_total_cents),
+        db.func.sum(db.case((TransactionItem.item_id == first_items.c.first_item_id, 1), else_=0))
+    ).select_from(TransactionItem).join(TransactionHeader).join(
+        first_items, first_items.c.transaction_header_id == TransactionItem.transaction_header_id
+    ).group_by(TransactionHeader.transaction_date, paper_type, color)
+
+    session.execute(db.delete(DailySalesRollup))
+    session.execute(db.insert(DailySalesRollup).from_select(
+        ['rollup_date', 'paper_type', 'color', 'pages', 'revenue_cents', 'transaction_count'], grouped
+    ))
+    for buckets in archived_buckets(session=session):
+        _add_buckets(buckets, session)
+    mark_reports_stale(session)
+    return session.query(db.func.count()).select_from(DailySalesRollup).scalar()
+
+
+def clear_rollup(session=None):
+    """Deletes every rollup row (used when all transaction records are reset)."""
+    session = session or db.session
+    session.execute(db.delete(DailySalesRollup))
+    mark_reports_stale(session)
+
+
+# --- Reading ---
+def _month_end(day):
+    """Last day of the month containing `day`."""
+    if day.month == 12:
+        return date(day.year, 12, 31)
+    return date(day.year, day.month + 1, 1) - timedelta(days=1)
+
+
+def _revenue_between(start, end):
+    return db.func.coalesce(db.func.sum(db.case(
+        (DailySalesRollup.rollup_date.between(start, end), DailySalesRollup.revenue_cents), else_=0
+    )), 0)
+
+
+def _pages_where(condition):
+    return db.func.coalesce(db.func.sum(db.case((condition, DailySalesRollup.pages), else_=0)), 0)
+
+
+def rollup_sales_summary(today, session=None):
+    """
+    Builds the quick sales summary (today/month/year income plus all-time
+    totals) from the daily rollup in one query that scans O(days) rows.
+    """
+    session = session or db.session
+    columns = [
+        _revenue_between(today, today),
+        _revenue_between(today.replace(day=1), _month_end(today)),
+        _revenue_between(date(today.year, 1, 1), date(today.year, 12, 31)),
+        db.func.coalesce(db.func.sum(DailySalesRollup.pages), 0),
+        db.func.coalesce(db.func.sum(DailySalesRollup.transaction_count), 0),
+    ]
+    columns += [_pages_where(DailySalesRollup.paper_type == name) for name in PAPER_TYPE_KEYS]
+    columns += [_pages_where(DailySalesRollup.color == name) for name in COLOR_KEYS]
+
+    row = session.query(*columns).one()
+    today_income, month_income, year_income, total_pages, num_transactions = row[:5]
+    summary = {
+        'todayIncome': from_cents(today_income),
+        'monthIncome': from_cents(month_income),
+        'yearIncome': from_cents(year_income),
+        'totalPages': int(total_pages),
+        'numTransactions': int(num_transactions),
+    }
+    for key, pages in zip(list(PAPER_TYPE_KEYS.values()) + list(COLOR_KEYS.values()), row[5:]):
+        summary[key] = int(pages)
+    return summary
+
+
+def sales_summary_delta(transactions, today):
+    """
+    How the quick sales summary (see rollup_sales_summary) changes when
+    `transactions` are added; same (transaction_date, items) input as
+    record_transactions_in_rollup. Lets dashboards update without refetching.
+    """
+    delta = dict.fromkeys(['todayIncome', 'monthIncome', 'yearIncome', 'totalPages', 'numTransactions'], 0)
+    delta.update(dict.fromkeys(list(PAPER_TYPE_KEYS.values()) + list(COLOR_KEYS.values()), 0))
+    today_income = month_income = year_income = 0
+    for transaction_date, items in transactions:
+        revenue = sum(item_total_cents for _, _, _, item_total_cents in items)
+        if transaction_date.year == today.year:
+            year_income += revenue
+            if transaction_date.month == today.month:
+                month_income += revenue
+                if transaction_date == today:
+                    today_income += revenue
+        delta['numTransactions'] += 1
+        for paper_type, color, pages, _ in items:
+            delta['totalPages'] += int(pages)
+            if paper_type.lower() in PAPER_TYPE_KEYS:
+                delta[PAPER_TYPE_KEYS[paper_type.lower()]] += int(pages)
+            if color.lower() in COLOR_KEYS:
+                delta[COLOR_KEYS[color.lower()]] += int(pages)
+    delta['todayIncome'] = from_cents(today_income)
+    delta['monthIncome'] = from_cents(month_income)
+    delta['yearIncome'] = from_cents(year_income)
+    return delta
+
+
+def _bucket_starts(from_date, to_date, bucket):
+    """Start dates of every `bucket` overlapping from_date..to_date, oldest first."""
+    if bucket == 'week':
+        start = from_date - timedelta(days=from_date.weekday())
+    elif bucket == 'month':
+        start = from_date.replace(day=1)
+    else:
+        start = from_date
+    starts = []
+    while start <= to_date:
+        starts.append(start)
+        if bucket == 'month':
+            start = _month_end(start) + timedelta(days=1)
+        else:
+            start += timedelta(days=7 if bucket == 'week' else 1)
+    return starts
+
+
+def count_timeseries_buckets(from_date, to_date, bucket):
+    """Number of buckets rollup_sales_timeseries() returns for the range (for request limits)."""
+    return len(_bucket_starts(from_date, to_date, bucket))
+
+
+def rollup_sales_timeseries(from_date, to_date, bucket='day', group_by=(), session=None):
+    """
+    Sales and pages per day, week (Monday-based) or month between two dates
+    (inclusive), optionally split by paper type and/or color. One grouped
+    query over the daily rollup; buckets without sales are zero-filled.
+    Returns {'buckets': [ISO start dates], 'series': [{group keys..., 'sales': [...],
+    'pages': [...]}]}, every list aligned with 'buckets'. Ungrouped series also
+    carry 'transactions' (only exact when not split, see DailySalesRollup).
+    """
+    session = session or db.session
+    bucket_start = TIMESERIES_BUCKETS[bucket](DailySalesRollup.rollup_date)
+    group_columns = [TIMESERIES_GROUPS[name][0] for name in group_by]
+    group_keys = [TIMESERIES_GROUPS[name][1] for name in group_by]
+    columns = [
+        db.func.sum(DailySalesRollup.revenue_cents),
+        db.func.sum(DailySalesRollup.pages),
+        db.func.sum(DailySalesRollup.transaction_count),
+    ]
+    rows = session.query(bucket_start, *group_columns, *columns).filter(
+        DailySalesRollup.rollup_date.between(from_date, to_date)
+    ).group_by(bucket_start, *group_columns).all()
+
+    starts = _bucket_starts(from_date, to_date, bucket)
+    position = {start.isoformat(): index for index, start in enumerate(starts)}
+    series = {} # group values -> series dict with zero-filled lists
+    for row in rows:
+        start, group = row[0], tuple(row[1:1 + len(group_columns)])
+        revenue_cents, pages, transactions = row[1 + len(group_columns):]
+        entry = series.get(group)
+        if entry is None:
+            entry = series[group] = dict(zip(group_keys, group))
+            entry['sales'] = [0.0] * len(starts)
+            entry['pages'] = [0] * len(starts)
+            if not group_columns:
+                entry['transactions'] = [0] * len(starts)
+        index = position[str(start)]
+        entry['sales'][index] = from_cents(revenue_cents)
+        entry['pages'][index] = int(pages)
+        if not group_columns:
+            entry['transactions'][index] = int(transactions)
+    if not group_columns and not series: # Ungrouped: always one (possibly all-zero) series
+        series[()] = {'sales': [0.0] * len(starts), 'pages': [0] * len(starts), 'transactions': [0] * len(starts)}
+    return {
+        'buckets': [start.isoformat() for start in starts],
+        'series': [series[group] for group in sorted(series)],
+    }
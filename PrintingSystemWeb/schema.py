@@ -0,0 +1,116 @@
+# PrintingSystemWeb/schema.py
+
+from PrintingSystemWeb import db
+
+
+# --- Schema upgrades for existing databases ---
+# db.create_all() only creates missing tables; it never adds columns or
+# indexes to a table that already exists. upgrade_schema() fills that gap.
+
+def upgrade_schema(engine=None):
+    """
+    Creates missing tables, plus any nullable columns and indexes declared on
+    the models that an existing database does not have yet. Returns the names
+    of the indexes created.
+    """
+    engine = engine or db.engine
+    migrate_money_to_cents(engine)
+    db.metadata.create_all(engine)
+
+    created = []
+    with engine.begin() as connection:
+        _add_missing_columns(connection)
+        existing = {
+            index['name']
+            for table_name in db.metadata.tables
+            for index in db.inspect(connection).get_indexes(table_name)
+        }
+        for table in db.metadata.sorted_tables:
+            for index in table.indexes:
+                if index.name not in existing:
+                    index.create(connection)
+                    created.append(index.name)
+        if created:
+            connection.exec_driver_sql('ANALYZE') # Refresh planner statistics for the new indexes
+    return created
+
+
+def _add_missing_columns(connection):
+    """ALTER TABLE ... ADD COLUMN for nullable model columns an existing table lacks."""
+    for table in db.metadata.sorted_tables:
+        existing = {column['name'] for column in db.inspect(connection).get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            if not column.nullable:
+                raise RuntimeError(f"Cannot add NOT NULL column {table.name}.{column.name} to an existing table")
+            column_sql = str(db.schema.CreateColumn(column).compile(connection))
+            connection.exec_driver_sql(f'ALTER TABLE {table.name} ADD COLUMN {column_sql}')
+
+
+# --- Money columns: decimal pesos -> integer centavos ---
+# Old databases stored amounts as NUMERIC(10, 2) columns (SQLite keeps them
+# as floats) named without the _cents suffix. SQLite cannot change a column's
+# type, so each affected table is rebuilt: a new table is created from the
+# model, the rows are copied with every amount converted to whole centavos,
+# and it replaces the old one. Its indexes are recreated by upgrade_schema().
+MONEY_COLUMNS = {
+    'transaction_header': {'total_amount': 'total_amount_cents'},
+    'transaction_item': {'price_per_page': 'price_per_page_cents', 'item_total': 'item_total_cents'},
+    'customer_order_item': {'price_per_page': 'price_per_page_cents', 'item_total': 'item_total_cents'},
+    'daily_sales_rollup': {'revenue': 'revenue_cents'},
+    'price_table': {'price_per_page': 'price_per_page_cents'},
+}
+
+
+def migrate_money_to_cents(engine=None):
+    """
+    Converts the money columns of an existing database to integer centavos.
+    Tables that are already converted (or do not exist yet) are left alone.
+    Returns the names of the tables converted.
+    """
+    engine = engine or db.engine
+    with engine.connect() as connection:
+        existing_tables = set(db.inspect(connection).get_table_names())
+        pending = []
+        for table_name, renames in MONEY_COLUMNS.items():
+            if table_name in existing_tables:
+                old_columns = {column['name'] for column in db.inspect(connection).get_columns(table_name)}
+                if any(old_name in old_columns for old_name in renames):
+                    pending.append((db.metadata.tables[table_name], renames, old_columns))
+        if not pending:
+            return []
+
+        # pysqlite runs DDL outside of any transaction unless one is open, so
+        # open one explicitly: a failed conversion leaves the database untouched
+        connection.exec_driver_sql('BEGIN IMMEDIATE')
+        for table, renames, old_columns in pending:
+            _rebuild_with_cents(connection, table, renames, old_columns)
+        connection.commit()
+    return [table.name for table, _, _ in pending]
+
+
+def _rebuild_with_cents(connection, table, renames, old_columns):
+    new_name = f'{table.name}__cents'
+    create_sql = str(db.schema.CreateTable(table).compile(connection))
+    create_sql = create_sql.replace(f'CREATE TABLE {table.name} ', f'CREATE TABLE {new_name} ', 1)
+
+    old_names = {new: old for old, new in renames.items()}
+    target_columns, source_expressions = [], []
+    for column in table.columns:
+        old_name = old_names.get(column.name)
+        if old_name in old_columns:
+            target_columns.append(column.name)
+            source_expressions.append(f'CAST(ROUND({old_name} * 100) AS INTEGER)')
+        elif column.name in old_columns:
+            target_columns.append(column.name)
+            source_expressions.append(column.name)
+
+    connection.exec_driver_sql(f'DROP TABLE IF EXISTS {new_name}')
+    connection.exec_driver_sql(create_sql)
+    connection.exec_driver_sql(
+        f"INSERT INTO {new_name} ({', '.join(target_columns)}) "
+        f"SELECT {', '.join(source_expressions)} FROM {table.name}"
+    )
+    connection.exec_driver_sql(f'DROP TABLE {table.name}') # Drops its indexes too
+    connection.exec_driver_sql(f'ALTER TABLE {new_name} RENAME TO {table.name}')
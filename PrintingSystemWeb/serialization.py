@@ -0,0 +1,200 @@
+# PrintingSystemWeb/serialization.py
+
+from datetime import time
+from functools import lru_cache
+
+from flask.json.provider import DefaultJSONProvider
+
+from PrintingSystemWeb import db, TransactionHeader, TransactionItem, CustomerOrderRequest, CustomerOrderItem, StoredFile
+from PrintingSystemWeb.money import from_cents
+from PrintingSystemWeb.pagination import RECORD_SORT_KEY
+
+try:
+    import orjson
+except ImportError: # Optional: without it the app keeps Flask's stdlib json provider
+    orjson = None
+
+
+# --- JSON providers ---
+# JSON_PROVIDER picks how jsonify() and request.get_json() encode and decode:
+# 'orjson' (a C encoder, several times faster on large lists), 'stdlib'
+# (Flask's default provider) or 'auto', which uses orjson when it is installed.
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Flask's JSON provider on top of orjson. Output matches the stdlib provider
+    except for key order (keys are not sorted, i.e. dicts keep their insertion
+    order): dates, datetimes and dataclasses still go through Flask's default()
+    so they are serialized the same way.
+    """
+    sort_keys = False
+    _options = (orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME |
+                orjson.OPT_PASSTHROUGH_DATACLASS) if orjson else 0
+
+    def dumps(self, obj, **kwargs):
+        return self.dumps_bytes(obj, indent=kwargs.get('indent')).decode('utf-8')
+
+    def dumps_bytes(self, obj, indent=None):
+        options = self._options | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, default=self.default, option=options)
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s) # Raises orjson.JSONDecodeError, a ValueError like json's
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        return self._app.response_class(self.dumps_bytes(obj, indent=indent) + b'\n', mimetype=self.mimetype)
+
+
+JSON_PROVIDERS = {
+    'stdlib': DefaultJSONProvider,
+    'orjson': OrjsonProvider,
+}
+
+
+def make_json_provider(app):
+    """Builds the provider named by app.config['JSON_PROVIDER'] for `app`."""
+    name = app.config['JSON_PROVIDER'].lower()
+    if name == 'auto':
+        name = 'orjson' if orjson else 'stdlib'
+    if name == 'orjson' and orjson is None:
+        raise RuntimeError("JSON_PROVIDER is 'orjson' but orjson is not installed (pip install orjson)")
+    try:
+        return JSON_PROVIDERS[name](app)
+    except KeyError:
+        raise ValueError(f"Unknown JSON_PROVIDER '{name}'. Choose one of: auto, {', '.join(JSON_PROVIDERS)}")
+
+
+# --- Row serialization ---
+# The list endpoints select plain column tuples instead of ORM objects: no
+# identity map, no instance state, and dates and times are read as the text
+# SQLite stores ('2025-06-18', '14:05:09.123456') rather than parsed into
+# date/time objects only to be strftime'd again. Formatting that text is
+# cached: a page of records repeats a handful of dates, and '%I:%M%p' only
+# depends on the hour and minute, so all 1440 clock strings are built once.
+
+_CLOCK_TEXT = {f"{hour:02}:{minute:02}": time(hour, minute).strftime("%I:%M%p")
+               for hour in range(24) for minute in range(60)}
+
+
+@lru_cache(maxsize=4096)
+def format_stored_date(text):
+    """'2025-06-18' (as stored) -> '06/18/2025', the format of to_dict()."""
+    return f"{text[5:7]}/{text[8:10]}/{text[:4]}"
+
+
+def format_stored_time(text):
+    """'14:05:09[.ffffff]' (as stored) -> '02:05PM', the format of to_dict()."""
+    return _CLOCK_TEXT[text[:5]]
+
+
+def format_stored_datetime(text):
+    """'2025-06-18 14:05:09[.ffffff]' (as stored) -> '06/18/2025 02:05PM'."""
+    return f"{format_stored_date(text[:10])} {_CLOCK_TEXT[text[11:16]]}"
+
+
+# TransactionItem.to_dict() fields, plus item_id for the keyset cursor. The
+# date and time are RECORD_SORT_KEY's raw text, so the cursor of the last row
+# comes straight from the tuple.
+RECORD_COLUMNS = (
+    TransactionHeader.id,
+    RECORD_SORT_KEY[0],
+    RECORD_SORT_KEY[1],
+    TransactionItem.paper_type,
+    TransactionItem.color,
+    TransactionItem.pages,
+    TransactionItem.price_per_page_cents,
+    TransactionItem.item_total_cents,
+    TransactionItem.item_id,
+)
+
+
+def select_records():
+    """SELECT of RECORD_COLUMNS over items joined to their headers, newest first (the /get-records order)."""
+    return db.select(*RECORD_COLUMNS).select_from(TransactionItem).join(TransactionHeader).order_by(
+        TransactionHeader.transaction_date.desc(),
+        TransactionHeader.transaction_time.desc(),
+        TransactionItem.item_id.desc()
+    )
+
+
+def serialize_records(rows):
+    """RECORD_COLUMNS tuples -> list of dicts shaped like TransactionItem.to_dict()."""
+    clock = _CLOCK_TEXT # Lookups and from_cents() inlined: this loop runs once per record
+    return [{
+        'id': transaction_id,
+        'date': format_stored_date(date_text),
+        'time': clock[time_text[:5]],
+        'paperType': paper_type,
+        'color': color,
+        'pages': pages,
+        'pricePerPage': price_per_page_cents / 100,
+        'total': item_total_cents / 100,
+    } for (transaction_id, date_text, time_text, paper_type, color, pages,
+           price_per_page_cents, item_total_cents, _) in rows]
+
+
+ORDER_COLUMNS = (
+    CustomerOrderRequest.request_id,
+    CustomerOrderRequest.customer_name,
+    CustomerOrderRequest.file_name,
+    CustomerOrderRequest.file_url,
+    CustomerOrderRequest.note,
+    db.type_coerce(CustomerOrderRequest.request_date, db.String),
+    CustomerOrderRequest.status,
+    StoredFile.sha256,
+    StoredFile.size,
+    StoredFile.page_count,
+    StoredFile.page_count_status,
+)
+
+def select_orders():
+    """SELECT of ORDER_COLUMNS (uploaded file columns are NULL without one), newest first."""
+    return db.select(*ORDER_COLUMNS).select_from(CustomerOrderRequest).outerjoin(
+        CustomerOrderRequest.stored_file
+    ).order_by(CustomerOrderRequest.request_date.desc())
+
+
+ORDER_ITEM_COLUMNS = (
+    CustomerOrderItem.request_header_id,
+    CustomerOrderItem.paper_type,
+    CustomerOrderItem.color,
+    CustomerOrderItem.pages,
+    CustomerOrderItem.price_per_page_cents,
+    CustomerOrderItem.item_total_cents,
+)
+
+
+def serialize_orders(order_rows, item_rows):
+    """
+    ORDER_COLUMNS tuples plus the ORDER_ITEM_COLUMNS tuples of those orders ->
+    list of dicts shaped like CustomerOrderRequest.to_dict(), in order_rows' order.
+    """
+    items_by_order = {}
+    for request_id, paper_type, color, pages, price_per_page_cents, item_total_cents in item_rows:
+        items_by_order.setdefault(request_id, []).append({
+            'paperType': paper_type,
+            'color': color,
+            'pages': pages,
+            'pricePerPage': from_cents(price_per_page_cents),
+            'itemTotal': from_cents(item_total_cents)
+        })
+    return [{
+        'requestId': request_id,
+        'customerName': customer_name,
+        'fileName': file_name,
+        'fileUrl': file_url,
+        'note': note,
+        'requestDate': format_stored_datetime(request_date_text),
+        'status': status,
+        'items': items_by_order.get(request_id, []),
+        'uploadedFile': {
+            'sha256': sha256,
+            'size': size,
+            'pages': page_count,
+            'pageCountStatus': page_count_status,
+            'url': f'/order-file/{request_id}'
+        } if sha256 else None
+    } for (request_id, customer_name, file_name, file_url, note, request_date_text, status,
+           sha256, size, page_count, page_count_status) in order_rows]
@@ -0,0 +1,50 @@
+# PrintingSystemWeb/server.py
+
+from gunicorn.app.base import BaseApplication
+
+from PrintingSystemWeb import db
+
+
+# --- Production WSGI server (gunicorn) ---
+# The app is built once in the master process (preload) and inherited by every
+# forked worker; the SERVER_* settings in config.py pick the worker count,
+# threads per worker (gthread) and keep-alive. A forked worker must not reuse
+# SQLite connections the master opened: post_fork() drops the inherited pool
+# with dispose(close=False), which forgets the connections without closing
+# them underneath the parent, so each worker opens its own.
+
+def dispose_engines_after_fork(app):
+    """Gives the current (forked) process fresh connection pools for every engine of `app`."""
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+
+def server_options(app):
+    """gunicorn settings from the app config."""
+    config = app.config
+    return {
+        'bind': config['SERVER_BIND'],
+        'workers': config['SERVER_WORKERS'],
+        'threads': config['SERVER_THREADS'],
+        'worker_class': 'gthread',
+        'keepalive': config['SERVER_KEEPALIVE_SECONDS'],
+        'timeout': config['SERVER_TIMEOUT_SECONDS'],
+        'preload_app': True,
+        'post_fork': lambda server, worker: dispose_engines_after_fork(app),
+    }
+
+
+class ProductionServer(BaseApplication):
+    def __init__(self, app, options=None):
+        self.application = app
+        self.options = {**server_options(app), **(options or {})}
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            if key in self.cfg.settings and value is not None:
+                self.cfg.set(key, value)
+
+    def load(self):
+        return self.application
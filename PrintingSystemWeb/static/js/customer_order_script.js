@@ -5,6 +5,7 @@ const currentDateTimeSpan = document.getElementById('currentDateTime');
 const customerNameInput = document.getElementById('customerName');
 const fileNameInput = document.getElementById('fileName'); // Still the problematic input
 const fileUrlInput = document.getElementById('fileUrl');
+const fileUploadInput = document.getElementById('fileUpload');
 const noteInput = document.getElementById('note');
 
 // Printing Item Input Fields (reused IDs from script.js)
@@ -54,17 +55,26 @@ function updateDateTime() {
 }
 
 // --- Printing Item Logic (adapted) ---
+// Per-page prices from the server, {paper_type: {color: price}} (lower-cased keys).
+// The browser caches /price-table and revalidates it with its ETag.
+let priceTable = {};
+
+async function loadPriceTable() {
+    try {
+        const response = await fetch('/price-table');
+        if (response.ok) {
+            priceTable = (await response.json()).prices;
+            calculateTotal();
+        }
+    } catch (error) {
+        console.error('Error loading price table:', error);
+    }
+}
+
 function getAutomatedPricePerPage(paperType, color, pages) {
-    let price = 0;
     const pType = paperType ? paperType.toLowerCase() : '';
     const col = color ? color.toLowerCase() : '';
-    if (pType && col) {
-        if (pType === 'short') { price = (col === 'black') ? 1.00 : 2.00; }
-        else if (pType === 'long') { price = (col === 'black') ? 1.50 : 3.00; }
-        else if (pType === 'a4') { price = (col === 'black') ? 1.20 : 2.50; }
-        else if (pType === 'photopaper') { price = (col === 'black') ? 5.00 : 8.00; }
-    }
-    return price;
+    return (priceTable[pType] && priceTable[pType][col]) || 0;
 }
 
 function calculateTotal() {
@@ -235,19 +245,36 @@ async function submitOrderRequest() {
     }
 
     // --- Send Data to Backend ---
+    // With a file attached the order goes as multipart/form-data (the server
+    // streams the file to disk and counts PDF pages); otherwise as JSON.
+    const order = {
+        customerName: customerName,
+        fileName: fileName,
+        fileUrl: fileUrl,
+        note: note,
+        items: requestedItems
+    };
+    const uploadFile = fileUploadInput.files[0];
+    let body, headers = {};
+    if (uploadFile) {
+        if (fileName === 'N/A') {
+            order.fileName = uploadFile.name;
+        }
+        body = new FormData();
+        for (const [key, value] of Object.entries(order)) {
+            body.append(key, key === 'items' ? JSON.stringify(value) : value);
+        }
+        body.append('file', uploadFile);
+    } else {
+        headers['Content-Type'] = 'application/json';
+        body = JSON.stringify(order);
+    }
+
     try {
         const response = await fetch('/submit-customer-order', {
             method: 'POST',
-            headers: {
-                'Content-Type': 'application/json'
-            },
-            body: JSON.stringify({
-                customerName: customerName,
-                fileName: fileName,
-                fileUrl: fileUrl,
-                note: note,
-                items: requestedItems
-            })
+            headers: headers,
+            body: body
         });
 
         if (response.ok) {
@@ -257,6 +284,7 @@ async function submitOrderRequest() {
             customerNameInput.value = ''; // This will remain empty if user wants
             fileNameInput.value = '';
             fileUrlInput.value = '';
+            fileUploadInput.value = '';
             noteInput.value = '';
             itemsInTransactionTableBody.innerHTML = ''; // Clear requested items table
         } else {
@@ -278,19 +306,8 @@ function setupCustomerOrderEventListeners() {
     addItemBtn.addEventListener('click', addItem);
     submitOrderBtn.addEventListener('click', submitOrderRequest);
 }
-function getAutomatedPricePerPage(paperType, color, pages) {
-    let price = 0;
-    const pType = paperType ? paperType.toLowerCase() : '';
-    const col = color ? color.toLowerCase() : '';
-    if (pType && col) {
-        if (pType === 'short') { price = (col === 'black') ? 1.00 : 2.00; }
-        else if (pType === 'long') { price = (col === 'black') ? 1.50 : 3.00; }
-        else if (pType === 'a4') { price = (col === 'black') ? 1.20 : 2.50; }
-        else if (pType === 'photopaper') { price = (col === 'black') ? 5.00 : 8.00; }
-    }
-    return price;
-}
 document.addEventListener('DOMContentLoaded', () => {
     updateDateTime();
     setupCustomerOrderEventListeners();
+    loadPriceTable();
 });
\ No newline at end of file
@@ -22,6 +22,7 @@ const reportTotalBlackPagesSpan = document.getElementById('reportTotalBlackPages
 const reportTotalColoredPagesSpan = document.getElementById('reportTotalColoredPages');
 
 const exportCsvBtn = document.getElementById('exportCsvBtn');
+const exportXlsxBtn = document.getElementById('exportXlsxBtn');
 const exportPdfBtn = document.getElementById('exportPdfBtn'); // Placeholder (should be removed from HTML)
 
 // Pagination elements
@@ -235,10 +236,8 @@ function renderPaginationControls() {
     }
 }
 
-// --- NEW POSITION FOR exportToCsv (defined before DOMContentLoaded) ---
-async function exportToCsv() {
-    console.log("DEBUG: exportToCsv function called."); // Debugging line
-
+// --- Report Export (streamed by the server from /export-report) ---
+function exportReport(format) {
     const fromDate = reportDateFromInput.value;
     const toDate = reportDateToInput.value;
 
@@ -250,79 +249,28 @@ async function exportToCsv() {
     const fromDateFormatted = new Date(fromDate).toLocaleDateString('en-US', { month: '2-digit', day: '2-digit', year: 'numeric' });
     const toDateFormatted = new Date(toDate).toLocaleDateString('en-US', { month: '2-digit', day: '2-digit', year: 'numeric' });
 
-    try {
-        console.log("DEBUG: Fetching detailed report for export...");
-        const response = await fetch(`/get-detailed-report?fromDate=${fromDateFormatted}&toDate=${toDateFormatted}`);
+    // Let the browser download the file directly, so the report is never held in page memory.
+    // CSV is gzip-compressed on the wire; the browser decompresses it transparently.
+    const params = new URLSearchParams({ fromDate: fromDateFormatted, toDate: toDateFormatted, format: format });
+    if (format === 'csv') {
+        params.set('gzip', '1');
+    }
+    const link = document.createElement('a');
+    link.setAttribute('href', `/export-report?${params.toString()}`);
+    link.style.visibility = 'hidden';
+    document.body.appendChild(link);
+    link.click();
+    document.body.removeChild(link);
+}
 
-        if (response.ok) {
-            const data = await response.json();
-            const records = data.records; // These records are already dicts from item.to_dict()
-
-            if (records.length === 0) {
-                alert("No data to export for the selected date range.");
-                console.log("DEBUG: No records found for export.");
-                return;
-            }
-
-            console.log("DEBUG: Records received for export:", records);
-
-            // Construct CSV content with headers
-            let csvContent = "ID,Date,Time,Paper Type,Color,Pages,Price/Page,Total\n";
-
-            try { // Add try-catch around CSV construction
-                records.forEach(record => {
-                    // Ensure date and time are formatted for CSV consistency
-                    const formattedDate = formatDate(record.date);
-                    const formattedTime = formatTime(record.time); // Use updated formatTime!
-                    const formattedPricePerPage = parseFloat(record.pricePerPage).toFixed(2); // Ensure 2 decimal places
-                    const formattedTotal = parseFloat(record.total).toFixed(2); // Ensure 2 decimal places
-
-                    const row = [
-                        record.id,
-                        formattedDate,
-                        formattedTime,
-                        record.paperType,
-                        record.color,
-                        record.pages,
-                        formattedPricePerPage, // Use formatted values
-                        formattedTotal // Use formatted values
-                    ];
-                    csvContent += row.map(e => `"${e}"`).join(",") + "\n"; // Quote fields
-                });
-                console.log("DEBUG: CSV content constructed.");
-                console.log("DEBUG: Generated CSV content preview:", csvContent.substring(0, 500) + "..."); // Preview first 500 chars
-
-                // Create a Blob and trigger download
-                const blob = new Blob([csvContent], { type: 'text/csv;charset=utf-8;' });
-                const url = URL.createObjectURL(blob);
-                const link = document.createElement('a');
-                link.setAttribute('href', url);
-                link.setAttribute('download', `sales_report_${fromDate.replace(/-/g, '')}_to_${toDate.replace(/-/g, '')}.csv`);
-                link.style.visibility = 'hidden';
-                document.body.appendChild(link);
-                console.log("DEBUG: Attempting link click for download...");
-                link.click();
-                document.body.removeChild(link);
-                URL.revokeObjectURL(url); // Clean up URL object
-
-                alert("Report exported successfully as CSV!");
-                console.log("DEBUG: Export process completed.");
-
-            } catch (csvError) {
-                console.error('ERROR: CSV construction or download failed:', csvError);
-                alert('An error occurred during CSV file generation or download. See console for details.');
-            }
+function exportToCsv() {
+    exportReport('csv');
+}
 
-        } else {
-            console.error('Failed to generate report from backend:', response.statusText);
-            alert(`Error generating report: ${response.statusText}`);
-        }
-    } catch (networkError) {
-        console.error('ERROR: Network or Fetch operation failed:', networkError);
-        alert('An error occurred while communicating with the server for the report.');
-    }
+function exportToXlsx() {
+    exportReport('xlsx');
 }
-// --- END NEW POSITION FOR exportToCsv ---
+
 
 // --- Quick Date Range Setters ---
 function setDateRange(startDate, endDate) {
@@ -376,6 +324,7 @@ function setupReportEventListeners() {
     });
 
     exportCsvBtn.addEventListener('click', exportToCsv); // Event listener for the export button
+    exportXlsxBtn.addEventListener('click', exportToXlsx);
 
     // NEW: Add event listeners for Previous and Next buttons
     prevPageBtn.addEventListener('click', () => {
@@ -9,6 +9,13 @@ const addItemBtn = document.getElementById('addItemBtn');
 const itemsInTransactionTableBody = document.getElementById('itemsInTransactionTableBody');
 const confirmTransactionBtn = document.getElementById('confirmTransactionBtn');
 const recordTableBody = document.getElementById('recordTableBody'); // For the main record table
+const loadMoreRecordsBtn = document.getElementById('loadMoreRecordsBtn');
+
+const RECORDS_PAGE_SIZE = 50; // Records fetched per request (keyset pagination)
+let nextRecordsCursor = null;  // Cursor for the next page of records, null when there are no more
+let priceTable = {};           // Per-page prices from /price-table, {paper_type: {color: price}}
+let currentSummary = null;     // Last sales summary shown, updated in place by live events
+let liveUpdates = null;        // EventSource for /events, null if the browser has no SSE support
 
 // Quick Sales Summary elements
 const todayIncomeSpan = document.getElementById('todayIncome');
@@ -115,6 +122,28 @@ function updateDateTime() {
 
 
 // 2. Auto-calculate Total Price
+//    Price/Page is pre-filled from the server's price table and can still be edited.
+async function loadPriceTable() {
+    try {
+        const response = await fetch('/price-table'); // Cached by the browser, revalidated with its ETag
+        if (response.ok) {
+            priceTable = (await response.json()).prices;
+        }
+    } catch (error) {
+        console.error('Error loading price table:', error);
+    }
+}
+
+function fillPricePerPage() {
+    const pType = paperTypeSelect.value.toLowerCase();
+    const col = colorSelect.value.toLowerCase();
+    const price = priceTable[pType] && priceTable[pType][col];
+    if (price) {
+        pricePerPageInput.value = price.toFixed(2);
+    }
+    calculateTotal();
+}
+
 function calculateTotal() {
     const pages = parseInt(pagesInput.value);
     const pricePerPage = parseFloat(pricePerPageInput.value);
@@ -255,8 +284,11 @@ async function confirmTransaction() {
             const data = await response.json(); // Backend might return the saved transaction data or a confirmation
             alert(data.message || "Transaction confirmed successfully!");
             itemsInTransactionTableBody.innerHTML = ''; // Clear items table
-            loadRecords(); // Reload records from backend
-            updateSalesSummary(); // Refresh sales summary
+            if (!liveUpdates) {
+                // Without live updates, reload records and summary from the backend
+                loadRecords();
+                updateSalesSummary();
+            }
         } else {
             const errorData = await response.json();
             alert(`Error confirming transaction: ${errorData.message || response.statusText}`);
@@ -269,27 +301,23 @@ async function confirmTransaction() {
 
 
 // 7. Load Records (From Backend via Fetch API)
-async function loadRecords() {
+//    Records are fetched one page at a time; 'Load More' appends the next page.
+async function loadRecords(append = false) {
+    let url = `/get-records?limit=${RECORDS_PAGE_SIZE}`;
+    if (append && nextRecordsCursor) {
+        url += `&cursor=${encodeURIComponent(nextRecordsCursor)}`;
+    }
+
     try {
-        const response = await fetch('/get-records'); // Replace with your actual backend endpoint
+        const response = await fetch(url);
         if (response.ok) {
-            const records = await response.json();
-            recordTableBody.innerHTML = ''; // Clear existing records
-            records.forEach(record => {
-                const row = recordTableBody.insertRow();
-                row.innerHTML = `
-                    <td>${record.id}</td>
-                    <td>${formatDate(record.date)}</td>
-                    <td>${formatTime(record.time)}</td>
-                    <td>${record.paperType}</td>
-                    <td>${record.color}</td>
-                    <td>${record.pages}</td>
-                    <td>${formatCurrency(record.pricePerPage)}</td>
-                    <td>${formatCurrency(record.total)}</td>
-                `;
-                // Attach right-click listener for delete (if desired later)
-                // row.addEventListener('contextmenu', (e) => handleRecordRightClick(e, record.id));
-            });
+            const data = await response.json();
+            if (!append) {
+                recordTableBody.innerHTML = ''; // Clear existing records
+            }
+            data.records.forEach(record => insertRecordRow(record));
+            nextRecordsCursor = data.nextCursor;
+            loadMoreRecordsBtn.hidden = !nextRecordsCursor;
         } else {
             console.error('Failed to load records:', response.statusText);
         }
@@ -299,36 +327,29 @@ async function loadRecords() {
 }
 
 
+function insertRecordRow(record, position = -1) {
+    const row = recordTableBody.insertRow(position);
+    row.innerHTML = `
+        <td>${record.id}</td>
+        <td>${formatDate(record.date)}</td>
+        <td>${formatTime(record.time)}</td>
+        <td>${record.paperType}</td>
+        <td>${record.color}</td>
+        <td>${record.pages}</td>
+        <td>${formatCurrency(record.pricePerPage)}</td>
+        <td>${formatCurrency(record.total)}</td>
+    `;
+    // Attach right-click listener for delete (if desired later)
+    // row.addEventListener('contextmenu', (e) => handleRecordRightClick(e, record.id));
+}
+
+
 // 8. Update Sales Summary (From Backend via Fetch API)
 async function updateSalesSummary() {
     try {
         const response = await fetch('/get-sales-summary');
         if (response.ok) {
-            const summary = await response.json();
-
-            const today = new Date();
-            const monthNames = ["January", "February", "March", "April", "May", "June", "July", "August", "September", "October", "November", "December"];
-
-            todayIncomeSpan.textContent = formatCurrency(summary.todayIncome);
-            todayDateSpan.textContent = `(${today.toLocaleDateString('en-US', { month: '2-digit', day: '2-digit', year: 'numeric' })})`;
-
-            monthIncomeSpan.textContent = formatCurrency(summary.monthIncome);
-            monthDateSpan.textContent = `(${monthNames[today.getMonth()]} ${today.getFullYear()})`;
-
-            yearIncomeSpan.textContent = formatCurrency(summary.yearIncome);
-            yearDateSpan.textContent = `(${today.getFullYear()})`;
-
-            // --- NEW: Populate new summary details ---
-            summaryTotalPagesSpan.textContent = summary.totalPages;
-            summaryNumTransactionsSpan.textContent = summary.numTransactions;
-            summaryTotalShortPagesSpan.textContent = summary.totalShortPages;
-            summaryTotalLongPagesSpan.textContent = summary.totalLongPages;
-            summaryTotalA4PagesSpan.textContent = summary.totalA4Pages;
-            summaryTotalPhotoPaperPagesSpan.textContent = summary.totalPhotoPaperPages;
-            summaryTotalBlackPagesSpan.textContent = summary.totalBlackPages;
-            summaryTotalColoredPagesSpan.textContent = summary.totalColoredPages;
-            // --- END NEW ---
-
+            renderSalesSummary(await response.json());
         } else {
             console.error('Failed to load sales summary:', response.statusText);
         }
@@ -337,6 +358,32 @@ async function updateSalesSummary() {
     }
 }
 
+function renderSalesSummary(summary) {
+    currentSummary = summary;
+    const today = new Date();
+    const monthNames = ["January", "February", "March", "April", "May", "June", "July", "August", "September", "October", "November", "December"];
+
+    todayIncomeSpan.textContent = formatCurrency(summary.todayIncome);
+    todayDateSpan.textContent = `(${today.toLocaleDateString('en-US', { month: '2-digit', day: '2-digit', year: 'numeric' })})`;
+
+    monthIncomeSpan.textContent = formatCurrency(summary.monthIncome);
+    monthDateSpan.textContent = `(${monthNames[today.getMonth()]} ${today.getFullYear()})`;
+
+    yearIncomeSpan.textContent = formatCurrency(summary.yearIncome);
+    yearDateSpan.textContent = `(${today.getFullYear()})`;
+
+    // --- NEW: Populate new summary details ---
+    summaryTotalPagesSpan.textContent = summary.totalPages;
+    summaryNumTransactionsSpan.textContent = summary.numTransactions;
+    summaryTotalShortPagesSpan.textContent = summary.totalShortPages;
+    summaryTotalLongPagesSpan.textContent = summary.totalLongPages;
+    summaryTotalA4PagesSpan.textContent = summary.totalA4Pages;
+    summaryTotalPhotoPaperPagesSpan.textContent = summary.totalPhotoPaperPages;
+    summaryTotalBlackPagesSpan.textContent = summary.totalBlackPages;
+    summaryTotalColoredPagesSpan.textContent = summary.totalColoredPages;
+    // --- END NEW ---
+}
+
 
 // 9. Reset Records (Send to Backend)
 async function resetRecords() {
@@ -349,6 +396,8 @@ async function resetRecords() {
             if (response.ok) {
                 alert("All records deleted successfully!");
                 recordTableBody.innerHTML = ''; // Clear table
+                nextRecordsCursor = null;
+                loadMoreRecordsBtn.hidden = true;
                 updateSalesSummary(); // Update summary to zeros
             } else {
                 const errorData = await response.json();
@@ -362,11 +411,48 @@ async function resetRecords() {
 }
 
 
+// 10. Live Updates (Server-Sent Events from /events)
+//     New transactions arrive as record rows plus a summary delta, so nothing is refetched.
+function connectLiveUpdates() {
+    if (!window.EventSource) {
+        return; // Old browser: confirmTransaction() reloads records and summary instead
+    }
+    liveUpdates = new EventSource('/events');
+
+    // The server turned the stream away (204, all its slots are taken) or it
+    // failed for good: from now on confirmTransaction() reloads records and summary instead
+    liveUpdates.addEventListener('error', () => {
+        if (liveUpdates && liveUpdates.readyState === EventSource.CLOSED) {
+            liveUpdates = null;
+        }
+    });
+
+    liveUpdates.addEventListener('transaction', (event) => {
+        const data = JSON.parse(event.data);
+        // Records arrive newest first; insert from the oldest so the newest ends up on top
+        data.records.slice().reverse().forEach(record => insertRecordRow(record, 0));
+        if (currentSummary) {
+            const summary = { ...currentSummary };
+            Object.entries(data.summaryDelta).forEach(([key, change]) => {
+                summary[key] = (summary[key] || 0) + change;
+            });
+            renderSalesSummary(summary);
+        }
+    });
+
+    // Records were reset or imported, or too many events were missed
+    liveUpdates.addEventListener('resync', () => {
+        loadRecords();
+        updateSalesSummary();
+    });
+}
+
+
 // --- Event Listeners Setup ---
 function setupEventListeners() {
     // Input field change listeners for auto-calculation and button enable/disable
-    paperTypeSelect.addEventListener('change', calculateTotal);
-    colorSelect.addEventListener('change', calculateTotal);
+    paperTypeSelect.addEventListener('change', fillPricePerPage);
+    colorSelect.addEventListener('change', fillPricePerPage);
     pagesInput.addEventListener('input', calculateTotal);
     pricePerPageInput.addEventListener('input', calculateTotal);
 
@@ -388,6 +474,9 @@ function setupEventListeners() {
     // Confirm Transaction Button
     confirmTransactionBtn.addEventListener('click', confirmTransaction);
 
+    // Load the next page of records
+    loadMoreRecordsBtn.addEventListener('click', () => loadRecords(true));
+
     // Sidebar navigation buttons (for navigation between index.html and report.html)
     document.getElementById('transactionNavBtn').addEventListener('click', () => {
         window.location.href = '/'; // Navigate to main transaction page
@@ -413,5 +502,7 @@ document.addEventListener('DOMContentLoaded', () => {
     updateDateTime(); // Start updating date/time
     loadRecords(); // Load existing records
     updateSalesSummary(); // Update initial sales summary
+    loadPriceTable(); // Prices for pre-filling Price/Page
+    connectLiveUpdates(); // Push new records and summary changes as they happen
     setupEventListeners(); // Setup input validation and calculation
 });
\ No newline at end of file
@@ -11,6 +11,8 @@ const orderPageNumbersContainer = document.getElementById('orderPageNumbers');
 
 let currentOrderPage = 1;
 let totalOrderPages = 1;
+const ORDERS_PER_PAGE = 10; // Same page size as /get-customer-orders
+let liveUpdates = null;     // EventSource for /events, null if the browser has no SSE support
 
 
 // --- Utility Functions (Consistent with other scripts) ---
@@ -108,33 +110,7 @@ async function loadOrders(page = 1) {
                 const row = ordersTableBody.insertRow();
                 row.innerHTML = `<td colspan="8" style="text-align: center;">No order requests found.</td>`;
             } else {
-                orders.forEach(order => {
-                    const row = ordersTableBody.insertRow();
-                    // Store full order data on the row for easy access during actions
-                    row.dataset.orderData = JSON.stringify(order);
-
-                    // Build items list for Notes column or a popup
-                    let itemsHtml = '<ul>';
-                    order.items.forEach(item => {
-                        itemsHtml += `<li>${item.pages} ${item.paperType} (${item.color}) @ ${formatCurrency(item.pricePerPage)} = ${formatCurrency(item.itemTotal)}</li>`;
-                    });
-                    itemsHtml += '</ul>';
-
-                    row.innerHTML = `
-                        <td>${order.requestId}</td>
-                        <td>${formatDate(order.requestDate.split(' ')[0])} ${formatTime(order.requestDate.split(' ')[1])}</td>
-                        <td>${order.customerName}</td>
-                        <td>${order.fileName}</td>
-                        <td class="url-column">${order.fileUrl ? `<a href="${order.fileUrl}" target="_blank" rel="noopener noreferrer" class="file-url-link">🔗 Link</a>` : 'N/A'}</td>
-                        <td class="notes-column">${order.note || 'N/A'} ${itemsHtml}</td> <!-- Combine notes and items here -->
-                        <td>${order.status}</td>
-                        <td class="action-buttons">
-                            ${order.status === 'Pending' ? `<button class="primary-btn" onclick="processOrder(${order.requestId})">Process</button>` : ''}
-                            ${order.status === 'Pending' ? `<button class="danger-btn" onclick="rejectOrder(${order.requestId})">Reject</button>` : ''}
-                            <button class="secondary-btn" onclick="viewOrderDetails(${order.requestId})">View</button>
-                        </td>
-                    `;
-                });
+                orders.forEach(order => insertOrderRow(order));
             }
 
             // Update pagination controls
@@ -150,6 +126,50 @@ async function loadOrders(page = 1) {
         alert('An error occurred while communicating with the server for orders.');
     }
 }
+function insertOrderRow(order, position = -1) {
+    const row = ordersTableBody.insertRow(position);
+    // Store full order data on the row for easy access during actions
+    row.dataset.orderData = JSON.stringify(order);
+    row.dataset.requestId = order.requestId;
+
+    // Build items list for Notes column or a popup
+    let itemsHtml = '<ul>';
+    order.items.forEach(item => {
+        itemsHtml += `<li>${item.pages} ${item.paperType} (${item.color}) @ ${formatCurrency(item.pricePerPage)} = ${formatCurrency(item.itemTotal)}</li>`;
+    });
+    itemsHtml += '</ul>';
+
+    row.innerHTML = `
+        <td>${order.requestId}</td>
+        <td>${formatDate(order.requestDate.split(' ')[0])} ${formatTime(order.requestDate.split(' ')[1])}</td>
+        <td>${order.customerName}</td>
+        <td>${order.fileName}${formatUploadedFile(order)}</td>
+        <td class="url-column">${order.fileUrl ? `<a href="${order.fileUrl}" target="_blank" rel="noopener noreferrer" class="file-url-link">🔗 Link</a>` : 'N/A'}</td>
+        <td class="notes-column">${order.note || 'N/A'} ${itemsHtml}</td> <!-- Combine notes and items here -->
+        <td>${order.status}</td>
+        <td class="action-buttons">
+            ${order.status === 'Pending' ? `<button class="primary-btn" onclick="processOrder(${order.requestId})">Process</button>` : ''}
+            ${order.status === 'Pending' ? `<button class="danger-btn" onclick="rejectOrder(${order.requestId})">Reject</button>` : ''}
+            <button class="secondary-btn" onclick="viewOrderDetails(${order.requestId})">View</button>
+        </td>
+    `;
+    return row;
+}
+// Download link and detected page count of a file uploaded with the order
+function formatUploadedFile(order) {
+    const file = order.uploadedFile;
+    if (!file) {
+        return '';
+    }
+    let pages = '';
+    if (file.pageCountStatus === 'counted') {
+        pages = ` (${file.pages} pages detected)`;
+    } else if (file.pageCountStatus === 'pending') {
+        pages = ' (counting pages...)';
+    }
+    return `<br><a href="${file.url}" class="file-url-link">⬇ Download</a>${pages}`;
+}
+
 //YAWA KA
 function renderOrderPaginationControls() {
     orderPageNumbersContainer.innerHTML = '';
@@ -190,7 +210,9 @@ async function processOrder(requestId) {
             if (response.ok) {
                 const data = await response.json();
                 alert(data.message);
-                loadOrders(currentOrderPage); // Reload current page to update status
+                if (!liveUpdates) {
+                    loadOrders(currentOrderPage); // Reload current page to update status
+                }
                 // Optionally, redirect to transaction page with pre-filled data
                 // window.location.href = `/transaction?loadRequest=${requestId}`;
             } else {
@@ -211,7 +233,9 @@ async function rejectOrder(requestId) {
             if (response.ok) {
                 const data = await response.json();
                 alert(data.message);
-                loadOrders(currentOrderPage); // Reload current page to update status
+                if (!liveUpdates) {
+                    loadOrders(currentOrderPage); // Reload current page to update status
+                }
             } else {
                 const errorData = await response.json();
                 alert(`Error rejecting order: ${errorData.message || response.statusText}`);
@@ -232,6 +256,9 @@ function viewOrderDetails(requestId) {
         details += `Customer: ${order.customerName}\n`;
         details += `File: ${order.fileName}\n`;
         details += `URL: ${order.fileUrl || 'N/A'}\n`;
+        if (order.uploadedFile) {
+            details += `Uploaded file: ${(order.uploadedFile.size / 1048576).toFixed(1)} MB, ${order.uploadedFile.pageCountStatus === 'counted' ? order.uploadedFile.pages + ' pages detected' : 'pages ' + order.uploadedFile.pageCountStatus}\n`;
+        }
         details += `Notes: ${order.note || 'N/A'}\n`;
         details += `Status: ${order.status}\n`;
         details += `Request Date: ${order.requestDate}\n\n`;
@@ -246,6 +273,60 @@ function viewOrderDetails(requestId) {
 }
 
 
+// --- Live Updates (Server-Sent Events from /events) ---
+// New orders appear at the top of page 1 and processed/rejected orders update
+// in place, without reloading the list.
+function connectLiveUpdates() {
+    if (!window.EventSource) {
+        return; // Old browser: use the Refresh button
+    }
+    liveUpdates = new EventSource('/events');
+
+    // The server turned the stream away (204, all its slots are taken) or it
+    // failed for good: from now on order actions reload the list instead
+    liveUpdates.addEventListener('error', () => {
+        if (liveUpdates && liveUpdates.readyState === EventSource.CLOSED) {
+            liveUpdates = null;
+        }
+    });
+
+    liveUpdates.addEventListener('order-created', (event) => {
+        const order = JSON.parse(event.data).order;
+        const statusFilter = orderStatusFilter.value;
+        if (currentOrderPage !== 1 || (statusFilter !== 'All' && statusFilter !== order.status)) {
+            return;
+        }
+        ordersTableBody.querySelectorAll('tr:not([data-request-id])').forEach(row => row.remove()); // 'No order requests found.'
+        insertOrderRow(order, 0);
+        if (ordersTableBody.rows.length > ORDERS_PER_PAGE) {
+            ordersTableBody.deleteRow(-1);
+        }
+    });
+
+    const updateOrderStatus = (event) => {
+        const { requestId, status } = JSON.parse(event.data);
+        const row = ordersTableBody.querySelector(`tr[data-request-id="${requestId}"]`);
+        if (!row) {
+            return;
+        }
+        const statusFilter = orderStatusFilter.value;
+        if (statusFilter !== 'All' && statusFilter !== status) {
+            row.remove(); // No longer matches the filter
+            return;
+        }
+        const order = { ...JSON.parse(row.dataset.orderData), status };
+        insertOrderRow(order, row.rowIndex - 1);
+        row.remove();
+    };
+    liveUpdates.addEventListener('order-processed', updateOrderStatus);
+    liveUpdates.addEventListener('order-rejected', updateOrderStatus);
+
+    // A background page count finished: refresh the page to show it
+    liveUpdates.addEventListener('order-file-pages', () => loadOrders(currentOrderPage));
+    liveUpdates.addEventListener('resync', () => loadOrders(currentOrderPage));
+}
+
+
 // --- Event Listeners Setup ---
 function setupOrdersEventListeners() {
     orderStatusFilter.addEventListener('change', () => loadOrders(1)); // Filter changes, go to page 1
@@ -0,0 +1,304 @@
+# PrintingSystemWeb/uploads.py
+
+import hashlib
+import logging
+import mmap
+import os
+import re
+import tempfile
+import threading
+import zlib
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.http import parse_options_header
+from werkzeug.sansio.multipart import Data, Epilogue, Field, File, MultipartDecoder, NeedData
+
+logger = logging.getLogger(__name__)
+
+
+class UploadError(ValueError):
+    """Raised for an upload the server refuses; `status` is the HTTP status to answer with."""
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+# --- Content-addressed file store ---
+# Uploaded files are stored under their SHA-256: <UPLOAD_DIR>/ab/abcdef....
+# The same print job uploaded twice is stored once, and a file's path never
+# changes, so it can be served and cached forever. A file is written to a
+# temporary name in the store while it is hashed, then moved into place (or
+# dropped, if the content is already stored).
+
+StoredUpload = namedtuple('StoredUpload', 'sha256 size filename content_type is_pdf')
+
+
+class PendingUpload:
+    """A file being received: written to a temporary file and hashed chunk by chunk."""
+
+    def __init__(self, store, filename, content_type):
+        self.store = store
+        self.filename = filename
+        self.content_type = content_type
+        self.size = 0
+        self._hash = hashlib.sha256()
+        self._head = b''
+        self._file = tempfile.NamedTemporaryFile(dir=store.temp_dir, prefix='upload-', delete=False)
+
+    def write(self, chunk):
+        self._file.write(chunk)
+        self._hash.update(chunk)
+        self.size += len(chunk)
+        if len(self._head) < 8:
+            self._head += chunk[:8]
+
+    def commit(self):
+        """Moves the file into the store (unless identical content is already there); returns a StoredUpload."""
+        self._file.close()
+        sha256 = self._hash.hexdigest()
+        path = self.store.path_for(sha256)
+        if os.path.exists(path):
+            os.remove(self._file.name) # Duplicate upload: keep the stored copy
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(self._file.name, path)
+        return StoredUpload(sha256, self.size, self.filename, self.content_type, self._head.startswith(b'%PDF-'))
+
+    def discard(self):
+        self._file.close()
+        try:
+            os.remove(self._file.name)
+        except FileNotFoundError:
+            pass
+
+
+class ContentStore:
+    def __init__(self, root=None):
+        self.root = root
+
+    def init_app(self, app):
+        self.root = app.config['UPLOAD_DIR'] or os.path.join(app.instance_path, 'uploads')
+
+    @property
+    def temp_dir(self):
+        # Inside the store, so the final os.replace() never crosses filesystems
+        path = os.path.join(self.root, 'tmp')
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def path_for(self, sha256):
+        return os.path.join(self.root, sha256[:2], sha256)
+
+    def open_upload(self, filename, content_type):
+        return PendingUpload(self, filename, content_type)
+
+
+content_store = ContentStore()
+
+
+# --- Streaming multipart/form-data ---
+def receive_multipart(stream, content_type, store, file_field='file', max_bytes=None,
+                      chunk_size=256 * 1024, max_field_bytes=1024 * 1024):
+    """
+    Reads a multipart/form-data body from `stream` chunk by chunk. Text fields
+    are collected (up to max_field_bytes each); the part named `file_field`
+    is written straight into `store` as it arrives, so the upload is never
+    held in memory. Returns (fields dict, PendingUpload or None); the caller
+    commits or discards the upload.
+    """
+    boundary = parse_options_header(content_type)[1].get('boundary')
+    if not boundary:
+        raise UploadError('Missing multipart boundary.')
+    decoder = MultipartDecoder(boundary.encode('latin-1'), max_form_memory_size=max_field_bytes + chunk_size)
+
+    fields, upload = {}, None
+    field_name, field_data, writing = None, None, False
+    received = 0
+    try:
+        while True:
+            chunk = stream.read(chunk_size)
+            received += len(chunk)
+            if max_bytes is not None and received > max_bytes:
+                raise UploadError(f'Upload too large (max {max_bytes // (1024 * 1024)} MB).', 413)
+            decoder.receive_data(chunk or None)
+            event = decoder.next_event()
+            while not isinstance(event, (NeedData, Epilogue)):
+                if isinstance(event, File) and event.name == file_field and upload is None:
+                    upload = store.open_upload(event.filename, event.headers.get('Content-Type'))
+                    field_name, writing = None, True
+                elif isinstance(event, (Field, File)):
+                    # Text field (any other file part is read and ignored)
+                    field_name, field_data, writing = (event.name if isinstance(event, Field) else None), bytearray(), False
+                elif isinstance(event, Data):
+                    if writing:
+                        upload.write(event.data)
+                    elif field_name is not None:
+                        field_data += event.data
+                        if len(field_data) > max_field_bytes:
+                            raise UploadError(f"Form field '{field_name}' is too large.", 413)
+                        if not event.more_data:
+                            fields[field_name] = field_data.decode('utf-8', 'replace')
+                event = decoder.next_event()
+            if isinstance(event, Epilogue) or not chunk:
+                break
+        if not isinstance(event, Epilogue):
+            raise UploadError('Incomplete multipart body.')
+    except RequestEntityTooLarge:
+        if upload is not None:
+            upload.discard()
+        raise UploadError('Form field too large.', 413)
+    except (UploadError, ValueError, OSError):
+        if upload is not None:
+            upload.discard()
+        raise
+    return fields, upload
+
+
+# --- PDF page counting ---
+# No PDF library is needed: the page count is the /Count of the root of the
+# page tree (the largest /Count of any /Type /Pages dictionary), falling back
+# to the number of /Type /Page objects. Compressed object streams (PDF 1.5+)
+# are inflated one at a time to look inside them. The file is memory-mapped
+# and scanned in slices, so a 100MB+ print job costs little memory and the
+# scan lets other threads run between slices.
+
+SCAN_SLICE_SIZE = 1 << 20
+SCAN_OVERLAP = 64 # Longest match we look for, so matches across slice edges are seen once
+OBJECT_STREAM_MAX_BYTES = 16 << 20 # Inflated size limit per object stream
+
+_TYPE_RE = re.compile(rb'/Type\s*/(Pages|Page|ObjStm)(?![A-Za-z0-9_])')
+_COUNT_RE = re.compile(rb'/Count\s+(\d+)')
+
+
+def _dictionary_around(buffer, start, end):
+    """The bytes of the (flat) dictionary containing buffer[start:end]."""
+    open_at = buffer.rfind(b'<<', max(0, start - 4096), start)
+    close_at = buffer.find(b'>>', end, end + 4096)
+    if open_at < 0 or close_at < 0:
+        return b''
+    return bytes(buffer[open_at:close_at])
+
+
+def _inflate_object_stream(buffer, dictionary_end):
+    """Inflates the FlateDecode stream that follows an /ObjStm dictionary; None if it cannot."""
+    stream_at = buffer.find(b'stream', dictionary_end, dictionary_end + 256)
+    if stream_at < 0:
+        return None
+    position = stream_at + len(b'stream')
+    if buffer[position:position + 2] == b'\r\n':
+        position += 2
+    elif buffer[position:position + 1] in (b'\n', b'\r'):
+        position += 1
+    inflater = zlib.decompressobj()
+    parts, inflated = [], 0
+    try:
+        while not inflater.eof and position < len(buffer):
+            part = inflater.decompress(buffer[position:position + 65536], OBJECT_STREAM_MAX_BYTES - inflated)
+            position += 65536 - len(inflater.unconsumed_tail)
+            parts.append(part)
+            inflated += len(part)
+            if inflated >= OBJECT_STREAM_MAX_BYTES:
+                return None
+    except zlib.error:
+        return None
+    return b''.join(parts)
+
+
+def _scan_pages(buffer, totals, inflate_object_streams=True):
+    size = len(buffer)
+    for offset in range(0, size, SCAN_SLICE_SIZE):
+        window = buffer[offset:offset + SCAN_SLICE_SIZE + SCAN_OVERLAP]
+        for match in _TYPE_RE.finditer(window):
+            if match.start() >= SCAN_SLICE_SIZE:
+                continue # Seen again at the start of the next slice
+            kind, start, end = match.group(1), offset + match.start(), offset + match.end()
+            if kind == b'Page':
+                totals['pages'] += 1
+            elif kind == b'Pages':
+                count = _COUNT_RE.search(_dictionary_around(buffer, start, end))
+                if count:
+                    totals['tree'] = max(totals['tree'], int(count.group(1)))
+            elif inflate_object_streams:
+                dictionary = _dictionary_around(buffer, start, end)
+                if b'/FlateDecode' in dictionary:
+                    inflated = _inflate_object_stream(buffer, buffer.find(b'>>', end, end + 4096))
+                    if inflated:
+                        _scan_pages(inflated, totals, inflate_object_streams=False)
+
+
+def count_pdf_pages(path):
+    """Number of pages of the PDF at `path`, or None if no page tree can be found."""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            totals = {'pages': 0, 'tree': 0}
+            _scan_pages(buffer, totals)
+    return totals['tree'] or totals['pages'] or None
+
+
+# --- Background page counting ---
+# Counting runs in a small thread pool, never in the request: the order is
+# saved with page_count_status 'pending' and the worker fills in the count
+# afterwards, then publishes an 'order-file-pages' event.
+
+class PageCounter:
+    def __init__(self, max_workers=2):
+        self.max_workers = max_workers
+        self._app = None
+        self._reset()
+
+    def _reset(self):
+        """(Re)initializes per-process state; also called in a child process after fork."""
+        # Threads do not survive fork, so each server worker starts its own pool lazily
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def init_app(self, app):
+        self._app = app
+        self.max_workers = app.config['PAGE_COUNT_WORKERS']
+
+    def submit(self, sha256):
+        """Queues the stored file `sha256` for counting; returns the Future."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='page-count')
+            return self._executor.submit(self.count_and_record, sha256)
+
+    def count_and_record(self, sha256):
+        """Counts the pages of a stored file and saves the result on its StoredFile row."""
+        from PrintingSystemWeb import db, StoredFile
+        from PrintingSystemWeb.events import event_broker
+        with self._app.app_context():
+            try:
+                pages = count_pdf_pages(content_store.path_for(sha256))
+                status = 'counted' if pages else 'failed'
+            except (OSError, ValueError):
+                logger.exception('page count failed', extra={'fields': {'sha256': sha256}})
+                pages, status = None, 'failed'
+            try:
+                db.session.execute(db.update(StoredFile).where(StoredFile.sha256 == sha256).values(
+                    page_count=pages, page_count_status=status
+                ))
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                logger.exception('saving page count failed', extra={'fields': {'sha256': sha256}})
+                raise
+            finally:
+                db.session.remove()
+            event_broker.publish('order-file-pages', {'sha256': sha256, 'pages': pages, 'status': status})
+            return pages
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+page_counter = PageCounter()
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=page_counter._reset)
@@ -1,75 +1,79 @@
 # PrintingSystemWeb/views.py
 
-from flask import render_template, request, jsonify
-from PrintingSystemWeb import app, db, TransactionHeader, TransactionItem, CustomerOrderRequest, CustomerOrderItem
-from datetime import datetime, timedelta, timezone
-import csv
+from flask import Blueprint, current_app, render_template, request, jsonify, send_file, Response, stream_with_context
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from PrintingSystemWeb import (
+    db, TransactionHeader, TransactionItem, TransactionIdempotencyKey, CustomerOrderRequest, CustomerOrderItem, StoredFile
+)
+from PrintingSystemWeb.reports import summarize_sales
+from PrintingSystemWeb.rollup import (
+    record_transaction_in_rollup, rollup_sales_summary, rollup_sales_timeseries, count_timeseries_buckets,
+    clear_rollup, TIMESERIES_BUCKETS, TIMESERIES_GROUPS
+)
+from PrintingSystemWeb.pagination import encode_cursor, InvalidCursor
+from PrintingSystemWeb.export import generate_csv, generate_xlsx, gzip_chunks
+from PrintingSystemWeb.importer import import_records_csv, BulkImportError, DEFAULT_BATCH_SIZE
+from PrintingSystemWeb.ids import new_transaction_id
+from PrintingSystemWeb.cache import report_cache
+from PrintingSystemWeb.bulk import confirm_transactions_batch, process_orders_batch, reject_orders_batch
+from PrintingSystemWeb.pricing import price_book, price_items, price_table_payload, PricingError
+from PrintingSystemWeb.events import event_broker, format_sse, publish_transactions, RESYNC
+from PrintingSystemWeb.instrumentation import request_metrics
+from PrintingSystemWeb.money import from_cents
+from PrintingSystemWeb.serialization import select_orders, serialize_records, serialize_orders, ORDER_ITEM_COLUMNS
+from PrintingSystemWeb.uploads import content_store, page_counter, receive_multipart, UploadError
+from PrintingSystemWeb.archive import RecordRange, remove_archive, remove_segments
+from datetime import date, datetime
+from itertools import islice
+import logging
 import os
 
+bp = Blueprint('views', __name__)
+logger = logging.getLogger(__name__)
 
-# --- Helper functions (adapted from your sales_report.py) ---
-def generate_daily_sales_report(target_date):
-    """Calculates total sales for a specific date (datetime.date object)."""
-    total = db.session.query(db.func.sum(TransactionItem.item_total)).join(TransactionHeader).filter(
-        TransactionHeader.transaction_date == target_date
-    ).scalar() or 0.0
-    return float(total)
-
-def generate_monthly_sales_report(target_month_year):
-    """Calculates total sales for a specific month (MM/YYYY string)."""
-    month, year = map(int, target_month_year.split('/'))
-    start_date = datetime(year, month, 1).date()
-    if month == 12:
-        end_date = datetime(year + 1, 1, 1).date() - timedelta(days=1)
-    else:
-        end_date = datetime(year, month + 1, 1).date() - timedelta(days=1)
+RECORDS_MAX_PAGE_SIZE = 500 # Upper bound for ?limit= on /get-records
+RECORDS_STREAM_BATCH_SIZE = 1000 # Rows fetched per round trip when streaming NDJSON
 
-    total = db.session.query(db.func.sum(TransactionItem.item_total)).join(TransactionHeader).filter(
-        TransactionHeader.transaction_date >= start_date,
-        TransactionHeader.transaction_date <= end_date
-    ).scalar() or 0.0
-    return float(total)
 
-def filter_records_by_date(from_date_str, to_date_str):
-    """
-    Retrieves all TransactionItems between two dates (MM/DD/YYYY strings).
-    Returns a SQLAlchemy query object (not yet executed) for pagination.
-    """
+# --- Helper functions (adapted from your sales_report.py) ---
+def parse_date_range(from_date_str, to_date_str):
+    """Parses two MM/DD/YYYY strings into a (from_date, to_date) tuple of datetime.date objects."""
     from_dt = datetime.strptime(from_date_str, "%m/%d/%Y").date()
     to_dt = datetime.strptime(to_date_str, "%m/%d/%Y").date()
+    return from_dt, to_dt
 
-    query = TransactionItem.query.join(TransactionHeader).filter(
-        TransactionHeader.transaction_date >= from_dt,
-        TransactionHeader.transaction_date <= to_dt
-    ).order_by(
-        TransactionHeader.transaction_date.desc(),
-        TransactionHeader.transaction_time.desc()
-    )
-    return query
+def filter_records_by_date(from_date_str, to_date_str):
+    """
+    Retrieves all TransactionItems between two dates (MM/DD/YYYY strings),
+    from the live tables and archived months alike, newest first.
+    Returns a RecordRange (not yet read) for pagination or export.
+    """
+    from_dt, to_dt = parse_date_range(from_date_str, to_date_str)
+    return RecordRange(from_dt, to_dt)
 
 
 # --- Web Routes (API Endpoints for your Frontend) ---
 
 # Home Route (Serves the main transaction HTML page)
-@app.route('/')
-@app.route('/home')
+@bp.route('/')
+@bp.route('/home')
 def index():
     return render_template('index.html')
 
 
 # Route for the Sales Report HTML page
-@app.route('/report')
+@bp.route('/report')
 def report_page():
     return render_template('report.html')
 
 # NEW: Route for the Shop Orders HTML page (to view customer requests)
-@app.route('/shop-orders')
+@bp.route('/shop-orders')
 def shop_orders_page():
     # This will render a new HTML file you'll create later
     return render_template('shop_orders.html')
 
 # API to confirm a transaction and save to DB
-@app.route('/confirm-transaction', methods=['POST'])
+@bp.route('/confirm-transaction', methods=['POST'])
 def confirm_transaction_api():
     data = request.get_json()
     items_data = data.get('items', [])
@@ -78,58 +82,143 @@ def confirm_transaction_api():
         return jsonify({'message': 'No items provided for transaction'}), 400
 
     try:
-        now_utc = datetime.now(timezone.utc) # NEW: Use timezone.utc
-        transaction_id = f"TRX-{now_utc.strftime('%Y%m%d-%H%M%S')}"
-        
-        total_transaction_amount = sum(item['itemTotal'] for item in items_data)
+        # Priced from the price table; staff overrides are kept only if allowed
+        items, total_cents = price_items(
+            items_data, allow_overrides=current_app.config['ALLOW_COUNTER_PRICE_OVERRIDES']
+        )
+    except PricingError as e:
+        return jsonify({'message': str(e)}), 400
+
+    try:
+        # Unique even when several terminals confirm within the same second
+        transaction_id, now_utc = new_transaction_id()
 
         header = TransactionHeader(
             id=transaction_id,
             transaction_date=now_utc.date(), # Store date part from UTC
             transaction_time=now_utc.time(), # Store time part from UTC
-            total_amount=total_transaction_amount
+            total_amount_cents=total_cents
         )
         db.session.add(header)
         db.session.flush()
 
-        for item_data in items_data:
+        for paper_type, color, pages, price_per_page_cents, item_total_cents in items:
             item = TransactionItem(
                 transaction_header_id=transaction_id,
-                paper_type=item_data['paperType'],
-                color=item_data['color'],
-                pages=item_data['pages'],
-                price_per_page=item_data['pricePerPage'],
-                item_total=item_data['itemTotal']
+                paper_type=paper_type,
+                color=color,
+                pages=pages,
+                price_per_page_cents=price_per_page_cents,
+                item_total_cents=item_total_cents
             )
             db.session.add(item)
-        
+
+        record_transaction_in_rollup(header.transaction_date, [
+            (paper_type, color, pages, item_total_cents) for paper_type, color, pages, _, item_total_cents in items
+        ])
+
         db.session.commit()
+        report_cache.invalidate_dates([header.transaction_date])
+        publish_transactions([(transaction_id, now_utc, items)])
         return jsonify({'message': 'Transaction confirmed and saved!', 'transactionId': transaction_id}), 200
     except Exception as e:
         db.session.rollback()
         return jsonify({'message': f'Failed to confirm transaction: {str(e)}'}), 500
 
+# API to confirm a batch of transactions at once (offline/high-volume terminals)
+# Body: {'transactions': [{'idempotencyKey': '...', 'items': [...]}, ...]}
+# All new transactions are saved in one database transaction; resent keys are
+# skipped and reported as 'duplicate' with the transaction ID they already have.
+@bp.route('/confirm-transactions', methods=['POST'])
+def confirm_transactions_api():
+    data = request.get_json(silent=True) or {}
+    transactions = data.get('transactions')
+    max_transactions = current_app.config['BATCH_CONFIRM_MAX_TRANSACTIONS']
+
+    if not isinstance(transactions, list) or not transactions:
+        return jsonify({'message': 'No transactions provided'}), 400
+    if len(transactions) > max_transactions:
+        return jsonify({'message': f'Too many transactions in one batch (max {max_transactions}).'}), 413
+
+    try:
+        results, created = confirm_transactions_batch(transactions)
+        db.session.commit()
+        report_cache.invalidate_dates(timestamp.date() for _, timestamp, _ in created)
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'message': f'Failed to confirm transactions: {str(e)}'}), 500
+
+    publish_transactions(created)
+    return jsonify({
+        'message': f'{len(created)} of {len(results)} transactions saved.',
+        'results': results
+    }), 200
+
 # NEW: Customer Order Page Route
-@app.route('/customer-order')
+@bp.route('/customer-order')
 def customer_order_page():
     return render_template('customer_order.html')
 
 # NEW: API to submit a customer order request
-@app.route('/submit-customer-order', methods=['POST'])
+# Takes either a JSON body or multipart/form-data with the same fields (items
+# as a JSON string) plus the print job itself as the 'file' part. The file is
+# streamed to disk while it is hashed, stored once per content, and PDF pages
+# are counted in the background (see uploads.py).
+@bp.route('/submit-customer-order', methods=['POST'])
 def submit_customer_order_api():
-    data = request.get_json()
-    print(f"DEBUG: Received customer order data: {data}") # NEW DEBUG
+    upload = None
+    if request.mimetype == 'multipart/form-data':
+        max_bytes = current_app.config['UPLOAD_MAX_BYTES']
+        if request.content_length is not None and request.content_length > max_bytes:
+            return jsonify({'message': f'Upload too large (max {max_bytes // (1024 * 1024)} MB).'}), 413
+        try:
+            data, upload = receive_multipart(request.stream, request.content_type, content_store,
+                                             max_bytes=max_bytes, chunk_size=current_app.config['UPLOAD_CHUNK_SIZE'])
+            data['items'] = current_app.json.loads(data.get('items') or '[]')
+        except UploadError as e:
+            return jsonify({'message': str(e)}), e.status
+        except ValueError:
+            if upload is not None:
+                upload.discard()
+            return jsonify({'message': 'Malformed form data.'}), 400
+    else:
+        data = request.get_json()
     customer_name = data.get('customerName')
-    file_name = data.get('fileName')
+    file_name = data.get('fileName') or (upload.filename if upload is not None else None)
     file_url = data.get('fileUrl')
     note = data.get('note')
-    print(f"DEBUG: Extracted fileName: '{file_name}', fileUrl: '{file_url}', note: '{note}'") # NEW DEBUG
     items_data = data.get('items', [])
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug('customer order received', extra={'fields': {
+            'fileName': file_name, 'fileUrl': file_url, 'note': note, 'items': len(items_data),
+            'uploadBytes': upload.size if upload is not None else None
+        }})
 
     if not customer_name or not file_name or not items_data:
+        if upload is not None:
+            upload.discard()
         return jsonify({'message': 'Missing required customer info or items.'}), 400
 
     try:
+        # Customer-sent prices are never trusted: every item is priced from the price table
+        items, total_cents = price_items(items_data)
+    except PricingError as e:
+        if upload is not None:
+            upload.discard()
+        return jsonify({'message': str(e)}), 400
+
+    count_pages = False
+    try:
+        stored = upload.commit() if upload is not None else None
+        if stored is not None:
+            # Identical content may already be stored (and counted) for an earlier order
+            insert_file = sqlite_insert(StoredFile).values(
+                sha256=stored.sha256, size=stored.size, content_type=stored.content_type,
+                page_count_status='pending' if stored.is_pdf else 'unsupported', created_at=datetime.now()
+            ).on_conflict_do_nothing(index_elements=['sha256'])
+            inserted = db.session.execute(insert_file).rowcount == 1
+            count_pages = inserted and stored.is_pdf
+
         # Create CustomerOrderRequest header
         order_request = CustomerOrderRequest(
             customer_name=customer_name,
@@ -137,98 +226,190 @@ def submit_customer_order_api():
             file_url=file_url,
             note=note,
             request_date=datetime.now(), # Use current datetime for request_date
-            status='Pending' # Default status
+            status='Pending', # Default status
+            file_sha256=stored.sha256 if stored is not None else None
         )
         db.session.add(order_request)
         db.session.flush() # Flush to get request_id before adding items
 
         # Create CustomerOrderItems
-        for item_data in items_data:
+        for paper_type, color, pages, price_per_page_cents, item_total_cents in items:
             item = CustomerOrderItem(
                 request_header_id=order_request.request_id, # Link to the new request
-                paper_type=item_data['paperType'],
-                color=item_data['color'],
-                pages=item_data['pages'],
-                price_per_page=item_data['pricePerPage'],
-                item_total=item_data['itemTotal']
+                paper_type=paper_type,
+                color=color,
+                pages=pages,
+                price_per_page_cents=price_per_page_cents,
+                item_total_cents=item_total_cents
             )
             db.session.add(item)
 
         db.session.commit()
-        return jsonify({'message': 'Order request submitted successfully!', 'requestId': order_request.request_id}), 200
+        if count_pages:
+            page_counter.submit(stored.sha256)
+        event_broker.publish('order-created', {'order': order_request.to_dict()})
+        return jsonify({
+            'message': 'Order request submitted successfully!',
+            'requestId': order_request.request_id,
+            'totalAmount': from_cents(total_cents),
+            'uploadedFile': order_request.stored_file.to_dict(order_request.request_id) if stored is not None else None
+        }), 200
     except Exception as e:
         db.session.rollback()
         return jsonify({'message': f'Failed to submit order request: {str(e)}'}), 500
 
-
-# API to get all records for the main record table
-@app.route('/get-records', methods=['GET'])
+# Download of the file uploaded with an order. Stored files never change, so
+# browsers may revalidate with the ETag (the content hash) instead of downloading again.
+@bp.route('/order-file/<int:request_id>', methods=['GET'])
+def order_file_api(request_id):
+    order_request = db.session.get(CustomerOrderRequest, request_id)
+    if order_request is None or order_request.stored_file is None:
+        return jsonify({'message': 'No uploaded file for this order.'}), 404
+    stored_file = order_request.stored_file
+    return send_file(content_store.path_for(stored_file.sha256),
+                     mimetype=stored_file.content_type or 'application/octet-stream',
+                     as_attachment=True, download_name=order_request.file_name, etag=stored_file.sha256)
+
+# API for the price table used by the order forms. Browsers cache it and
+# revalidate with If-None-Match, so an unchanged table costs a 304.
+@bp.route('/price-table', methods=['GET'])
+def get_price_table_api():
+    prices, etag = price_book.snapshot()
+    response = jsonify({'prices': price_table_payload(prices)})
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = current_app.config['PRICE_TABLE_MAX_AGE_SECONDS']
+    return response.make_conditional(request)
+
+
+# Live updates as Server-Sent Events (see events.py):
+#   transaction      {'records': [...new /get-records rows, newest first], 'summaryDelta': {...}}
+#   order-created    {'order': {...same as /get-customer-orders}}
+#   order-processed  {'requestId', 'status', 'transactionId'}
+#   order-rejected   {'requestId', 'status'}
+#   resync           {} (records were reset or imported; reload everything)
+@bp.route('/events')
+def events_stream():
+    subscription = event_broker.subscribe(request.headers.get('Last-Event-ID'))
+    if subscription is None:
+        # Every stream slot of this worker is taken. 204 tells the browser not
+        # to reconnect; the page then reloads data after its own writes.
+        return Response(status=204)
+    heartbeat = current_app.config['EVENTS_HEARTBEAT_SECONDS']
+
+    def generate():
+        try:
+            yield 'retry: 3000\n\n' # Browser reconnect delay (ms)
+            while not subscription.closed:
+                event = subscription.get(timeout=heartbeat)
+                # Idle streams get a comment line, which also detects closed connections
+                yield format_sse(event) if event else ': keep-alive\n\n'
+        finally:
+            event_broker.unsubscribe(subscription)
+
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no' # Don't let a reverse proxy buffer the stream
+    })
+
+# Request latency and SQL statistics of this process, for Prometheus to scrape
+@bp.route('/metrics')
+def metrics_api():
+    return Response(request_metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+# API to get records for the main record table
+# - no parameters: every record as one JSON list (kept for older clients)
+# - ?limit=N[&cursor=...]: one keyset page, {'records': [...], 'nextCursor': ...}
+# - ?format=ndjson: every record streamed as newline-delimited JSON
+# Archived months are included, through the same RecordRange as the reports.
+@bp.route('/get-records', methods=['GET'])
 def get_records_api():
-    all_items = TransactionItem.query.join(TransactionHeader).order_by(
-        TransactionHeader.transaction_date.desc(),
-        TransactionHeader.transaction_time.desc()
-    ).all()
-    
-    return jsonify([item.to_dict() for item in all_items]), 200
+    # Column tuples, not ORM objects: see serialization.py
+    records = RecordRange(date.min, date.max)
+
+    if request.args.get('format') == 'ndjson':
+        def generate():
+            dumps = current_app.json.dumps
+            rows = records.iter_records(batch_size=RECORDS_STREAM_BATCH_SIZE)
+            while batch := list(islice(rows, RECORDS_STREAM_BATCH_SIZE)):
+                yield ''.join([dumps(record) + '\n' for record in serialize_records(batch)])
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+    limit = request.args.get('limit')
+    cursor = request.args.get('cursor')
+    if limit is None and cursor is None:
+        return jsonify(serialize_records(list(records.iter_records()))), 200
+
+    if limit is not None and not (limit.isdecimal() and int(limit) > 0):
+        return jsonify({'message': "'limit' must be a positive integer"}), 400
+    limit = min(int(limit or RECORDS_MAX_PAGE_SIZE), RECORDS_MAX_PAGE_SIZE)
+
+    # Seek past the last row of the previous page instead of using OFFSET;
+    # one extra row tells us whether another page exists
+    try:
+        rows = records.page_after(limit + 1, cursor)
+    except InvalidCursor as e:
+        return jsonify({'message': str(e)}), 400
+    page_rows = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        _, date_text, time_text, *_, item_id = page_rows[-1] # Archived rows are plain tuples
+        next_cursor = encode_cursor(date_text, time_text, item_id)
+
+    return jsonify({
+        'records': serialize_records(page_rows),
+        'nextCursor': next_cursor
+    }), 200
 
 
 # API to get quick sales summary (for index.html)
-@app.route('/get-sales-summary', methods=['GET'])
+@bp.route('/get-sales-summary', methods=['GET'])
 def get_sales_summary_api():
+    # Today/month/year income and all-time totals come from the daily rollup,
+    # so this costs O(days) instead of O(items).
+    # Cached as covering every date, since the all-time totals change with any write.
     today = datetime.now().date()
-    this_month_start = today.replace(day=1)
-    this_year_start = today.replace(month=1, day=1)
-
-    today_income = generate_daily_sales_report(today)
-    month_income = generate_monthly_sales_report(today.strftime("%m/%Y"))
-    year_income = sum(generate_monthly_sales_report(f"{m:02}/{today.year}") for m in range(1, 13))
-
-    # --- Fetch all items to calculate detailed summaries ---
-    all_items_in_db = TransactionItem.query.all()
-
-    total_pages = 0
-    num_transactions = set()
-    total_short_pages = 0
-    total_long_pages = 0
-    total_a4_pages = 0
-    total_photopaper_pages = 0
-    total_black_pages = 0
-    total_colored_pages = 0
-
-    for item in all_items_in_db:
-        total_pages += item.pages
-        num_transactions.add(item.transaction_header_id)
-
-        if item.paper_type.lower() == 'short':
-            total_short_pages += item.pages
-        elif item.paper_type.lower() == 'long':
-            total_long_pages += item.pages
-        elif item.paper_type.lower() == 'a4':
-            total_a4_pages += item.pages
-        elif item.paper_type.lower() == 'photopaper':
-            total_photopaper_pages += item.pages
-        
-        if item.color.lower() == 'black':
-            total_black_pages += item.pages
-        elif item.color.lower() == 'colored':
-            total_colored_pages += item.pages
-    
-    return jsonify({
-        'todayIncome': float(today_income),
-        'monthIncome': float(month_income),
-        'yearIncome': float(year_income),
-        'totalPages': total_pages,
-        'numTransactions': len(num_transactions),
-        'totalShortPages': total_short_pages,
-        'totalLongPages': total_long_pages,
-        'totalA4Pages': total_a4_pages,
-        'totalPhotoPaperPages': total_photopaper_pages,
-        'totalBlackPages': total_black_pages,
-        'totalColoredPages': total_colored_pages
-    }), 200
+    summary = report_cache.get_or_compute(
+        ('sales-summary', today), date.min, date.max, lambda: rollup_sales_summary(today)
+    )
+    return jsonify(summary), 200
+
+# API for sales trend charts: totals per day, week or month between two dates
+# (MM/DD/YYYY), e.g. /sales-timeseries?from=01/01/2025&to=12/31/2025&bucket=month&groupBy=paper_type,color
+# Served from the daily rollup in one grouped query, whatever the range.
+@bp.route('/sales-timeseries', methods=['GET'])
+def sales_timeseries_api():
+    from_date_str = request.args.get('from')
+    to_date_str = request.args.get('to')
+    bucket = request.args.get('bucket', 'day').lower()
+    group_by = tuple(name.strip().lower() for name in request.args.get('groupBy', '').split(',') if name.strip())
+
+    if not from_date_str or not to_date_str:
+        return jsonify({'message': 'Missing date parameters'}), 400
+    try:
+        from_dt, to_dt = parse_date_range(from_date_str, to_date_str)
+    except ValueError:
+        return jsonify({'message': 'Invalid date parameters, expected MM/DD/YYYY'}), 400
+    if from_dt > to_dt:
+        return jsonify({'message': "'from' must not be after 'to'"}), 400
+    if bucket not in TIMESERIES_BUCKETS:
+        return jsonify({'message': f"Unsupported bucket: {bucket} (use {', '.join(TIMESERIES_BUCKETS)})"}), 400
+    unknown = [name for name in group_by if name not in TIMESERIES_GROUPS]
+    if unknown or len(set(group_by)) != len(group_by):
+        return jsonify({'message': f"Unsupported groupBy: {', '.join(unknown or group_by)} (use {', '.join(TIMESERIES_GROUPS)})"}), 400
+    max_buckets = current_app.config['TIMESERIES_MAX_BUCKETS']
+    if count_timeseries_buckets(from_dt, to_dt, bucket) > max_buckets:
+        return jsonify({'message': f'Too many buckets in one request (max {max_buckets}); use a larger bucket.'}), 400
+
+    timeseries = report_cache.get_or_compute(
+        ('sales-timeseries', from_dt, to_dt, bucket, group_by), from_dt, to_dt,
+        lambda: rollup_sales_timeseries(from_dt, to_dt, bucket, group_by)
+    )
+    return jsonify({'from': from_dt.isoformat(), 'to': to_dt.isoformat(), 'bucket': bucket,
+                    'groupBy': list(group_by), **timeseries}), 200
 
 # API for detailed sales report (for report.html)
-@app.route('/get-detailed-report', methods=['GET'])
+@bp.route('/get-detailed-report', methods=['GET'])
 def get_detailed_report_api():
     from_date_str = request.args.get('fromDate')
     to_date_str = request.args.get('toDate')
@@ -238,75 +419,86 @@ def get_detailed_report_api():
     if not from_date_str or not to_date_str:
         return jsonify({'message': 'Missing date parameters'}), 400
 
-    base_query = filter_records_by_date(from_date_str, to_date_str)
-
-    pagination = base_query.paginate(page=page, per_page=per_page, error_out=False)
-    
-    paginated_records = [item.to_dict() for item in pagination.items]
-
-    all_records_for_summary = base_query.all() # Get all records without pagination for summary
-    
-    total_sales = 0.0
-    total_pages = 0
-    unique_transaction_ids = set()
-    total_short_pages = 0
-    total_long_pages = 0
-    total_a4_pages = 0
-    total_photopaper_pages = 0
-    total_black_pages = 0
-    total_colored_pages = 0
-
-    for record in all_records_for_summary:
-        total_sales += float(record.item_total)
-        pages = record.pages
-        total_pages += pages
-        unique_transaction_ids.add(record.transaction_header_id)
-
-        if record.paper_type.lower() == 'short':
-            total_short_pages += pages
-        elif record.paper_type.lower() == 'long':
-            total_long_pages += pages
-        elif record.paper_type.lower() == 'a4':
-            total_a4_pages += pages
-        elif record.paper_type.lower() == 'photopaper':
-            total_photopaper_pages += pages
-        
-        if record.color.lower() == 'black':
-            total_black_pages += pages
-        elif record.color.lower() == 'colored':
-            total_colored_pages += pages
-    
-    summary_stats = {
-        'totalSales': total_sales,
-        'totalPages': total_pages,
-        'numTransactions': len(unique_transaction_ids),
-        'totalShortPages': total_short_pages,
-        'totalLongPages': total_long_pages,
-        'totalA4Pages': total_a4_pages,
-        'totalPhotoPaperPages': total_photopaper_pages,
-        'totalBlackPages': total_black_pages,
-        'totalColoredPages': total_colored_pages
-    }
+    try:
+        from_dt, to_dt = parse_date_range(from_date_str, to_date_str)
+    except ValueError:
+        return jsonify({'message': 'Invalid date parameters, expected MM/DD/YYYY'}), 400
 
-    return jsonify({
-        'records': paginated_records,
-        'summary': summary_stats,
-        'pagination': {
-            'currentPage': pagination.page,
-            'totalPages': pagination.pages,
-            'totalItems': pagination.total,
-            'perPage': pagination.per_page
+    def compute():
+        records = filter_records_by_date(from_date_str, to_date_str)
+
+        pagination = records.paginate(page=page, per_page=per_page)
+
+        paginated_records = serialize_records(pagination.items)
+
+        # Summary stats for the whole range are aggregated in SQL, not from loaded rows
+        summary_stats = summarize_sales(from_dt, to_dt)
+
+        return {
+            'records': paginated_records,
+            'summary': summary_stats,
+            'pagination': {
+                'currentPage': pagination.page,
+                'totalPages': pagination.pages,
+                'totalItems': pagination.total,
+                'perPage': pagination.per_page
+            }
         }
-    }), 200
+
+    report = report_cache.get_or_compute(('detailed-report', from_dt, to_dt, page), from_dt, to_dt, compute)
+    return jsonify(report), 200
+
+
+# API to export the sales report for a date range as a file download.
+# The file is streamed in chunks straight from the database query, so exports
+# of any size use constant memory. ?gzip=1 compresses CSV output on the fly.
+@bp.route('/export-report', methods=['GET'])
+def export_report_api():
+    from_date_str = request.args.get('fromDate')
+    to_date_str = request.args.get('toDate')
+    export_format = request.args.get('format', 'csv').lower()
+    use_gzip = request.args.get('gzip', '0') in ('1', 'true')
+
+    if not from_date_str or not to_date_str:
+        return jsonify({'message': 'Missing date parameters'}), 400
+    if export_format not in ('csv', 'xlsx'):
+        return jsonify({'message': f'Unsupported export format: {export_format}'}), 400
+
+    try:
+        from_dt, to_dt = parse_date_range(from_date_str, to_date_str)
+    except ValueError:
+        return jsonify({'message': 'Invalid date parameters, expected MM/DD/YYYY'}), 400
+
+    records = filter_records_by_date(from_date_str, to_date_str)
+    file_name = f"sales_report_{from_dt.strftime('%Y%m%d')}_to_{to_dt.strftime('%Y%m%d')}.{export_format}"
+    headers = {'Content-Disposition': f'attachment; filename="{file_name}"'}
+
+    if export_format == 'xlsx':
+        body = generate_xlsx(records)
+        mimetype = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    else:
+        body = generate_csv(records)
+        mimetype = 'text/csv'
+        if use_gzip:
+            body = gzip_chunks(body)
+            headers['Content-Encoding'] = 'gzip'
+
+    return Response(stream_with_context(body), mimetype=mimetype, headers=headers)
 
 
 # API to reset records
-@app.route('/reset-records', methods=['POST'])
+@bp.route('/reset-records', methods=['POST'])
 def reset_records_api():
     try:
+        db.session.query(TransactionIdempotencyKey).delete()
         db.session.query(TransactionItem).delete()
         db.session.query(TransactionHeader).delete()
+        archived_files = remove_archive()
+        clear_rollup()
         db.session.commit()
+        remove_segments(archived_files)
+        report_cache.clear()
+        event_broker.publish(RESYNC, {})
         return jsonify({'message': 'All records deleted successfully!'}), 200
     except Exception as e:
         db.session.rollback()
@@ -314,101 +506,73 @@ def reset_records_api():
 
 
 # API to migrate data from old records.csv (Run Once)
-@app.route('/migrate-data')
+# Uses the bulk importer; ?batchSize= sets how many transactions are committed at a time.
+# Safe to run again: transactions that already exist are skipped.
+@bp.route('/migrate-data')
 def migrate_data():
     base_proj_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     old_csv_path = os.path.join(base_proj_dir, "database", "records.csv")
+    batch_size = request.args.get('batchSize', DEFAULT_BATCH_SIZE, type=int)
 
     if not os.path.exists(old_csv_path):
         return jsonify({'message': f'Error: records.csv not found at {old_csv_path}. Please place it there for migration.'}), 404
 
     try:
-        with open(old_csv_path, 'r', newline='', encoding='utf-8') as csvfile:
-            reader = csv.reader(csvfile)
-            next(reader) # Skip header
-
-            transactions_by_id = {}
-            for row in reader:
-                if len(row) < 8:
-                    print(f"Skipping malformed row during migration: {row}")
-                    continue
-
-                trans_id = row[0]
-                if trans_id not in transactions_by_id:
-                    transactions_by_id[trans_id] = {
-                        'date_str': row[1],
-                        'time_str': row[2],
-                        'items': []
-                    }
-                transactions_by_id[trans_id]['items'].append(row)
-
-            migrated_transaction_count = 0
-            for trans_id, trans_data in transactions_by_id.items():
-                existing_header = TransactionHeader.query.get(trans_id)
-                if existing_header:
-                    print(f"Skipping existing transaction header {trans_id}")
-                    continue
-
-                total_header_amount = 0.0
-                for item_row in trans_data['items']:
-                    try:
-                        total_header_amount += float(item_row[7])
-                    except ValueError: pass
-                
-                header = TransactionHeader(
-                    id=trans_id,
-                    transaction_date=datetime.strptime(trans_data['date_str'], "%m/%d/%Y").date(),
-                    transaction_time=datetime.strptime(trans_data['time_str'], "%I:%M%p").time(),
-                    total_amount=total_header_amount
-                )
-                db.session.add(header)
-
-                for item_row in trans_data['items']:
-                    item = TransactionItem(
-                        transaction_header_id=trans_id,
-                        paper_type=item_row[3],
-                        color=item_row[4],
-                        pages=int(item_row[5]),
-                        price_per_page=float(item_row[6]),
-                        item_total=float(item_row[7])
-                    )
-                    db.session.add(item)
-                migrated_transaction_count += 1
-            
-            db.session.commit()
-            return jsonify({'message': f'Successfully migrated {migrated_transaction_count} new transactions.'}), 200
-
+        stats = import_records_csv(old_csv_path, batch_size=max(1, batch_size))
+        if stats['importedTransactions']:
+            event_broker.publish(RESYNC, {})
+        return jsonify({
+            'message': f"Successfully migrated {stats['importedTransactions']} new transactions.",
+            'stats': stats
+        }), 200
+    except BulkImportError as e:
+        return jsonify({'message': f'Migration failed: {str(e)}', 'stats': e.stats}), 500
     except Exception as e:
         db.session.rollback()
         return jsonify({'message': f'Migration failed: {str(e)}'}), 500
 
-@app.route('/get-customer-orders', methods=['GET'])
+@bp.route('/get-customer-orders', methods=['GET'])
 def get_customer_orders_api():
     status_filter = request.args.get('status', 'All')
     page = request.args.get('page', 1, type=int)
     per_page = 10 # Define items per page for orders list
 
-    query = CustomerOrderRequest.query.order_by(CustomerOrderRequest.request_date.desc())
+    page = max(page, 1)
 
+    # Column tuples, not ORM objects (see serialization.py): one query for the
+    # page of orders, one for their items, one for the count
+    query = select_orders()
+    count_query = db.select(db.func.count(CustomerOrderRequest.request_id))
     if status_filter != 'All':
-        query = query.filter_by(status=status_filter)
-    
-    pagination = query.paginate(page=page, per_page=per_page, error_out=False)
-
-    orders_data = [order.to_dict() for order in pagination.items]
-    print(f"DEBUG: Orders data being sent to frontend: {orders_data}")
+        query = query.filter(CustomerOrderRequest.status == status_filter)
+        count_query = count_query.filter(CustomerOrderRequest.status == status_filter)
+
+    order_rows = db.session.execute(query.limit(per_page).offset((page - 1) * per_page)).all()
+    item_rows = []
+    if order_rows:
+        item_rows = db.session.execute(db.select(*ORDER_ITEM_COLUMNS).filter(
+            CustomerOrderItem.request_header_id.in_([row.request_id for row in order_rows])
+        ).order_by(CustomerOrderItem.item_id)).all()
+    total_items = db.session.execute(count_query).scalar()
+
+    orders_data = serialize_orders(order_rows, item_rows)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug('customer orders listed', extra={'fields': {
+            'status': status_filter, 'page': page,
+            'requestIds': [order['requestId'] for order in orders_data]
+        }})
     return jsonify({
         'orders': orders_data,
         'pagination': {
-            'currentPage': pagination.page,
-            'totalPages': pagination.pages,
-            'totalItems': pagination.total,
-            'perPage': pagination.per_page
+            'currentPage': page,
+            'totalPages': -(-total_items // per_page),
+            'totalItems': total_items,
+            'perPage': per_page
         }
     }), 200
 
 # API to process a customer order request
-@app.route('/process-order/<int:request_id>', methods=['POST'])
+@bp.route('/process-order/<int:request_id>', methods=['POST'])
 def process_order_api(request_id):
     try:
         order_request = CustomerOrderRequest.query.get(request_id)
@@ -419,16 +583,13 @@ def process_order_api(request_id):
             return jsonify({'message': 'Order already processed.'}), 400
         
         # Create a new TransactionHeader from the CustomerOrderRequest
-        now_utc = datetime.now(timezone.utc) # NEW: Use timezone.utc
-        transaction_id = f"TRX-{now_utc.strftime('%Y%m%d-%H%M%S')}-{order_request.request_id}"
-        
-        total_transaction_amount = sum(item.item_total for item in order_request.items)
+        transaction_id, now_utc = new_transaction_id()
 
         header = TransactionHeader(
             id=transaction_id,
             transaction_date=now_utc.date(),
             transaction_time=now_utc.time(),
-            total_amount=total_transaction_amount
+            total_amount_cents=sum(item.item_total_cents for item in order_request.items)
         )
         db.session.add(header)
         db.session.flush() # Ensure header ID is available for items
@@ -440,14 +601,28 @@ def process_order_api(request_id):
                 paper_type=order_item.paper_type,
                 color=order_item.color,
                 pages=order_item.pages,
-                price_per_page=order_item.price_per_page,
-                item_total=order_item.item_total
+                price_per_page_cents=order_item.price_per_page_cents,
+                item_total_cents=order_item.item_total_cents
             )
             db.session.add(transaction_item)
-        
+
+        items = [
+            (order_item.paper_type, order_item.color, order_item.pages,
+             order_item.price_per_page_cents, order_item.item_total_cents)
+            for order_item in order_request.items
+        ]
+        record_transaction_in_rollup(header.transaction_date, [
+            (paper_type, color, pages, item_total_cents) for paper_type, color, pages, _, item_total_cents in items
+        ])
+
         # Update status of CustomerOrderRequest
         order_request.status = 'Processed'
         db.session.commit()
+        report_cache.invalidate_dates([header.transaction_date])
+        publish_transactions([(transaction_id, now_utc, items)])
+        event_broker.publish('order-processed', {
+            'requestId': request_id, 'status': 'Processed', 'transactionId': transaction_id
+        })
 
         return jsonify({'message': f'Order request {request_id} processed successfully! Transaction {transaction_id} created.'}), 200
     except Exception as e:
@@ -455,7 +630,7 @@ def process_order_api(request_id):
         return jsonify({'message': f'Failed to process order request {request_id}: {str(e)}'}), 500
 
 # API to reject a customer order request
-@app.route('/reject-order/<int:request_id>', methods=['POST'])
+@bp.route('/reject-order/<int:request_id>', methods=['POST'])
 def reject_order_api(request_id):
     try:
         order_request = CustomerOrderRequest.query.get(request_id)
@@ -467,11 +642,80 @@ def reject_order_api(request_id):
 
         order_request.status = 'Rejected'
         db.session.commit()
+        event_broker.publish('order-rejected', {'requestId': request_id, 'status': 'Rejected'})
         return jsonify({'message': f'Order request {request_id} rejected successfully!'}), 200
     except Exception as e:
         db.session.rollback()
         return jsonify({'message': f'Failed to reject order request {request_id}: {str(e)}'}), 500
 
-@app.route('/debug-input-test')
+# Bulk order actions for clearing the queue in one call.
+# Body: {'requestIds': [1, 2, ...]} or {'status': 'Pending'} (oldest orders first,
+# up to ORDER_BATCH_MAX_REQUESTS). Orders that already have the target status
+# are skipped and listed with the reason.
+def parse_order_selection(data):
+    """Returns (request_ids, status) from a bulk order request body; raises ValueError if invalid."""
+    request_ids, status = data.get('requestIds'), data.get('status')
+    if (request_ids is None) == (status is None):
+        raise ValueError("Provide either 'requestIds' or 'status'.")
+    if status is not None:
+        if not isinstance(status, str) or not status:
+            raise ValueError("'status' must be an order status such as 'Pending'.")
+        return None, status
+    if (not isinstance(request_ids, list) or not request_ids
+            or not all(isinstance(request_id, int) and not isinstance(request_id, bool) for request_id in request_ids)):
+        raise ValueError("'requestIds' must be a non-empty list of order request IDs.")
+    if len(request_ids) > current_app.config['ORDER_BATCH_MAX_REQUESTS']:
+        raise ValueError(f"Too many orders in one call (max {current_app.config['ORDER_BATCH_MAX_REQUESTS']}).")
+    return request_ids, None
+
+@bp.route('/process-orders', methods=['POST'])
+def process_orders_api():
+    try:
+        request_ids, status = parse_order_selection(request.get_json(silent=True) or {})
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+    try:
+        processed, skipped, created = process_orders_batch(
+            request_ids, status, limit=current_app.config['ORDER_BATCH_MAX_REQUESTS']
+        )
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'message': f'Failed to process order requests: {str(e)}'}), 500
+
+    report_cache.invalidate_dates(timestamp.date() for _, timestamp, _ in created)
+    publish_transactions(created)
+    event_broker.publish_many('order-processed', [{'status': 'Processed', **result} for result in processed])
+    return jsonify({
+        'message': f'{len(processed)} order requests processed, {len(skipped)} skipped.',
+        'processed': processed,
+        'skipped': skipped
+    }), 200
+
+@bp.route('/reject-orders', methods=['POST'])
+def reject_orders_api():
+    try:
+        request_ids, status = parse_order_selection(request.get_json(silent=True) or {})
+    except ValueError as e:
+        return jsonify({'message': str(e)}), 400
+
+    try:
+        rejected, skipped = reject_orders_batch(
+            request_ids, status, limit=current_app.config['ORDER_BATCH_MAX_REQUESTS']
+        )
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'message': f'Failed to reject order requests: {str(e)}'}), 500
+
+    event_broker.publish_many('order-rejected', [{'requestId': request_id, 'status': 'Rejected'} for request_id in rejected])
+    return jsonify({
+        'message': f'{len(rejected)} order requests rejected, {len(skipped)} skipped.',
+        'rejected': rejected,
+        'skipped': skipped
+    }), 200
+
+@bp.route('/debug-input-test')
 def debug_input_test_page():
     return render_template('debug_input_test.html')
\ No newline at end of file
@@ -0,0 +1,115 @@
+# benchmarks/bench_report_summary.py
+#
+# Compares the old row-by-row report summary loop against the SQL aggregate
+# summary engine (PrintingSystemWeb.reports.summarize_sales).
+#
+# Usage: python benchmarks/bench_report_summary.py [num_items]
+
+import os
+import random
+import sys
+import time
+from datetime import date, time as dtime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PrintingSystemWeb import db, TransactionHeader, TransactionItem
+from PrintingSystemWeb.reports import summarize_sales
+
+PAPER_TYPES = ['Short', 'Long', 'A4', 'PhotoPaper']
+COLORS = ['Black', 'Colored']
+
+
+def seed(session, num_items):
+    """Inserts `num_items` TransactionItems spread over one year, ~3 items per transaction."""
+    rng = random.Random(42)
+    start = date(2024, 1, 1)
+    headers, items = [], []
+    for i in range(0, num_items, 3):
+        header_id = f"TRX-BENCH-{i:09}"
+        headers.append({
+            'id': header_id,
+            'transaction_date': start + timedelta(days=rng.randrange(366)),
+            'transaction_time': dtime(rng.randrange(24), rng.randrange(60)),
+            'total_amount_cents': 0,
+        })
+        for _ in range(min(3, num_items - i)):
+            pages = rng.randint(1, 50)
+            items.append({
+                'transaction_header_id': header_id,
+                'paper_type': rng.choice(PAPER_TYPES),
+                'color': rng.choice(COLORS),
+                'pages': pages,
+                'price_per_page_cents': 200,
+                'item_total_cents': pages * 200,
+            })
+    session.bulk_insert_mappings(TransactionHeader, headers)
+    session.bulk_insert_mappings(TransactionItem, items)
+    session.commit()
+
+
+def legacy_summary(session, from_date, to_date):
+    """The summary loop as it was in get_detailed_report_api before the SQL engine."""
+    records = session.query(TransactionItem).join(TransactionHeader).filter(
+        TransactionHeader.transaction_date >= from_date,
+        TransactionHeader.transaction_date <= to_date
+    ).all()
+    summary = {'totalSales': 0, 'totalPages': 0, 'totalShortPages': 0, 'totalLongPages': 0,
+               'totalA4Pages': 0, 'totalPhotoPaperPages': 0, 'totalBlackPages': 0, 'totalColoredPages': 0}
+    unique_transaction_ids = set()
+    for record in records:
+        summary['totalSales'] += record.item_total_cents
+        summary['totalPages'] += record.pages
+        unique_transaction_ids.add(record.transaction_header_id)
+        paper_type = record.paper_type.lower()
+        if paper_type == 'short':
+            summary['totalShortPages'] += record.pages
+        elif paper_type == 'long':
+            summary['totalLongPages'] += record.pages
+        elif paper_type == 'a4':
+            summary['totalA4Pages'] += record.pages
+        elif paper_type == 'photopaper':
+            summary['totalPhotoPaperPages'] += record.pages
+        color = record.color.lower()
+        if color == 'black':
+            summary['totalBlackPages'] += record.pages
+        elif color == 'colored':
+            summary['totalColoredPages'] += record.pages
+    summary['totalSales'] /= 100
+    summary['numTransactions'] = len(unique_transaction_ids)
+    return summary
+
+
+def timed(func, *args, **kwargs):
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+def main():
+    num_items = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    engine = create_engine('sqlite://')
+    db.metadata.create_all(engine)
+
+    with Session(engine) as session:
+        print(f"Seeding {num_items} items...")
+        seed(session, num_items)
+        from_date, to_date = date(2024, 1, 1), date(2024, 12, 31)
+
+        legacy, legacy_time = timed(legacy_summary, session, from_date, to_date)
+        session.expunge_all()
+        engine_result, engine_time = timed(summarize_sales, from_date, to_date, session=session)
+
+    if legacy != engine_result:
+        print(f"MISMATCH:\n  legacy: {legacy}\n  engine: {engine_result}")
+        sys.exit(1)
+
+    print(f"legacy loop : {legacy_time * 1000:9.1f} ms")
+    print(f"SQL summary : {engine_time * 1000:9.1f} ms  ({legacy_time / engine_time:.1f}x faster)")
+
+
+if __name__ == '__main__':
+    main()
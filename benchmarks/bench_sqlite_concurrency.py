@@ -0,0 +1,98 @@
+# benchmarks/bench_sqlite_concurrency.py
+#
+# Concurrent read/write load test comparing the SQLite engine profiles in
+# PrintingSystemWeb/config.py. Writer threads confirm transactions (one commit
+# each) while reader threads run the report summary aggregate, all against a
+# temporary database file. Reports writes/sec, reads/sec and lock errors.
+#
+# Usage: python benchmarks/bench_sqlite_concurrency.py [seconds] [writers] [readers]
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, datetime
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PrintingSystemWeb import db, TransactionHeader, TransactionItem
+from PrintingSystemWeb.config import CONFIG_PROFILES
+from PrintingSystemWeb.database import apply_sqlite_pragmas
+from PrintingSystemWeb.reports import summarize_sales
+
+
+def make_engine(path, config):
+    engine = create_engine(f"sqlite:///{path}", **config.SQLALCHEMY_ENGINE_OPTIONS)
+    apply_sqlite_pragmas(engine, config.SQLITE_PRAGMAS)
+    db.metadata.create_all(engine)
+    return engine
+
+
+def writer(engine, worker_id, stop, counts):
+    n = 0
+    while not stop.is_set():
+        n += 1
+        now = datetime.now()
+        header_id = f"TRX-LOAD-{worker_id}-{n}"
+        try:
+            with Session(engine) as session:
+                session.add(TransactionHeader(id=header_id, transaction_date=now.date(),
+                                              transaction_time=now.time(), total_amount_cents=800))
+                session.add_all([TransactionItem(transaction_header_id=header_id, paper_type=paper_type,
+                                                 color='Black', pages=2, price_per_page_cents=200, item_total_cents=400)
+                                 for paper_type in ('Short', 'A4')])
+                session.commit()
+            counts['writes'] += 1
+        except OperationalError as e:
+            counts['write_errors'] += 1
+            counts['last_error'] = str(e.orig)
+
+
+def reader(engine, stop, counts):
+    while not stop.is_set():
+        try:
+            with Session(engine) as session:
+                summarize_sales(date(2000, 1, 1), date(2100, 1, 1), session=session)
+            counts['reads'] += 1
+        except OperationalError as e:
+            counts['read_errors'] += 1
+            counts['last_error'] = str(e.orig)
+
+
+def run_profile(name, config, seconds, writers, readers):
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = make_engine(os.path.join(tmp, 'load.db'), config)
+        stop = threading.Event()
+        counts = {'writes': 0, 'write_errors': 0, 'reads': 0, 'read_errors': 0, 'last_error': None}
+        threads = [threading.Thread(target=writer, args=(engine, i, stop, counts)) for i in range(writers)]
+        threads += [threading.Thread(target=reader, args=(engine, stop, counts)) for _ in range(readers)]
+        for thread in threads:
+            thread.start()
+        time.sleep(seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        engine.dispose()
+
+    print(f"{name:12} writes/sec {counts['writes'] / seconds:8.1f}  reads/sec {counts['reads'] / seconds:8.1f}  "
+          f"write errors {counts['write_errors']:5}  read errors {counts['read_errors']:5}")
+    if counts['last_error']:
+        print(f"{'':12} last error: {counts['last_error']}")
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    writers = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    readers = int(sys.argv[3]) if len(sys.argv) > 3 else 2
+    print(f"{writers} writers, {readers} readers, {seconds:g}s per profile")
+    for name, config in CONFIG_PROFILES.items():
+        run_profile(name, config, seconds, writers, readers)
+
+
+if __name__ == '__main__':
+    main()
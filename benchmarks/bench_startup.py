@@ -0,0 +1,71 @@
+# benchmarks/bench_startup.py
+#
+# Startup cost of a fresh process, as paid by every server worker, CLI call
+# and test run: time to import the package, to build the app with
+# create_app(), and to serve the first request. Each run happens in a new
+# interpreter; the median and the fastest of all runs are reported, along with
+# the number of database connections opened before the first request
+# (expected: 0, since nothing touches the database until a request needs it).
+#
+# Usage: python benchmarks/bench_startup.py [runs]
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in the child interpreter; prints one JSON line of measurements
+CHILD_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+sqlalchemy_loaded = time.perf_counter()
+connections = []
+event.listen(Engine, 'connect', lambda *args: connections.append(1))
+
+import PrintingSystemWeb
+imported = time.perf_counter()
+app = PrintingSystemWeb.create_app()
+created = time.perf_counter()
+connections_before_request = len(connections)
+response = app.test_client().get('/')
+first_request = time.perf_counter()
+assert response.status_code == 200, response.status_code
+print(json.dumps({
+    'import': imported - sqlalchemy_loaded,
+    'create_app': created - imported,
+    'first_request': first_request - created,
+    'total': first_request - started,
+    'connections_before_request': connections_before_request,
+}))
+"""
+
+
+def run_once(env):
+    output = subprocess.run([sys.executable, '-c', CHILD_SCRIPT], cwd=PROJECT_DIR, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    with tempfile.TemporaryDirectory() as tmp:
+        # An empty database file of its own, so the measurement never depends on site.db
+        env = dict(os.environ, PYTHONPATH=PROJECT_DIR, DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'startup.db')}")
+        results = [run_once(env) for _ in range(runs)]
+
+    print(f"{runs} fresh processes (median / fastest):")
+    for key in ('import', 'create_app', 'first_request', 'total'):
+        values = [result[key] * 1000 for result in results]
+        print(f"  {key:15} {statistics.median(values):8.1f} ms  {min(values):8.1f} ms")
+    connections = max(result['connections_before_request'] for result in results)
+    print(f"  database connections before the first request: {connections}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,293 @@
+# benchmarks/bench_suite.py
+#
+# Endpoint benchmarks on a synthetic shop history (see synthetic_history.py).
+# Times the quick sales summary, the detailed report over ranges from one day
+# to the whole history, /get-records (first page, a deep keyset page, the
+# NDJSON stream and the legacy full list), the customer order list, the
+# records.csv import behind /migrate-data, and order processing (single
+# /process-order and /process-orders batches). The report cache is switched
+# off so every run measures the real work.
+#
+# Generated databases are kept in benchmarks/data/ and reused by later runs
+# with the same size, years, end date and seed; each run works on a copy, since
+# the import and order processing cases write to it. Results are saved as JSON,
+# and --compare flags cases that got slower than a previous results file.
+#
+# Usage: python benchmarks/bench_suite.py [--size 10k|1m|10m|N] [--years 3] [--repeat 5]
+#                                         [--output results.json] [--compare baseline.json]
+# Set PRINTING_SYSTEM_CONFIG=production to measure with the production SQLite settings.
+
+import argparse
+import csv
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from PrintingSystemWeb import create_app, db, CustomerOrderRequest
+from PrintingSystemWeb.config import get_config
+from PrintingSystemWeb.importer import import_records_csv
+from PrintingSystemWeb.money import format_cents
+from PrintingSystemWeb.schema import upgrade_schema
+from synthetic_history import HistoryGenerator, add_pending_orders, create_history_db, parse_size
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+REPORT_RANGES = {'day': 1, 'week': 7, 'month': 30, 'quarter': 91, 'year': 365, 'all': None}
+LEGACY_RECORDS_MAX_ITEMS = 200_000 # The unpaged /get-records list is skipped above this size
+NDJSON_MAX_ITEMS = 200_000 # So is the full NDJSON stream, unless --full
+IMPORT_TRANSACTIONS = 5_000 # New transactions in the generated records.csv
+PROCESS_BATCH_SIZES = (100, 1000)
+DEFAULT_THRESHOLD = 1.25 # --compare: slower by more than this factor counts as a regression
+
+
+class Timer:
+    """Runs benchmark cases and keeps their timings for the JSON report."""
+
+    def __init__(self, repeat):
+        self.repeat = repeat
+        self.results = {}
+
+    def run(self, name, func, repeat=None, setup=None):
+        """Times func() `repeat` times (setup() runs untimed before each); func may return extra info."""
+        timings, info = [], None
+        for _ in range(repeat or self.repeat):
+            argument = setup() if setup else None
+            started = time.perf_counter()
+            info = func(argument) if setup else func()
+            timings.append(time.perf_counter() - started)
+        result = {
+            'runs': len(timings),
+            'medianMs': round(statistics.median(timings) * 1000, 3),
+            'minMs': round(min(timings) * 1000, 3),
+            'maxMs': round(max(timings) * 1000, 3),
+        }
+        if isinstance(info, dict):
+            result.update(info)
+        self.results[name] = result
+        print(f"  {name:40} {result['medianMs']:10.1f} ms median  {result['minMs']:10.1f} ms min")
+        return result
+
+    def skip(self, name, reason):
+        self.results[name] = {'skipped': reason}
+        print(f"  {name:40} skipped ({reason})")
+
+
+def history_db_path(num_items, years, end_date, seed):
+    """The cached database for these parameters, generated on first use."""
+    path = os.path.join(DATA_DIR, f"history-{num_items}-{years}y-{end_date:%Y%m%d}-seed{seed}.db")
+    if not os.path.exists(path):
+        os.makedirs(DATA_DIR, exist_ok=True)
+        print(f"Generating {num_items:,} items of history into {path} (reused by later runs)...")
+        started = time.perf_counter()
+        partial = path + '.partial'
+        if os.path.exists(partial):
+            os.remove(partial)
+        create_history_db(partial, num_items, years, end_date, seed, progress=lambda written: print(
+            f"\r  {written:>12,} / {num_items:,} items  ({written / (time.perf_counter() - started):,.0f} items/s)",
+            end='', flush=True))
+        os.replace(partial, path)
+        print(f"\n  done in {time.perf_counter() - started:.1f}s")
+    return path
+
+
+def get_json(client, url):
+    response = client.get(url)
+    assert response.status_code == 200, (url, response.status_code)
+    return {'bytes': len(response.get_data())}
+
+
+def post_json(client, url, body):
+    response = client.post(url, json=body)
+    assert response.status_code == 200, (url, response.status_code, response.get_data(as_text=True)[:200])
+    return response.get_json()
+
+
+def write_records_csv(path, generator, num_transactions):
+    """A records.csv of transactions that are not in the database, in the /migrate-data format."""
+    with open(path, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(['ID', 'Date', 'Time', 'Paper Type', 'Color', 'Pages', 'Price/Page', 'Total'])
+        sales = generator.sales()
+        for n in range(num_transactions):
+            _, day, sale_time, items = next(sales)
+            for paper_type, color, pages, price_per_page_cents, item_total_cents in items:
+                writer.writerow([f"TRX-CSV-{n:08}", day.strftime('%m/%d/%Y'), sale_time.strftime('%I:%M%p'),
+                                 paper_type, color, pages, format_cents(price_per_page_cents),
+                                 format_cents(item_total_cents)])
+
+
+def bench_reports(timer, client, first_date, end_date):
+    timer.run('get-sales-summary', lambda: get_json(client, '/get-sales-summary'))
+    for name, days in REPORT_RANGES.items():
+        from_date = first_date if days is None else end_date - timedelta(days=days - 1)
+        url = f"/get-detailed-report?fromDate={from_date:%m/%d/%Y}&toDate={end_date:%m/%d/%Y}"
+        timer.run(f'get-detailed-report ({name})', lambda: get_json(client, url + '&page=1'))
+        # A page deep into the range pays for the OFFSET
+        timer.run(f'get-detailed-report ({name}, page 50)', lambda: get_json(client, url + '&page=50'))
+
+
+def bench_records(timer, client, num_items, full):
+    timer.run('get-records (first page)', lambda: get_json(client, '/get-records?limit=500'))
+
+    cursor = None
+    for _ in range(20):
+        cursor = client.get(f"/get-records?limit=500{'&cursor=' + cursor if cursor else ''}").get_json()['nextCursor']
+        if cursor is None:
+            break
+    if cursor:
+        timer.run('get-records (page 21, keyset)', lambda: get_json(client, f'/get-records?limit=500&cursor={cursor}'))
+    else:
+        timer.skip('get-records (page 21, keyset)', 'fewer than 21 pages')
+
+    if full or num_items <= NDJSON_MAX_ITEMS:
+        timer.run('get-records (ndjson stream)', lambda: get_json(client, '/get-records?format=ndjson'), repeat=1)
+    else:
+        timer.skip('get-records (ndjson stream)', f'more than {NDJSON_MAX_ITEMS:,} items; use --full')
+    if full or num_items <= LEGACY_RECORDS_MAX_ITEMS:
+        timer.run('get-records (legacy full list)', lambda: get_json(client, '/get-records'), repeat=1)
+    else:
+        timer.skip('get-records (legacy full list)', f'more than {LEGACY_RECORDS_MAX_ITEMS:,} items; use --full')
+
+
+def bench_orders(timer, app, client, generator):
+    timer.run('get-customer-orders (All)', lambda: get_json(client, '/get-customer-orders?status=All&page=1'))
+    timer.run('get-customer-orders (Pending)', lambda: get_json(client, '/get-customer-orders?status=Pending&page=1'))
+
+    needed = timer.repeat + timer.repeat * sum(PROCESS_BATCH_SIZES)
+    with app.app_context():
+        add_pending_orders(generator, needed)
+        pending_ids = [request_id for (request_id,) in db.session.query(CustomerOrderRequest.request_id).filter_by(
+            status='Pending').order_by(CustomerOrderRequest.request_id.desc()).limit(needed)]
+
+    timer.run('process-order (single)',
+              lambda request_id: post_json(client, f'/process-order/{request_id}', {}) and None,
+              setup=pending_ids.pop)
+    for batch_size in PROCESS_BATCH_SIZES:
+        def take_batch(batch_size=batch_size):
+            batch = pending_ids[-batch_size:]
+            del pending_ids[-batch_size:]
+            return batch
+        timer.run(f'process-orders (batch of {batch_size})',
+                  lambda batch: {'processed': len(post_json(client, '/process-orders', {'requestIds': batch})['processed'])},
+                  setup=take_batch)
+
+
+def bench_import(timer, app, tmp):
+    csv_path = os.path.join(tmp, 'records.csv')
+    # A different seed and a recent year, so the rows are new to the database
+    write_records_csv(csv_path, HistoryGenerator(IMPORT_TRANSACTIONS * 2, years=1, seed=7), IMPORT_TRANSACTIONS)
+    with app.app_context():
+        timer.run('migrate-data (import records.csv)', lambda: import_records_csv(csv_path), repeat=1)
+        # Running it again finds every transaction already imported (the resume path)
+        timer.run('migrate-data (re-run, all skipped)', lambda: {
+            'skippedTransactions': import_records_csv(csv_path)['skippedTransactions']})
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJECT_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path, threshold):
+    """Prints the change of every case against a previous results file; returns the regressed case names."""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline['meta']['items'] != results['meta']['items']:
+        print(f"Note: baseline was run with {baseline['meta']['items']:,} items, this run with {results['meta']['items']:,}")
+    print(f"Compared with {baseline_path} (revision {baseline['meta'].get('revision')}):")
+    regressions = []
+    for name, result in results['results'].items():
+        old = baseline['results'].get(name, {})
+        if 'medianMs' not in result or 'medianMs' not in old:
+            continue
+        ratio = result['medianMs'] / old['medianMs'] if old['medianMs'] else float('inf')
+        flag = ''
+        if ratio > threshold:
+            flag = '  REGRESSION'
+            regressions.append(name)
+        print(f"  {name:40} {old['medianMs']:10.1f} -> {result['medianMs']:10.1f} ms  ({ratio:5.2f}x){flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the endpoints on a synthetic shop history.')
+    parser.add_argument('--size', default='10k', help='transaction items: 10k, 1m, 10m or a number')
+    parser.add_argument('--years', type=int, default=3)
+    parser.add_argument('--end-date', type=date.fromisoformat, default=None, help='last day of history, default today')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=5, help='runs per case (the median is reported)')
+    parser.add_argument('--full', action='store_true', help='also stream/list every record on large sizes')
+    parser.add_argument('--output', help='results JSON (default: benchmarks/results/<size>-<revision>-<time>.json)')
+    parser.add_argument('--compare', metavar='BASELINE', help='previous results JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='with --compare, exit with status 1 if a case is this many times slower')
+    args = parser.parse_args()
+
+    num_items = parse_size(args.size)
+    end_date = args.end_date or date.today()
+    source_path = history_db_path(num_items, args.years, end_date, args.seed)
+    generator = HistoryGenerator(num_items, args.years, end_date, args.seed)
+    timer = Timer(args.repeat)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        shutil.copyfile(source_path, db_path)
+        app = create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{db_path}", 'REPORT_CACHE_MAX_ENTRIES': 0,
+                          'ORDER_BATCH_MAX_REQUESTS': max(PROCESS_BATCH_SIZES), 'LOG_LEVEL': 'ERROR'})
+        client = app.test_client()
+        with app.app_context():
+            upgrade_schema() # Databases cached by older revisions may need converting
+            counts = {
+                'items': db.session.execute(db.text('SELECT COUNT(*) FROM transaction_item')).scalar(),
+                'transactions': db.session.execute(db.text('SELECT COUNT(*) FROM transaction_header')).scalar(),
+                'orders': db.session.execute(db.text('SELECT COUNT(*) FROM customer_order_request')).scalar(),
+            }
+
+        print(f"{counts['items']:,} items, {counts['transactions']:,} transactions, {counts['orders']:,} orders "
+              f"({generator.first_date} to {end_date}):")
+        bench_reports(timer, client, generator.first_date, end_date)
+        bench_records(timer, client, num_items, args.full)
+        bench_orders(timer, app, client, generator)
+        bench_import(timer, app, tmp)
+
+        with app.app_context():
+            db.session.remove()
+            db.engine.dispose()
+
+    results = {
+        'meta': {
+            'size': args.size, **counts, 'years': args.years, 'endDate': end_date.isoformat(), 'seed': args.seed,
+            'repeat': args.repeat, 'profile': get_config().__name__, 'revision': git_revision(),
+            'startedAt': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(), 'sqlite': sqlite3.sqlite_version, 'platform': platform.platform(),
+        },
+        'results': timer.results,
+    }
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{args.size}-{results['meta']['revision'] or 'norev'}-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results saved to {output}")
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
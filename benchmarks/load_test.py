@@ -0,0 +1,156 @@
+# benchmarks/load_test.py
+#
+# HTTP load test for a running server: client threads hit /confirm-transaction,
+# /get-sales-summary and /get-detailed-report concurrently over keep-alive
+# connections and report requests/sec and p50/p99 latency per endpoint.
+# With --spawn, serve.py is started on a throwaway database (production
+# profile) and stopped afterwards, so the test never touches site.db.
+#
+# Usage: python benchmarks/load_test.py [--url http://127.0.0.1:8000 | --spawn]
+#                                       [--seconds 10] [--concurrency 16]
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from urllib.parse import urlsplit
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Each client thread cycles through this mix: two writes for every two reads
+REQUEST_MIX = ['confirm', 'summary', 'confirm', 'report']
+CONFIRM_BODY = json.dumps({'items': [
+    {'paperType': 'Short', 'color': 'Black', 'pages': 3},
+    {'paperType': 'A4', 'color': 'Colored', 'pages': 1},
+]})
+
+
+def make_requests():
+    today = date.today()
+    report_range = f"fromDate={(today - timedelta(days=30)).strftime('%m/%d/%Y')}&toDate={(today + timedelta(days=1)).strftime('%m/%d/%Y')}"
+    return {
+        'confirm': ('POST', '/confirm-transaction', CONFIRM_BODY),
+        'summary': ('GET', '/get-sales-summary', None),
+        'report': ('GET', f'/get-detailed-report?{report_range}&page=1', None),
+    }
+
+
+def client(host, port, requests, deadline, results, lock):
+    connection = http.client.HTTPConnection(host, port, timeout=30)
+    local = {name: [] for name in requests}
+    errors = {name: 0 for name in requests}
+    n = 0
+    while time.perf_counter() < deadline:
+        name = REQUEST_MIX[n % len(REQUEST_MIX)]
+        n += 1
+        method, path, body = requests[name]
+        headers = {'Content-Type': 'application/json'} if body else {}
+        started = time.perf_counter()
+        try:
+            connection.request(method, path, body=body, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            ok = response.status == 200
+        except (OSError, http.client.HTTPException):
+            ok = False
+            connection.close()
+            connection = http.client.HTTPConnection(host, port, timeout=30)
+        if ok:
+            local[name].append(time.perf_counter() - started)
+        else:
+            errors[name] += 1
+    connection.close()
+    with lock:
+        for name in requests:
+            results[name]['latencies'] += local[name]
+            results[name]['errors'] += errors[name]
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def run_load(url, seconds, concurrency):
+    parts = urlsplit(url)
+    requests = make_requests()
+    results = {name: {'latencies': [], 'errors': 0} for name in requests}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+    threads = [threading.Thread(target=client, args=(parts.hostname, parts.port or 80, requests, deadline, results, lock))
+               for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    print(f"{concurrency} clients for {elapsed:.1f}s against {url}")
+    print(f"  {'endpoint':24} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    total = 0
+    for name, (_, path, _) in requests.items():
+        latencies = sorted(results[name]['latencies'])
+        total += len(latencies)
+        if latencies:
+            print(f"  {path.split('?')[0]:24} {len(latencies) / elapsed:9.1f} "
+                  f"{percentile(latencies, 0.50) * 1000:9.1f} {percentile(latencies, 0.99) * 1000:9.1f} "
+                  f"{results[name]['errors']:7}")
+        else:
+            print(f"  {path.split('?')[0]:24} {'-':>9} {'-':>9} {'-':>9} {results[name]['errors']:7}")
+    print(f"  {'total':24} {total / elapsed:9.1f}")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def spawn_server(tmp):
+    """Starts serve.py on a fresh database in `tmp`; returns (process, url)."""
+    port = free_port()
+    env = dict(os.environ, PYTHONPATH=PROJECT_DIR, PRINTING_SYSTEM_CONFIG='production',
+               DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'load.db')}", SERVER_BIND=f'127.0.0.1:{port}')
+    subprocess.run([sys.executable, '-m', 'flask', '--app', 'PrintingSystemWeb', 'upgrade-db'],
+                   cwd=PROJECT_DIR, env=env, check=True, capture_output=True)
+    process = subprocess.Popen([sys.executable, 'serve.py'], cwd=PROJECT_DIR, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    for _ in range(100):
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.2).close()
+            return process, f'http://127.0.0.1:{port}'
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError('serve.py did not start listening')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test for the PrintingSystemWeb HTTP API.')
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--spawn', action='store_true', help='start serve.py on a throwaway database')
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--concurrency', type=int, default=16)
+    args = parser.parse_args()
+
+    if not args.spawn:
+        run_load(args.url, args.seconds, args.concurrency)
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        process, url = spawn_server(tmp)
+        try:
+            run_load(url, args.seconds, args.concurrency)
+        finally:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+# benchmarks/stress_transaction_ids.py
+#
+# Concurrency stress test for the transaction ID generator.
+#  1. Several processes x threads generate IDs as fast as they can; every ID
+#     must be unique, and each thread's IDs must be strictly increasing.
+#  2. Many threads POST /confirm-transaction at once against a temporary
+#     database; every request must succeed (the old second-resolution IDs
+#     collided and failed with a 500).
+#
+# Usage: python benchmarks/stress_transaction_ids.py [processes] [threads] [ids_per_thread]
+
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# Point the app at a throwaway database before the config is imported
+_tmp_dir = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_tmp_dir, 'stress.db')}"
+os.environ.setdefault('PRINTING_SYSTEM_CONFIG', 'production')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PrintingSystemWeb import create_app
+from PrintingSystemWeb.schema import upgrade_schema
+from PrintingSystemWeb.ids import new_transaction_id
+
+app = create_app()
+
+def generate_ids(threads, ids_per_thread, results):
+    """Runs in a worker process: returns the IDs generated by each of `threads` threads."""
+    per_thread = [[] for _ in range(threads)]
+
+    def work(index):
+        ids = per_thread[index]
+        for _ in range(ids_per_thread):
+            ids.append(new_transaction_id()[0])
+
+    workers = [threading.Thread(target=work, args=(i,)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    results.put(per_thread)
+
+
+def stress_generator(processes, threads, ids_per_thread):
+    context = multiprocessing.get_context('fork' if hasattr(os, 'fork') else 'spawn')
+    results = context.Queue()
+    started = time.perf_counter()
+    workers = [context.Process(target=generate_ids, args=(threads, ids_per_thread, results))
+               for _ in range(processes)]
+    for worker in workers:
+        worker.start()
+    thread_lists = [ids for _ in workers for ids in results.get()]
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+
+    all_ids = [transaction_id for ids in thread_lists for transaction_id in ids]
+    assert len(set(all_ids)) == len(all_ids), f"{len(all_ids) - len(set(all_ids))} duplicate IDs"
+    assert all(ids == sorted(ids) and len(set(ids)) == len(ids) for ids in thread_lists), "IDs not monotonic per thread"
+    print(f"generator: {len(all_ids)} unique IDs from {processes} processes x {threads} threads "
+          f"in {elapsed:.2f}s ({len(all_ids) / elapsed:,.0f} IDs/sec), e.g. {all_ids[0]}")
+
+
+def stress_confirm(threads, requests_per_thread):
+    statuses = []
+    lock = threading.Lock()
+    item = {'paperType': 'Short', 'color': 'Black', 'pages': 1, 'pricePerPage': 2, 'itemTotal': 2}
+
+    def work():
+        client = app.test_client()
+        for _ in range(requests_per_thread):
+            response = client.post('/confirm-transaction', json={'items': [item]})
+            with lock:
+                statuses.append(response.status_code)
+
+    started = time.perf_counter()
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+
+    failures = [status for status in statuses if status != 200]
+    print(f"/confirm-transaction: {len(statuses)} requests from {threads} threads in {elapsed:.2f}s "
+          f"({len(statuses) / elapsed:,.0f} sales/sec), {len(failures)} failed")
+    assert not failures, f"{len(failures)} confirmations failed: {sorted(set(failures))}"
+
+
+def main():
+    processes = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    ids_per_thread = int(sys.argv[3]) if len(sys.argv) > 3 else 25_000
+    stress_generator(processes, threads, ids_per_thread)
+    with app.app_context():
+        upgrade_schema()
+    stress_confirm(threads=8, requests_per_thread=50)
+    print("OK")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,270 @@
+# benchmarks/synthetic_history.py
+#
+# Generates a synthetic shop history for benchmarks: N years of transactions
+# (TransactionHeader/TransactionItem) and customer orders
+# (CustomerOrderRequest/CustomerOrderItem) with realistic volumes and mixes.
+# Busy weekdays and school months, growth over the years, shop hours with
+# lunch and afternoon peaks, mostly short black prints, occasional photo
+# paper, 1-4 items per sale. The output is fully determined by
+# (items, years, end date, seed), so two runs of the same size compare like
+# with like.
+#
+# Usage: python benchmarks/synthetic_history.py path/to/history.db [--items 1m] [--years 3]
+
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, time as dtime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PrintingSystemWeb import create_app, db, TransactionHeader, TransactionItem, CustomerOrderRequest, CustomerOrderItem
+from PrintingSystemWeb.pricing import DEFAULT_PRICES, seed_default_prices
+from PrintingSystemWeb.rollup import rebuild_rollup
+from PrintingSystemWeb.schema import upgrade_schema
+
+SIZES = {'10k': 10_000, '1m': 1_000_000, '10m': 10_000_000}
+INSERT_CHUNK_SIZE = 50_000 # Rows per executemany/commit
+
+# (paper_type, color) -> share of printed items
+PRINT_MIX = {
+    ('Short', 'Black'): 34, ('Short', 'Colored'): 10,
+    ('A4', 'Black'): 22, ('A4', 'Colored'): 10,
+    ('Long', 'Black'): 12, ('Long', 'Colored'): 5,
+    ('PhotoPaper', 'Colored'): 6, ('PhotoPaper', 'Black'): 1,
+}
+ITEMS_PER_SALE = {1: 55, 2: 28, 3: 12, 4: 5}
+WEEKDAY_WEIGHTS = [1.1, 1.0, 1.0, 1.05, 1.2, 0.8, 0.3] # Monday..Sunday
+MONTH_WEIGHTS = [0.9, 1.1, 1.2, 0.9, 0.6, 1.1, 1.0, 1.2, 1.1, 1.0, 1.1, 0.8] # January..December
+YEARLY_GROWTH = 1.15
+ORDERS_PER_SALE = 1 / 15 # Customer orders per counter sale
+PENDING_ORDER_DAYS = 7 # Orders from the last week are still Pending
+REJECTED_SHARE = 0.1 # Share of older orders that were rejected
+
+
+def parse_size(value):
+    """'10k', '1m', '10m' or a plain number of items."""
+    return SIZES.get(value.lower()) or int(value.replace('_', ''))
+
+
+def _shop_seconds():
+    """Opening hours 08:00-20:00 as seconds of the day, weighted toward the lunch and afternoon peaks."""
+    seconds, weights = [], []
+    for second in range(8 * 3600, 20 * 3600, 15):
+        hour = second / 3600
+        seconds.append(second)
+        weights.append(1 + 1.5 * math.exp(-(hour - 12.5) ** 2) + math.exp(-(hour - 16) ** 2 / 2))
+    return seconds, weights
+
+
+def _daily_counts(num_sales, first_day, last_day):
+    """Splits num_sales over the days by weekday, month and yearly growth (largest-remainder rounding)."""
+    days = [first_day + timedelta(days=n) for n in range((last_day - first_day).days + 1)]
+    weights = [WEEKDAY_WEIGHTS[day.weekday()] * MONTH_WEIGHTS[day.month - 1] *
+               YEARLY_GROWTH ** ((day - first_day).days / 365) for day in days]
+    scale = num_sales / sum(weights)
+    counts, carry = [], 0.0
+    for weight in weights:
+        carry += weight * scale
+        count = int(carry)
+        carry -= count
+        counts.append(count)
+    counts[-1] += num_sales - sum(counts)
+    return list(zip(days, counts))
+
+
+class HistoryGenerator:
+    def __init__(self, num_items, years=3, end_date=None, seed=42):
+        self.num_items = num_items
+        self.years = years
+        self.end_date = end_date or date.today()
+        self.first_date = self.end_date - timedelta(days=round(365.25 * years) - 1)
+        self.rng = random.Random(seed)
+
+        self._mix = list(PRINT_MIX)
+        self._mix_weights = list(PRINT_MIX.values())
+        self._item_counts = list(ITEMS_PER_SALE)
+        self._item_count_weights = list(ITEMS_PER_SALE.values())
+        self._prices = DEFAULT_PRICES # centavos
+        self._seconds, self._second_weights = _shop_seconds()
+        self._times = {} # second of the day -> datetime.time, shared by all rows
+
+    def _time_of(self, second):
+        value = self._times.get(second)
+        if value is None:
+            value = self._times[second] = dtime(second // 3600, second // 60 % 60, second % 60)
+        return value
+
+    def _items(self, count):
+        """`count` printed items as (paper_type, color, pages, price_per_page_cents, item_total_cents)."""
+        rng = self.rng
+        items = []
+        for paper_type, color in rng.choices(self._mix, self._mix_weights, k=count):
+            if paper_type == 'PhotoPaper':
+                pages = rng.randint(1, 10)
+            else:
+                pages = min(300, int(rng.lognormvariate(1.6, 1.0)) + 1)
+            price = self._prices[(paper_type.lower(), color.lower())]
+            items.append((paper_type, color, pages, price, pages * price))
+        return items
+
+    def sales(self):
+        """Yields (transaction_id, date, time, items) for every counter sale, oldest first."""
+        mean_items = sum(n * w for n, w in ITEMS_PER_SALE.items()) / sum(ITEMS_PER_SALE.values())
+        remaining = self.num_items
+        sequence = 0
+        for day, count in _daily_counts(round(self.num_items / mean_items), self.first_date, self.end_date):
+            day_str = day.strftime('%Y%m%d')
+            seconds = sorted(self.rng.choices(self._seconds, self._second_weights, k=count))
+            for second in seconds:
+                if remaining <= 0:
+                    return
+                sequence += 1
+                item_count = min(remaining, self.rng.choices(self._item_counts, self._item_count_weights)[0])
+                remaining -= item_count
+                yield f"TRX-{day_str}-SYN{sequence:09}", day, self._time_of(second), self._items(item_count)
+        while remaining > 0: # Rounding left a few items over; give them to the last day
+            sequence += 1
+            item_count = min(remaining, 4)
+            remaining -= item_count
+            yield f"TRX-{day_str}-SYN{sequence:09}", self.end_date, self._time_of(self._seconds[-1]), self._items(item_count)
+
+    def orders(self, num_orders, pending_only=False):
+        """Yields (request_date, status, items) for customer orders spread over the history."""
+        pending_since = datetime.combine(self.end_date - timedelta(days=PENDING_ORDER_DAYS - 1), dtime())
+        span_days = (self.end_date - self.first_date).days + 1
+        for _ in range(num_orders):
+            if pending_only:
+                day = self.end_date - timedelta(days=self.rng.randrange(PENDING_ORDER_DAYS))
+            else:
+                day = self.first_date + timedelta(days=self.rng.randrange(span_days))
+            second = self.rng.choices(self._seconds, self._second_weights)[0]
+            request_date = datetime.combine(day, self._time_of(second))
+            if request_date >= pending_since:
+                status = 'Pending'
+            else:
+                status = 'Rejected' if self.rng.random() < REJECTED_SHARE else 'Processed'
+            yield request_date, status, self._items(self.rng.choice((1, 1, 2, 3)))
+
+
+def _insert_sales(session, sales, progress):
+    headers, items, written = [], [], 0
+    for transaction_id, day, sale_time, sale_items in sales:
+        headers.append({'id': transaction_id, 'transaction_date': day, 'transaction_time': sale_time,
+                        'total_amount_cents': sum(item[4] for item in sale_items)})
+        for paper_type, color, pages, price_per_page_cents, item_total_cents in sale_items:
+            items.append({'transaction_header_id': transaction_id, 'paper_type': paper_type, 'color': color,
+                          'pages': pages, 'price_per_page_cents': price_per_page_cents, 'item_total_cents': item_total_cents})
+        if len(items) >= INSERT_CHUNK_SIZE:
+            written += _flush_sales(session, headers, items)
+            progress(written)
+    written += _flush_sales(session, headers, items)
+    progress(written)
+    return written
+
+
+def _flush_sales(session, headers, items):
+    if headers:
+        connection = session.connection() # Core executemany; the ORM bulk path adds nothing here
+        connection.execute(TransactionHeader.__table__.insert(), headers)
+        connection.execute(TransactionItem.__table__.insert(), items)
+        session.commit()
+    written = len(items)
+    headers.clear()
+    items.clear()
+    return written
+
+
+def _insert_orders(session, orders):
+    """Inserts the orders chunk by chunk; returns the number of orders written."""
+    next_id = (session.query(db.func.max(CustomerOrderRequest.request_id)).scalar() or 0) + 1
+    requests, items, written = [], [], 0
+    for request_date, status, order_items in orders:
+        requests.append({'request_id': next_id, 'customer_name': f'Customer {next_id % 5000}',
+                         'file_name': f'print-job-{next_id}.pdf', 'file_url': None, 'note': None,
+                         'request_date': request_date, 'status': status})
+        for paper_type, color, pages, price_per_page_cents, item_total_cents in order_items:
+            items.append({'request_header_id': next_id, 'paper_type': paper_type, 'color': color,
+                          'pages': pages, 'price_per_page_cents': price_per_page_cents, 'item_total_cents': item_total_cents})
+        next_id += 1
+        if len(items) >= INSERT_CHUNK_SIZE:
+            written += _flush_orders(session, requests, items)
+    written += _flush_orders(session, requests, items)
+    return written
+
+
+def _flush_orders(session, requests, items):
+    if requests:
+        connection = session.connection()
+        connection.execute(CustomerOrderRequest.__table__.insert(), requests)
+        connection.execute(CustomerOrderItem.__table__.insert(), items)
+        session.commit()
+    written = len(requests)
+    requests.clear()
+    items.clear()
+    return written
+
+
+def generate_history(generator, session=None, progress=None):
+    """
+    Fills the app's (empty, upgraded) database with the generator's history,
+    then builds the daily rollup. Returns counts of what was written.
+    """
+    session = session or db.session
+    seed_default_prices(session=session)
+    session.commit()
+    written_items = _insert_sales(session, generator.sales(), progress or (lambda written: None))
+    num_sales = session.query(db.func.count(TransactionHeader.id)).scalar()
+    num_orders = _insert_orders(session, generator.orders(round(num_sales * ORDERS_PER_SALE)))
+    rebuild_rollup(session=session)
+    session.commit()
+    session.connection().exec_driver_sql('ANALYZE')
+    session.commit()
+    return {'items': written_items, 'transactions': num_sales, 'orders': num_orders}
+
+
+def add_pending_orders(generator, count, session=None):
+    """Adds `count` fresh Pending orders (from the last week) for the order processing benchmarks."""
+    session = session or db.session
+    return _insert_orders(session, generator.orders(count, pending_only=True))
+
+
+def create_history_db(path, num_items, years=3, end_date=None, seed=42, progress=None):
+    """Creates a new SQLite file at `path` holding a synthetic history; returns generate_history()'s counts."""
+    if os.path.exists(path):
+        raise FileExistsError(path)
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.abspath(path)}", 'LOG_LEVEL': 'ERROR'})
+    with app.app_context():
+        upgrade_schema()
+        counts = generate_history(HistoryGenerator(num_items, years, end_date, seed), progress=progress)
+        db.session.remove()
+        db.engine.dispose()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic shop history database.')
+    parser.add_argument('path', help='SQLite file to create')
+    parser.add_argument('--items', default='10k', help="number of transaction items: 10k, 1m, 10m or a number")
+    parser.add_argument('--years', type=int, default=3)
+    parser.add_argument('--end-date', type=date.fromisoformat, default=None, help='last day of history (YYYY-MM-DD), default today')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    num_items = parse_size(args.items)
+    started = time.perf_counter()
+
+    def progress(written):
+        elapsed = time.perf_counter() - started
+        print(f"\r  {written:>12,} / {num_items:,} items  ({written / elapsed:,.0f} items/s)", end='', flush=True)
+
+    counts = create_history_db(args.path, num_items, args.years, args.end_date, args.seed, progress)
+    print(f"\n{counts['items']:,} items in {counts['transactions']:,} transactions and "
+          f"{counts['orders']:,} customer orders written to {args.path} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,19 +1,15 @@
 # PrintingSystemWeb/runserver.py
 
-# Import your app and db instances from your PrintingSystemWeb package
-from PrintingSystemWeb import app, db 
+from PrintingSystemWeb import create_app, db
+
+app = create_app()
 
 if __name__ == '__main__':
-    # Ensure database tables are created before the server starts
+    # The schema is no longer created on startup; do it once (and after upgrades) with:
+    #   flask --app PrintingSystemWeb upgrade-db
     with app.app_context():
-        print("Ensuring database tables are created...")
-        try:
-            db.create_all()
-            print("Database tables checked/created successfully.")
-        except Exception as e:
-            print(f"ERROR: Failed to create database tables: {e}")
-            # Optionally, you might want to raise the exception or exit if DB creation is critical
-            # raise e 
-            
+        if not db.inspect(db.engine).has_table('transaction_header'):
+            print("Database tables not found. Run 'flask --app PrintingSystemWeb upgrade-db' first.")
+
     # Run the Flask development server
-    app.run(debug=True) # debug=True is good for development
\ No newline at end of file
+    app.run(debug=True) # debug=True is good for development
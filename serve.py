@@ -0,0 +1,17 @@
+# PrintingSystemWeb/serve.py
+#
+# Production entry point: serves the app with gunicorn (several worker
+# processes, each with a thread pool), configured by the SERVER_* settings of
+# the active profile. Typically:
+#   PRINTING_SYSTEM_CONFIG=production python serve.py
+# Run `flask --app PrintingSystemWeb upgrade-db` once before the first start,
+# and `flask --app PrintingSystemWeb build-assets` after every deploy.
+# Use runserver.py for development (debugger and auto-reload).
+
+from PrintingSystemWeb import create_app
+from PrintingSystemWeb.server import ProductionServer
+
+app = create_app()
+
+if __name__ == '__main__':
+    ProductionServer(app).run()
@@ -0,0 +1,30 @@
+# tests/conftest.py
+
+import pytest
+
+from PrintingSystemWeb import create_app, db
+from PrintingSystemWeb.pricing import seed_default_prices
+from PrintingSystemWeb.schema import upgrade_schema
+
+
+@pytest.fixture
+def app(tmp_path):
+    """An app on a fresh database under tmp_path, with the schema and default prices in place."""
+    app = create_app({
+        'TESTING': True,
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'site.db'}",
+        'UPLOAD_DIR': str(tmp_path / 'uploads'),
+        'ARCHIVE_DIR': str(tmp_path / 'archive'),
+    })
+    with app.app_context():
+        upgrade_schema()
+        seed_default_prices()
+        db.session.commit()
+        yield app
+        db.session.remove()
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
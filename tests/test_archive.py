@@ -0,0 +1,145 @@
+# tests/test_archive.py
+
+import csv
+import json
+import os
+from datetime import date
+
+import pytest
+
+from PrintingSystemWeb import db, TransactionHeader, TransactionItem, TransactionIdempotencyKey, ArchivedMonth
+from PrintingSystemWeb.archive import (
+    archive_month, restore_month, archivable_months, month_key, segment_archive, ArchiveError
+)
+from PrintingSystemWeb.bulk import confirm_transactions_batch
+from PrintingSystemWeb.importer import import_records_csv
+from PrintingSystemWeb.reports import summarize_sales
+from PrintingSystemWeb.rollup import rebuild_rollup, rollup_sales_summary
+from PrintingSystemWeb.views import filter_records_by_date
+
+
+def write_records_csv(path, days):
+    """An old-style records.csv with three transactions (of one or two items) on each of `days`."""
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['ID', 'Date', 'Time', 'Paper Type', 'Color', 'Pages', 'Price/Page', 'Total'])
+        for day in days:
+            for n in range(3):
+                trans_id = f"TRX-{day:%Y%m%d}-{n:02}"
+                writer.writerow([trans_id, f"{day:%m/%d/%Y}", f"{n + 8:02}:15AM", 'Short', 'Black', n + 1, '1.00', f"{n + 1}.00"])
+                if n:
+                    writer.writerow([trans_id, f"{day:%m/%d/%Y}", f"{n + 8:02}:15AM", 'A4', 'Colored', 2, '2.50', '5.00'])
+    return path
+
+
+@pytest.fixture
+def history(app, tmp_path):
+    """Three transactions on each of a few days in March and April 2025; returns the records.csv path."""
+    days = [date(2025, 3, 1), date(2025, 3, 15), date(2025, 3, 31), date(2025, 4, 2)]
+    csv_path = write_records_csv(tmp_path / 'records.csv', days)
+    import_records_csv(csv_path)
+    return csv_path
+
+
+def snapshot(from_str='01/01/2025', to_str='12/31/2025'):
+    """Everything the reports show for a range, minus item IDs."""
+    records = filter_records_by_date(from_str, to_str)
+    return {
+        'summary': summarize_sales(date(2025, 1, 1), date(2025, 12, 31)),
+        'march': summarize_sales(date(2025, 3, 10), date(2025, 3, 31)),
+        'count': records.count(),
+        'pages': [[row[:8] for row in records.paginate(page, 4).items] for page in range(1, 5)],
+        'records': [row[:8] for row in records.iter_records(batch_size=3)],
+        'rollup': rollup_sales_summary(date(2025, 4, 2)),
+    }
+
+
+def test_archived_month_reads_like_the_live_one(history):
+    before = snapshot()
+    assert archivable_months(1, today=date(2025, 5, 1)) == ['2025-03', '2025-04']
+
+    assert archive_month('2025-03') == 15
+    assert TransactionHeader.query.filter(TransactionHeader.transaction_date < date(2025, 4, 1)).count() == 0
+    assert db.session.get(ArchivedMonth, '2025-03').transaction_count == 9
+    assert snapshot() == before
+
+    rebuild_rollup()
+    db.session.commit()
+    assert snapshot() == before
+
+
+def test_restore_puts_the_rows_back(history):
+    before = snapshot()
+    archive_month('2025-03')
+    assert restore_month('2025-03') == 15
+    assert ArchivedMonth.query.count() == 0
+    assert os.listdir(segment_archive.root) == []
+    assert TransactionItem.query.count() == 20
+    assert snapshot() == before
+    with pytest.raises(ArchiveError):
+        restore_month('2025-03')
+
+
+def test_reimport_skips_archived_transactions(history):
+    before = snapshot()
+    archive_month('2025-03')
+    stats = import_records_csv(history)
+    assert stats['importedTransactions'] == 0
+    assert stats['skippedTransactions'] == 12
+    assert snapshot() == before
+
+
+def test_resent_batch_after_archiving_is_a_duplicate(app):
+    batch = [{'idempotencyKey': 'terminal-1', 'items': [{'paperType': 'Short', 'color': 'Black', 'pages': 1}]}]
+    (first,), _ = confirm_transactions_batch(batch)
+    db.session.commit()
+    current_month = month_key(TransactionHeader.query.one().transaction_date)
+
+    archive_month(current_month)
+    assert TransactionIdempotencyKey.query.count() == 0
+    (resent,), created = confirm_transactions_batch(batch)
+    db.session.commit()
+    assert resent == {'idempotencyKey': 'terminal-1', 'status': 'duplicate', 'transactionId': first['transactionId']}
+    assert created == []
+    assert TransactionHeader.query.count() == 0
+
+    restore_month(current_month)
+    assert db.session.get(TransactionIdempotencyKey, 'terminal-1').transaction_header_id == first['transactionId']
+    (resent,), created = confirm_transactions_batch(batch)
+    assert resent['status'] == 'duplicate' and created == []
+
+
+def test_restore_after_new_sales_reused_the_archived_item_ids(history):
+    archive_month('2025-04') # Holds the highest item_ids, which SQLite hands out again
+    confirm_transactions_batch([{'idempotencyKey': 'after-archive',
+                                 'items': [{'paperType': 'Short', 'color': 'Black', 'pages': 1}] * 5}])
+    db.session.commit()
+
+    assert restore_month('2025-04') == 5
+    assert TransactionItem.query.count() == 25
+    april = filter_records_by_date('04/01/2025', '04/30/2025')
+    assert [row[0][-2:] for row in april.iter_records()] == ['02', '02', '01', '01', '00']
+
+
+def test_get_records_lists_archived_months(history, client, tmp_path):
+    def page_through(limit):
+        records, cursor = [], None
+        while True:
+            body = client.get(f"/get-records?limit={limit}" + (f"&cursor={cursor}" if cursor else '')).get_json()
+            records += body['records']
+            cursor = body['nextCursor']
+            if cursor is None:
+                return records
+
+    archive_month('2025-03')
+    import_records_csv(write_records_csv(tmp_path / 'late.csv', [date(2025, 3, 20)])) # Stays live, merged in
+    listed = client.get('/get-records').get_json()
+    assert len(listed) == 25
+    assert [record['date'] for record in listed[:6]] == ['04/02/2025'] * 5 + ['03/31/2025']
+    for limit in (1, 4, 7):
+        assert page_through(limit) == listed
+    streamed = client.get('/get-records?format=ndjson').get_data(as_text=True).splitlines()
+    assert [json.loads(line) for line in streamed] == listed
+
+    restore_month('2025-03')
+    assert client.get('/get-records').get_json() == listed
@@ -0,0 +1,75 @@
+# tests/test_assets.py
+
+import gzip
+
+import pytest
+
+from PrintingSystemWeb.assets import asset_manifest, build_assets, minify_css, minify_js
+
+
+@pytest.mark.parametrize('source, expected', [
+    ("function f(s) {\n    return /a+ b/g.test(s);\n}\n", "function f(s){\nreturn/a+ b/g.test(s);\n}\n"),
+    ("var path = name.replace(/\\//g, '-');\n", "var path=name.replace(/\\//g,'-');\n"),
+    ("var half = (a + b) / 2 / count; // average\n", "var half=(a+b)/2/count;\n"),
+    ("var ratio = total / count // per item\n", "var ratio=total/count\n"),
+    ("var t = `a ${ ok ? `b ${ n + 1 }` : '}' } c`;\n", "var t=`a ${ok?`b ${n+1}`:'}'} c`;\n"),
+    ("/*! Library v1 | MIT */\n/* internal note */\nvar a = 1;\n", "/*! Library v1 | MIT */\nvar a=1;\n"),
+    ("var x = a\n/re/g.test(y)\n", "var x=a\n/re/g.test(y)\n"),
+    ("y = - -z; w = a + +b\n", "y=- -z;w=a+ +b\n"),
+], ids=['regex after keyword', 'regex after paren', 'division after paren', 'division after identifier',
+        'nested template', 'license comment', 'slash after line break', 'unary signs'])
+def test_minify_js(source, expected):
+    assert minify_js(source) == expected
+
+
+@pytest.mark.parametrize('source', ["var s = 'open;\n", "/* never closed\nvar a;\n", "var t = `a ${b}\n"])
+def test_minify_js_rejects_unterminated_literals(source):
+    with pytest.raises(ValueError):
+        minify_js(source)
+
+
+def test_minify_css():
+    source = ("/*! keep */\n/* drop */\n.a , .b {\n  color: red;\n  content: ' x ; ';\n}\n"
+              "@media (max-width: 600px) {\n  .c { margin: 0 auto; }\n}\n")
+    assert minify_css(source) == "/*! keep */\n.a,.b{color:red;content:' x ; '}@media (max-width:600px){.c{margin:0 auto}}\n"
+
+
+@pytest.fixture
+def built(app, tmp_path):
+    """A static folder with one built script and both precompressed variants; returns its URL path."""
+    (tmp_path / 'js').mkdir()
+    (tmp_path / 'js' / 'app.js').write_text("var answer = 6 * 7;\n", encoding='utf-8')
+    (tmp_path / 'js' / 'plain.js').write_text("var plain;\n", encoding='utf-8')
+    report = build_assets(str(tmp_path), {'js/app.js': None})
+    built_name = report['js/app.js'][0]
+    (tmp_path / (built_name + '.br')).write_bytes(b'brotli bytes') # The brotli package is optional
+    app.static_folder = str(tmp_path)
+    asset_manifest.load(str(tmp_path))
+    return '/static/' + built_name
+
+
+@pytest.mark.parametrize('accept, encoding', [
+    ('gzip, deflate, br', 'br'),
+    ('gzip', 'gzip'),
+    ('br;q=0, gzip', 'gzip'),
+    ('identity', None),
+])
+def test_built_assets_are_served_precompressed(client, built, accept, encoding):
+    response = client.get(built, headers={'Accept-Encoding': accept})
+    assert response.status_code == 200
+    assert response.content_encoding == encoding
+    assert response.mimetype.endswith('javascript')
+    assert 'Accept-Encoding' in response.vary
+    assert response.cache_control.immutable and response.cache_control.public
+    body = response.get_data()
+    if encoding == 'gzip':
+        body = gzip.decompress(body)
+    if encoding != 'br':
+        assert body == b"var answer=6*7;\n"
+
+
+def test_other_static_files_are_served_as_before(client, built):
+    response = client.get('/static/js/plain.js', headers={'Accept-Encoding': 'gzip, br'})
+    assert response.status_code == 200
+    assert response.content_encoding is None
+    assert not response.cache_control.immutable
@@ -0,0 +1,101 @@
+# tests/test_bulk.py
+
+from datetime import datetime
+
+from PrintingSystemWeb import db, TransactionHeader, TransactionItem, CustomerOrderRequest, CustomerOrderItem, DailySalesRollup
+from PrintingSystemWeb.bulk import confirm_transactions_batch, process_orders_batch, reject_orders_batch
+
+SHORT_BLACK = [{'paperType': 'Short', 'color': 'Black', 'pages': 2}]
+
+
+def confirm(transactions):
+    results, created = confirm_transactions_batch(transactions)
+    db.session.commit()
+    return results, created
+
+
+def test_batch_creates_transactions_and_rollup(app):
+    results, created = confirm([
+        {'idempotencyKey': 'a', 'items': SHORT_BLACK},
+        {'idempotencyKey': 'b', 'items': SHORT_BLACK + [{'paperType': 'A4', 'color': 'Colored', 'pages': 1}]},
+    ])
+    assert [result['status'] for result in results] == ['created', 'created']
+    assert len(created) == 2
+    assert db.session.get(TransactionHeader, results[1]['transactionId']).total_amount_cents == 450
+    assert TransactionItem.query.count() == 3
+    assert sum(row.revenue_cents for row in DailySalesRollup.query) == 650
+    assert sum(row.transaction_count for row in DailySalesRollup.query) == 2
+
+
+def test_resent_keys_report_the_existing_transaction(app):
+    first, _ = confirm([{'idempotencyKey': 'a', 'items': SHORT_BLACK}])
+    results, created = confirm([
+        {'idempotencyKey': 'a', 'items': SHORT_BLACK},
+        {'idempotencyKey': 'c', 'items': SHORT_BLACK},
+        {'idempotencyKey': 'c', 'items': SHORT_BLACK},
+    ])
+    assert results[0] == {'idempotencyKey': 'a', 'status': 'duplicate', 'transactionId': first[0]['transactionId']}
+    assert results[1]['status'] == 'created'
+    assert results[2] == {'idempotencyKey': 'c', 'status': 'duplicate', 'transactionId': results[1]['transactionId']}
+    assert len(created) == 1
+    assert TransactionHeader.query.count() == 2
+
+
+def test_invalid_transactions_do_not_stop_the_batch(app):
+    results, created = confirm([
+        {'items': SHORT_BLACK},
+        {'idempotencyKey': 'x' * 101, 'items': SHORT_BLACK},
+        {'idempotencyKey': 'bad-items', 'items': [{'paperType': 'Canvas', 'color': 'Black', 'pages': 1}]},
+        {'idempotencyKey': 'ok', 'items': SHORT_BLACK},
+    ])
+    assert [result['status'] for result in results] == ['invalid', 'invalid', 'invalid', 'created']
+    assert len(created) == 1
+
+
+def add_order(status='Pending'):
+    order = CustomerOrderRequest(customer_name='Sample', file_name='sample.pdf', request_date=datetime(2026, 1, 1),
+                                 status=status)
+    order.items = [CustomerOrderItem(paper_type='Long', color='Colored', pages=2, price_per_page_cents=300,
+                                     item_total_cents=600)]
+    db.session.add(order)
+    db.session.commit()
+    return order.request_id
+
+
+def test_process_orders_creates_one_transaction_per_order(app):
+    pending, done, rejected = add_order(), add_order('Processed'), add_order('Rejected')
+    processed, skipped, created = process_orders_batch(request_ids=[pending, done, rejected, 999])
+    db.session.commit()
+
+    assert [entry['requestId'] for entry in processed] == [pending]
+    assert sorted(skipped, key=lambda entry: entry['requestId']) == [
+        {'requestId': done, 'reason': 'already processed'}, {'requestId': rejected, 'reason': 'already rejected'},
+        {'requestId': 999, 'reason': 'not found'}]
+    assert db.session.get(CustomerOrderRequest, rejected).status == 'Rejected'
+    header = db.session.get(TransactionHeader, processed[0]['transactionId'])
+    assert header.total_amount_cents == 600
+    assert db.session.get(CustomerOrderRequest, pending).status == 'Processed'
+    assert created[0][2] == [('Long', 'Colored', 2, 300, 600)]
+
+
+def test_reject_orders_by_status(app):
+    first, second, processed = add_order(), add_order(), add_order('Processed')
+    rejected, skipped = reject_orders_batch(status='Pending', limit=10)
+    db.session.commit()
+
+    assert sorted(rejected) == [first, second]
+    assert skipped == []
+    assert db.session.get(CustomerOrderRequest, processed).status == 'Processed'
+    assert TransactionHeader.query.count() == 0
+
+
+def test_reject_orders_skips_orders_that_are_not_pending(app):
+    pending, processed, rejected = add_order(), add_order('Processed'), add_order('Rejected')
+    rejected_ids, skipped = reject_orders_batch(request_ids=[pending, processed, rejected])
+    db.session.commit()
+
+    assert rejected_ids == [pending]
+    assert sorted(skipped, key=lambda entry: entry['requestId']) == [
+        {'requestId': processed, 'reason': 'already processed'}, {'requestId': rejected, 'reason': 'already rejected'}]
+    assert db.session.get(CustomerOrderRequest, processed).status == 'Processed'
+    assert TransactionHeader.query.count() == 0
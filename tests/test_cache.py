@@ -0,0 +1,46 @@
+# tests/test_cache.py
+
+from datetime import date
+
+from PrintingSystemWeb import db
+from PrintingSystemWeb.cache import ReportCache, mark_reports_stale
+
+CLOSED_MONTH = (date(2020, 1, 1), date(2020, 1, 31))
+
+
+class Counter:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.calls
+
+
+def test_past_months_are_cached_until_a_bulk_write(app):
+    cache, compute = ReportCache(), Counter()
+    assert cache.get_or_compute('january', *CLOSED_MONTH, compute) == 1
+    assert cache.get_or_compute('january', *CLOSED_MONTH, compute) == 1
+
+    mark_reports_stale() # As an import or archive run in another process would
+    db.session.commit()
+    assert cache.get_or_compute('january', *CLOSED_MONTH, compute) == 2
+    assert cache.get_or_compute('january', *CLOSED_MONTH, compute) == 2
+
+
+def test_only_the_current_month_expires(app):
+    cache, january, today = ReportCache(ttl_seconds=0), Counter(), Counter()
+    cache.get_or_compute('january', *CLOSED_MONTH, january)
+    assert cache.get_or_compute('january', *CLOSED_MONTH, january) == 1
+    cache.get_or_compute('today', date.today(), date.today(), today)
+    assert cache.get_or_compute('today', date.today(), date.today(), today) == 2
+
+
+def test_writes_invalidate_the_ranges_they_touch(app):
+    cache, january, february = ReportCache(), Counter(), Counter()
+    cache.get_or_compute('january', *CLOSED_MONTH, january)
+    cache.get_or_compute('february', date(2020, 2, 1), date(2020, 2, 29), february)
+    cache.invalidate_dates([date(2020, 2, 10)])
+    assert cache.get_or_compute('january', *CLOSED_MONTH, january) == 1
+    assert cache.get_or_compute('february', date(2020, 2, 1), date(2020, 2, 29), february) == 2
+
@@ -0,0 +1,66 @@
+# tests/test_events.py
+
+import json
+
+import pytest
+
+from PrintingSystemWeb import LiveEvent
+from PrintingSystemWeb.events import EventBroker, RESYNC, event_broker
+
+
+@pytest.fixture
+def brokers(app):
+    """Two brokers on the same database, standing in for two server processes."""
+    app.config.update(EVENTS_POLL_SECONDS=0.05, EVENTS_HISTORY_SIZE=5)
+    pair = EventBroker(), EventBroker()
+    for broker in pair:
+        broker.init_app(app)
+    return pair
+
+
+def test_events_reach_subscribers_of_other_processes(brokers):
+    writer, reader = brokers
+    subscription = reader.subscribe()
+    try:
+        writer.publish('order-rejected', {'requestId': 7, 'status': 'Rejected'})
+        event_id, event_type, payload = subscription.get(timeout=5)
+        assert event_type == 'order-rejected'
+        assert json.loads(payload) == {'requestId': 7, 'status': 'Rejected'}
+        assert event_id == str(LiveEvent.query.one().id)
+    finally:
+        reader.unsubscribe(subscription)
+
+
+def test_reconnect_replays_missed_events_or_asks_for_a_resync(brokers):
+    writer, reader = brokers
+    writer.publish_many('order-rejected', [{'requestId': n} for n in range(1, 5)])
+    first_id = LiveEvent.query.order_by(LiveEvent.id).first().id
+
+    subscription = reader.subscribe(last_event_id=str(first_id + 1))
+    try:
+        replayed = [subscription.get(timeout=0) for _ in range(2)]
+        assert [json.loads(payload)['requestId'] for _, _, payload in replayed] == [3, 4]
+        assert subscription.get(timeout=0.2) is None # Not handed out a second time by the poller
+    finally:
+        reader.unsubscribe(subscription)
+
+    writer.publish_many('order-rejected', [{'requestId': n} for n in range(5, 12)]) # Prunes the oldest
+    for last_event_id in (str(first_id), 'unknown', '999999'):
+        subscription = reader.subscribe(last_event_id=last_event_id)
+        reader.unsubscribe(subscription)
+        assert subscription.get(timeout=0)[1] == RESYNC
+    assert LiveEvent.query.count() == 5
+
+
+def test_streams_beyond_the_limit_are_turned_away(app, client, brokers):
+    _, reader = brokers
+    subscriptions = [reader.subscribe() for _ in range(app.config['EVENTS_MAX_STREAMS'])]
+    try:
+        assert reader.subscribe() is None
+    finally:
+        for subscription in subscriptions:
+            reader.unsubscribe(subscription)
+
+    app.config['EVENTS_MAX_STREAMS'] = 0
+    event_broker.init_app(app)
+    assert client.get('/events').status_code == 204
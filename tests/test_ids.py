@@ -0,0 +1,62 @@
+# tests/test_ids.py
+
+import re
+import threading
+from datetime import datetime, timezone
+
+from PrintingSystemWeb import ids
+from PrintingSystemWeb.ids import TransactionIdGenerator
+
+ID_FORMAT = re.compile(r'^TRX-\d{8}-\d{6}-\d{3}-[0-9A-F]{12}$')
+
+
+class FrozenClock:
+    """Stands in for ids.datetime; `now` is set by the test."""
+
+    def __init__(self, now):
+        self.now_value = now
+
+    def now(self, tz=None):
+        return self.now_value
+
+    def fromtimestamp(self, *args):
+        return datetime.fromtimestamp(*args)
+
+
+def test_ids_are_well_formed_and_match_their_timestamp():
+    transaction_id, timestamp = TransactionIdGenerator().next_id()
+    assert ID_FORMAT.match(transaction_id)
+    assert transaction_id.startswith(f"TRX-{timestamp:%Y%m%d-%H%M%S}-{timestamp.microsecond // 1000:03}-")
+    assert timestamp.tzinfo is timezone.utc
+
+
+def test_ids_keep_increasing_when_the_clock_stands_still_or_steps_back(monkeypatch):
+    clock = FrozenClock(datetime(2026, 1, 1, 12, 0, 0, tzinfo=timezone.utc))
+    monkeypatch.setattr(ids, 'datetime', clock)
+    generator = TransactionIdGenerator()
+    generator.SEQUENCE_LIMIT = 4 # Overflow into the next millisecond quickly
+
+    issued = [generator.next_id() for _ in range(10)]
+    clock.now_value = datetime(2025, 12, 31, 23, 59, 59, tzinfo=timezone.utc)
+    issued += [generator.next_id() for _ in range(3)]
+
+    transaction_ids = [transaction_id for transaction_id, _ in issued]
+    assert transaction_ids == sorted(set(transaction_ids))
+    timestamps = [timestamp for _, timestamp in issued]
+    assert timestamps == sorted(timestamps)
+
+
+def test_ids_are_unique_across_threads():
+    generator = TransactionIdGenerator()
+    issued = []
+
+    def issue():
+        issued.extend(generator.next_id()[0] for _ in range(2000))
+
+    threads = [threading.Thread(target=issue) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(set(issued)) == 8000
+
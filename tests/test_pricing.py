@@ -0,0 +1,75 @@
+# tests/test_pricing.py
+
+import pytest
+
+from PrintingSystemWeb import db, TransactionHeader
+from PrintingSystemWeb.pricing import price_items, set_price, PricingError
+
+
+def test_items_are_priced_from_the_price_table(app):
+    items, total_cents = price_items([
+        {'paperType': 'Short', 'color': 'Black', 'pages': 3},
+        {'paperType': 'A4', 'color': 'colored', 'pages': 2},
+    ])
+    assert items == [('Short', 'Black', 3, 100, 300), ('A4', 'colored', 2, 250, 500)]
+    assert total_cents == 800
+
+
+def test_whole_page_counts_are_accepted_in_any_json_form(app):
+    for pages in (3, 3.0, '3'):
+        assert price_items([{'paperType': 'Short', 'color': 'Black', 'pages': pages}]) == ([('Short', 'Black', 3, 100, 300)], 300)
+
+
+def test_client_prices_are_ignored_without_overrides(app):
+    item = {'paperType': 'Long', 'color': 'Black', 'pages': 2, 'pricePerPage': 0.01, 'itemTotal': 0.02}
+    assert price_items([item]) == ([('Long', 'Black', 2, 150, 300)], 300)
+    assert price_items([item], allow_overrides=True) == ([('Long', 'Black', 2, 1, 2)], 2)
+
+
+def test_client_item_totals_are_never_used(app):
+    item = {'paperType': 'Long', 'color': 'Black', 'pages': 2, 'itemTotal': 999}
+    assert price_items([item], allow_overrides=True) == ([('Long', 'Black', 2, 150, 300)], 300)
+    item['pricePerPage'] = '1.25'
+    assert price_items([item], allow_overrides=True) == ([('Long', 'Black', 2, 125, 250)], 250)
+
+
+def test_counter_endpoint_recomputes_the_total(app, client):
+    app.config['ALLOW_COUNTER_PRICE_OVERRIDES'] = True
+    response = client.post('/confirm-transaction', json={
+        'items': [{'paperType': 'Short', 'color': 'Black', 'pages': 3, 'pricePerPage': 2, 'itemTotal': 999}]
+    })
+    assert response.status_code == 200
+    header = db.session.get(TransactionHeader, response.get_json()['transactionId'])
+    assert header.total_amount_cents == 600
+    assert [item.item_total_cents for item in header.items] == [600]
+
+
+def test_set_price_takes_effect_at_once(app):
+    price_items([{'paperType': 'Short', 'color': 'Black', 'pages': 1}]) # Loads the snapshot
+    set_price('Short', 'Black', '1.25')
+    db.session.commit()
+    assert price_items([{'paperType': 'short', 'color': 'black', 'pages': 4}])[1] == 500
+
+
+@pytest.mark.parametrize('items_data', [
+    None,
+    [],
+    [{'paperType': 'Short', 'color': 'Black'}],
+    [{'paperType': 'Short', 'color': 'Black', 'pages': 'many'}],
+    [{'paperType': 'Short', 'color': 'Black', 'pages': 0}],
+    [{'paperType': 'Short', 'color': 'Black', 'pages': -2}],
+    [{'paperType': 'Short', 'color': 'Black', 'pages': 2.7}],
+    [{'paperType': 'Short', 'color': 'Black', 'pages': '2.7'}],
+    [{'paperType': 'Short', 'color': 'Black', 'pages': True}],
+    [{'paperType': 'Short', 'color': 'Black', 'pages': None}],
+    [{'paperType': 'Canvas', 'color': 'Black', 'pages': 1}],
+], ids=['none', 'empty', 'no pages', 'text pages', 'zero pages', 'negative pages', 'fractional pages',
+        'fractional text pages', 'boolean pages', 'null pages', 'unknown paper'])
+def test_invalid_items_are_rejected(app, items_data):
+    with pytest.raises(PricingError):
+        price_items(items_data)
+
+
+def test_invalid_override_amounts_are_rejected(app):
+    with pytest.raises(PricingError):
+        price_items([{'paperType': 'Short', 'color': 'Black', 'pages': 1, 'pricePerPage': '-1'}], allow_overrides=True)
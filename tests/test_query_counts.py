@@ -0,0 +1,61 @@
+# tests/test_query_counts.py
+#
+# The number of SQL statements per request must stay the same whether a page
+# holds one row or many (i.e. no N+1 lazy loads while serializing).
+
+from datetime import date, datetime, time
+
+import pytest
+
+from PrintingSystemWeb import db, TransactionHeader, TransactionItem, CustomerOrderRequest, CustomerOrderItem
+from PrintingSystemWeb.instrumentation import count_queries
+from PrintingSystemWeb.views import get_records_api, get_detailed_report_api, get_customer_orders_api
+
+SAMPLE_DAY = date(1999, 1, 1).strftime("%m/%d/%Y")
+
+
+@pytest.fixture
+def sample_data(app):
+    for n in range(61):
+        header_id = f"TRX-QUERYCOUNT-{n:04}"
+        db.session.add(TransactionHeader(id=header_id, transaction_date=date(1999, 1, 1),
+                                         transaction_time=time(12, n % 60), total_amount_cents=400))
+        for paper_type in ('Short', 'A4'):
+            db.session.add(TransactionItem(transaction_header_id=header_id, paper_type=paper_type, color='Black',
+                                           pages=1, price_per_page_cents=200, item_total_cents=200))
+    for n in range(12):
+        order = CustomerOrderRequest(customer_name=f"Query Count {n}", file_name='sample.pdf',
+                                     request_date=datetime(2999, 1, 1, 0, n), status='QueryCountMany')
+        order.items = [CustomerOrderItem(paper_type='Long', color='Colored', pages=2, price_per_page_cents=300,
+                                         item_total_cents=600) for _ in range(3)]
+        db.session.add(order)
+    lone_order = CustomerOrderRequest(customer_name='Query Count Lone', file_name='sample.pdf',
+                                      request_date=datetime(2999, 1, 1), status='QueryCountOne')
+    lone_order.items = [CustomerOrderItem(paper_type='Long', color='Colored', pages=2, price_per_page_cents=300,
+                                          item_total_cents=600)]
+    db.session.add(lone_order)
+    db.session.commit()
+
+
+def query_count(app, view, url):
+    """Runs `view` for `url` and returns (statement count, row count of the response)."""
+    with app.test_request_context(url):
+        with count_queries() as statements:
+            response, status = view()
+        assert status == 200, f"{url} returned {status}"
+        data = response.get_json()
+    return len(statements), len(data.get('records', data.get('orders')))
+
+
+@pytest.mark.usefixtures('sample_data')
+@pytest.mark.parametrize('view, urls', [
+    (get_records_api, ['/get-records?limit=1', '/get-records?limit=20', '/get-records?limit=100']),
+    (get_detailed_report_api, [f'/get-detailed-report?fromDate={SAMPLE_DAY}&toDate={SAMPLE_DAY}&page=13',
+                               f'/get-detailed-report?fromDate={SAMPLE_DAY}&toDate={SAMPLE_DAY}&page=1']),
+    (get_customer_orders_api, ['/get-customer-orders?status=QueryCountOne',
+                               '/get-customer-orders?status=QueryCountMany']),
+], ids=['get-records', 'get-detailed-report', 'get-customer-orders'])
+def test_query_count_is_independent_of_page_size(app, view, urls):
+    counts = [query_count(app, view, url) for url in urls]
+    assert len({rows for _, rows in counts}) > 1, "sample pages did not differ in size"
+    assert len({queries for queries, _ in counts}) == 1, f"query count grows with page size: {counts}"
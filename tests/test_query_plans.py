@@ -0,0 +1,83 @@
+# tests/test_query_plans.py
+#
+# EXPLAIN QUERY PLAN regression check for the report queries: runs each report
+# path, captures the SQL it executes, and explains every statement against a
+# separate database filled with a year of sample rows and ANALYZEd, so the
+# planner sees realistic statistics. No statement may fall back to a full
+# table scan (a plain "SCAN <table>" without an index).
+
+import re
+from datetime import date, datetime, time, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+
+from PrintingSystemWeb import db, TransactionHeader, TransactionItem, CustomerOrderRequest, CustomerOrderItem
+from PrintingSystemWeb.instrumentation import capture_queries
+from PrintingSystemWeb.pagination import encode_cursor
+from PrintingSystemWeb.export import generate_csv
+from PrintingSystemWeb.views import (
+    filter_records_by_date, get_records_api, get_detailed_report_api, get_customer_orders_api
+)
+
+# Tables that are meant to be read whole (the rollup is O(days) by design)
+ALLOWED_FULL_SCANS = {'daily_sales_rollup'}
+FULL_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)(?: AS \w+)?$')
+
+
+@pytest.fixture(scope='module')
+def explain():
+    """A connection to a database with about 7k transactions and a few hundred orders."""
+    engine = create_engine('sqlite://')
+    db.metadata.create_all(engine)
+    headers, items = [], []
+    for n in range(7300):
+        header_id = f"TRX-PLAN-{n:05}"
+        headers.append({'id': header_id, 'transaction_date': date(2025, 1, 1) + timedelta(days=n // 20),
+                        'transaction_time': time(8 + n % 10, n % 60), 'total_amount_cents': 400})
+        items += [{'transaction_header_id': header_id, 'paper_type': paper_type, 'color': 'Black',
+                   'pages': 1, 'price_per_page_cents': 200, 'item_total_cents': 200} for paper_type in ('Short', 'A4')]
+    orders = [{'request_id': n, 'customer_name': 'Sample', 'file_name': 'sample.pdf',
+               'request_date': datetime(2025, 1, 1) + timedelta(hours=n),
+               'status': ('Pending', 'Processed', 'Rejected')[n % 3]} for n in range(1, 301)]
+    order_items = [{'request_header_id': n, 'paper_type': 'Long', 'color': 'Colored', 'pages': 2,
+                    'price_per_page_cents': 300, 'item_total_cents': 600} for n in range(1, 301)]
+    with engine.connect() as connection:
+        connection.execute(TransactionHeader.__table__.insert(), headers)
+        connection.execute(TransactionItem.__table__.insert(), items)
+        connection.execute(CustomerOrderRequest.__table__.insert(), orders)
+        connection.execute(CustomerOrderItem.__table__.insert(), order_items)
+        connection.exec_driver_sql('ANALYZE')
+        yield connection
+    engine.dispose()
+
+
+def call_view(app, view, url):
+    with app.test_request_context(url):
+        view()
+
+
+REPORT_PATHS = {
+    'get-records (page)': lambda app: call_view(app, get_records_api, '/get-records?limit=50'),
+    'get-records (cursor)': lambda app: call_view(
+        app, get_records_api, f"/get-records?limit=50&cursor={encode_cursor('2025-01-01', '12:00:00', 100)}"),
+    'get-detailed-report': lambda app: call_view(
+        app, get_detailed_report_api, '/get-detailed-report?fromDate=01/01/2025&toDate=01/31/2025&page=2'),
+    'export-report': lambda app: next(generate_csv(filter_records_by_date('01/01/2025', '01/31/2025'))),
+    'get-customer-orders (All)': lambda app: call_view(app, get_customer_orders_api, '/get-customer-orders'),
+    'get-customer-orders (status)': lambda app: call_view(
+        app, get_customer_orders_api, '/get-customer-orders?status=Pending'),
+}
+
+
+@pytest.mark.parametrize('label', REPORT_PATHS)
+def test_report_queries_use_indexes(app, explain, label):
+    with capture_queries() as captured:
+        REPORT_PATHS[label](app)
+    db.session.rollback()
+    assert captured, f"{label} ran no SQL"
+    for statement, parameters in captured:
+        plan = [row[-1] for row in explain.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)]
+        scans = [detail for detail in plan
+                 if FULL_SCAN.match(detail) and FULL_SCAN.match(detail).group(1) not in ALLOWED_FULL_SCANS]
+        assert not scans, f"{label} does a full table scan: {' | '.join(plan)}\n{statement}"
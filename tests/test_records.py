@@ -0,0 +1,31 @@
+# tests/test_records.py
+
+import pytest
+
+from PrintingSystemWeb import db
+from PrintingSystemWeb.bulk import confirm_transactions_batch
+
+
+@pytest.fixture
+def records(app):
+    confirm_transactions_batch([
+        {'idempotencyKey': f'key-{n}', 'items': [{'paperType': 'Short', 'color': 'Black', 'pages': 1}] * 2}
+        for n in range(3)
+    ])
+    db.session.commit()
+
+
+def test_pages_follow_the_cursor(client, records):
+    first = client.get('/get-records?limit=4').get_json()
+    second = client.get(f"/get-records?limit=4&cursor={first['nextCursor']}").get_json()
+    assert len(first['records']) == 4
+    assert len(second['records']) == 2 and second['nextCursor'] is None
+    everything = client.get('/get-records').get_json()
+    assert first['records'] + second['records'] == everything
+
+
+@pytest.mark.parametrize('limit', ['0', '-5', 'ten', '2.5', ''])
+def test_limit_must_be_a_positive_integer(client, records, limit):
+    response = client.get(f'/get-records?limit={limit}')
+    assert response.status_code == 400
+    assert 'limit' in response.get_json()['message']
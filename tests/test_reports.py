@@ -0,0 +1,20 @@
+# tests/test_reports.py
+
+import pytest
+
+
+@pytest.mark.parametrize('query', [
+    'fromDate=bad&toDate=01/31/2025',
+    'fromDate=01/01/2025&toDate=2025-01-31',
+    'fromDate=02/30/2025&toDate=03/01/2025',
+], ids=['garbage', 'iso date', 'impossible date'])
+def test_detailed_report_rejects_bad_dates(client, query):
+    response = client.get(f'/get-detailed-report?{query}')
+    assert response.status_code == 400
+    assert 'MM/DD/YYYY' in response.get_json()['message']
+
+
+def test_detailed_report_of_an_empty_range(client):
+    response = client.get('/get-detailed-report?fromDate=01/01/2025&toDate=01/31/2025')
+    assert response.status_code == 200
+    assert response.get_json()['pagination']['totalItems'] == 0
@@ -0,0 +1,126 @@
+# tests/test_uploads.py
+
+import io
+import os
+import zlib
+
+import pytest
+
+from PrintingSystemWeb import db, StoredFile
+from PrintingSystemWeb import uploads
+from PrintingSystemWeb.uploads import (
+    ContentStore, UploadError, count_pdf_pages, content_store, page_counter, receive_multipart
+)
+
+BOUNDARY = 'test-boundary'
+
+
+def simple_pdf(pages):
+    """A small uncompressed PDF: a catalog, one page tree and `pages` page objects."""
+    kids = ' '.join(f"{n + 3} 0 R" for n in range(pages))
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", f"<< /Type /Pages /Kids [{kids}] /Count {pages} >>".encode()]
+    objects += [b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] >>"] * pages
+    body = b''.join(f"{n + 1} 0 obj\n".encode() + obj + b"\nendobj\n" for n, obj in enumerate(objects))
+    return b"%PDF-1.4\n" + body + b"trailer\n<< /Root 1 0 R >>\n%%EOF\n"
+
+
+def object_stream_pdf(pages):
+    """A PDF 1.5 file whose page tree and pages only exist inside a compressed object stream."""
+    kids = ' '.join(f"{n + 3} 0 R" for n in range(pages))
+    inner = [f"<< /Type /Pages /Kids [{kids}] /Count {pages} >>".encode()]
+    inner += [b"<< /Type /Page /Parent 2 0 R >>"] * pages
+    stream = zlib.compress(b"\n".join(inner))
+    return (b"%PDF-1.5\n1 0 obj\n<< /Type /Catalog /Pages 2 0 R >>\nendobj\n"
+            + f"9 0 obj\n<< /Type /ObjStm /N {len(inner)} /First 0 /Filter /FlateDecode /Length {len(stream)} >>\n".encode()
+            + b"stream\r\n" + stream + b"\nendstream\nendobj\n%%EOF\n")
+
+
+def write(tmp_path, name, data):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_counts_a_simple_pdf(tmp_path):
+    assert count_pdf_pages(write(tmp_path, 'simple.pdf', simple_pdf(3))) == 3
+
+
+def test_counts_pages_inside_object_streams(tmp_path):
+    assert count_pdf_pages(write(tmp_path, 'objstm.pdf', object_stream_pdf(5))) == 5
+
+
+def test_matches_across_scan_slices_are_counted_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(uploads, 'SCAN_SLICE_SIZE', 16)
+    assert count_pdf_pages(write(tmp_path, 'simple.pdf', simple_pdf(4))) == 4
+
+
+@pytest.mark.parametrize('data', [b'', b'%PDF-1.4\n1 0 obj\n<< /Type /Cat', b'not a pdf at all'],
+                         ids=['empty', 'truncated', 'not a pdf'])
+def test_files_without_a_page_tree_have_no_count(tmp_path, data):
+    assert count_pdf_pages(write(tmp_path, 'broken.pdf', data)) is None
+
+
+def store_file(data):
+    upload = content_store.open_upload('job.pdf', 'application/pdf')
+    upload.write(data)
+    stored = upload.commit()
+    db.session.add(StoredFile(sha256=stored.sha256, size=stored.size, content_type=stored.content_type))
+    db.session.commit()
+    return stored.sha256
+
+
+@pytest.mark.parametrize('data, pages, status', [
+    (simple_pdf(2), 2, 'counted'),
+    (simple_pdf(6)[:40], None, 'failed'),
+    (object_stream_pdf(3)[:-60], None, 'failed'), # Cut inside the compressed stream
+], ids=['pdf', 'truncated', 'corrupt object stream'])
+def test_count_and_record_saves_the_result(app, data, pages, status):
+    sha256 = store_file(data)
+    assert page_counter.count_and_record(sha256) == pages
+    stored = db.session.get(StoredFile, sha256)
+    db.session.refresh(stored)
+    assert (stored.page_count, stored.page_count_status) == (pages, status)
+
+
+def multipart_body(file_data, fields=None):
+    parts = [f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+             for name, value in (fields or {}).items()]
+    parts.append(f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="file"; filename="job.pdf"\r\n'
+                 f'Content-Type: application/pdf\r\n\r\n'.encode() + file_data + b'\r\n')
+    return b''.join(parts) + f'--{BOUNDARY}--\r\n'.encode()
+
+
+def receive(store, body, **kwargs):
+    return receive_multipart(io.BytesIO(body), f'multipart/form-data; boundary={BOUNDARY}', store, **kwargs)
+
+
+def test_uploads_are_stored_once_per_content(tmp_path):
+    store = ContentStore(str(tmp_path / 'store'))
+    body = multipart_body(simple_pdf(2), {'customerName': 'Sample'})
+    stored = []
+    for _ in range(2):
+        fields, upload = receive(store, body, chunk_size=64)
+        assert fields == {'customerName': 'Sample'}
+        stored.append(upload.commit())
+    assert stored[0] == stored[1] and stored[0].is_pdf and stored[0].size == len(simple_pdf(2))
+    with open(store.path_for(stored[0].sha256), 'rb') as f:
+        assert f.read() == simple_pdf(2)
+    assert os.listdir(store.temp_dir) == []
+
+
+def test_oversized_upload_is_rejected_and_its_temp_file_removed(tmp_path):
+    store = ContentStore(str(tmp_path / 'store'))
+    body = multipart_body(b'x' * 4096)
+    with pytest.raises(UploadError) as error:
+        receive(store, body, chunk_size=256, max_bytes=1024)
+    assert error.value.status == 413
+    assert os.listdir(store.temp_dir) == []
+    assert sorted(os.listdir(store.root)) == ['tmp']
+
+
+def test_oversized_upload_is_refused_by_the_endpoint(app, client):
+    app.config['UPLOAD_MAX_BYTES'] = 1024
+    response = client.post('/submit-customer-order', data=multipart_body(b'x' * 4096),
+                           content_type=f'multipart/form-data; boundary={BOUNDARY}')
+    assert response.status_code == 413
+    assert os.listdir(content_store.temp_dir) == []